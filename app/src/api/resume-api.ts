@@ -29,6 +29,30 @@ export interface ApiResponse {
 
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
 
+// eslint-disable-next-line @typescript-eslint/no-explicit-any
+function toAnalysisResult(analysis: any): AnalysisResult {
+    return {
+        match_percentage: analysis?.match_percentage || 0,
+        scores: {
+            education: analysis?.scores?.education || 0,
+            skills: analysis?.scores?.skills || 0,
+            experience: analysis?.scores?.experience || 0,
+            tools: analysis?.scores?.tools || 0,
+            overall: analysis?.match_percentage || 0,
+        },
+        analysis: {
+            education_match: [],
+            skills_match: analysis?.matched_skills || [],
+            skills_missing: analysis?.missing_skills || [],
+            tools_match: [],
+            tools_missing: [],
+            strengths: analysis?.strengths || [],
+            weaknesses: analysis?.weaknesses || [],
+        },
+        recommendations: analysis?.recommendations || [],
+    };
+}
+
 export async function analyzeResume(file: File): Promise<ApiResponse> {
     try {
         const formData = new FormData();
@@ -50,30 +74,9 @@ export async function analyzeResume(file: File): Promise<ApiResponse> {
 
         // Transform backend response to match frontend expected format
         if (result.success && result.data) {
-            const analysis = result.data.analysis;
-
             return {
                 success: true,
-                data: {
-                    match_percentage: analysis?.match_percentage || 0,
-                    scores: {
-                        education: analysis?.scores?.education || 0,
-                        skills: analysis?.scores?.skills || 0,
-                        experience: analysis?.scores?.experience || 0,
-                        tools: analysis?.scores?.tools || 0,
-                        overall: analysis?.match_percentage || 0,
-                    },
-                    analysis: {
-                        education_match: [],
-                        skills_match: analysis?.matched_skills || [],
-                        skills_missing: analysis?.missing_skills || [],
-                        tools_match: [],
-                        tools_missing: [],
-                        strengths: analysis?.strengths || [],
-                        weaknesses: analysis?.weaknesses || [],
-                    },
-                    recommendations: analysis?.recommendations || [],
-                },
+                data: toAnalysisResult(result.data.analysis),
             };
         }
 
@@ -86,3 +89,178 @@ export async function analyzeResume(file: File): Promise<ApiResponse> {
         };
     }
 }
+
+export interface AnalysisJobOptions {
+    intervalMs?: number;
+    timeoutMs?: number;
+    onStatus?: (status: string) => void;
+}
+
+const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// Submit the resume to the job queue and poll until the analysis finishes,
+// so the upload request returns immediately instead of waiting on the model.
+export async function analyzeResumeAsync(
+    file: File,
+    { intervalMs = 1000, timeoutMs = 120000, onStatus }: AnalysisJobOptions = {},
+): Promise<ApiResponse> {
+    try {
+        const formData = new FormData();
+        formData.append('file', file);
+
+        const submitResponse = await fetch(`${API_BASE_URL}/api/v1/jobs`, {
+            method: 'POST',
+            body: formData,
+        });
+        const submitted = await submitResponse.json();
+
+        if (!submitResponse.ok || !submitted.success) {
+            return {
+                success: false,
+                error: submitted.error || 'เกิดข้อผิดพลาดในการวิเคราะห์',
+            };
+        }
+
+        const deadline = Date.now() + timeoutMs;
+        while (Date.now() < deadline) {
+            await sleep(intervalMs);
+
+            const response = await fetch(`${API_BASE_URL}/api/v1/jobs/${submitted.data.job_id}`);
+            const job = await response.json();
+
+            if (!response.ok || !job.success) {
+                return {
+                    success: false,
+                    error: job.error || 'เกิดข้อผิดพลาดในการวิเคราะห์',
+                };
+            }
+
+            onStatus?.(job.data.status);
+
+            if (job.data.status === 'completed') {
+                return {
+                    success: true,
+                    data: toAnalysisResult(job.data.result?.analysis),
+                };
+            }
+            if (job.data.status === 'failed') {
+                return {
+                    success: false,
+                    error: job.data.error || 'เกิดข้อผิดพลาดในการวิเคราะห์',
+                };
+            }
+        }
+
+        return {
+            success: false,
+            error: 'การวิเคราะห์ใช้เวลานานเกินไป',
+        };
+    } catch (error) {
+        console.error('API Error:', error);
+        return {
+            success: false,
+            error: 'ไม่สามารถเชื่อมต่อกับ API ได้',
+        };
+    }
+}
+
+export type AnalysisStreamSource = 'local' | 'model' | 'cache';
+
+export interface AnalysisStreamOptions {
+    // Called with the best result so far: first the local keyword match,
+    // then with each section the model finishes.
+    onPartial?: (result: AnalysisResult, source: AnalysisStreamSource) => void;
+    // eslint-disable-next-line @typescript-eslint/no-explicit-any
+    onEvent?: (event: any) => void;
+    signal?: AbortSignal;
+}
+
+// Stream the analysis over Server-Sent Events so the page can show the
+// local match within milliseconds and fill in model sections as they arrive.
+export async function analyzeResumeStream(
+    file: File,
+    { onPartial, onEvent, signal }: AnalysisStreamOptions = {},
+): Promise<ApiResponse> {
+    try {
+        const formData = new FormData();
+        formData.append('file', file);
+
+        const response = await fetch(`${API_BASE_URL}/api/v1/analyze/stream`, {
+            method: 'POST',
+            body: formData,
+            signal,
+        });
+
+        if (!response.ok || !response.body) {
+            const result = await response.json().catch(() => ({}));
+            return {
+                success: false,
+                error: result.error || 'เกิดข้อผิดพลาดในการวิเคราะห์',
+            };
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        // eslint-disable-next-line @typescript-eslint/no-explicit-any
+        let partial: any = {};
+
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            // SSE messages are separated by a blank line
+            let boundary = buffer.indexOf('\n\n');
+            while (boundary !== -1) {
+                const message = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+                boundary = buffer.indexOf('\n\n');
+
+                const data = message
+                    .split('\n')
+                    .filter((line) => line.startsWith('data: '))
+                    .map((line) => line.slice(6))
+                    .join('\n');
+                if (!data) continue;
+
+                const event = JSON.parse(data);
+                onEvent?.(event);
+
+                switch (event.event) {
+                    case 'local':
+                        partial = { ...event.analysis };
+                        onPartial?.(toAnalysisResult(partial), 'local');
+                        break;
+                    case 'section':
+                        partial = { ...partial, [event.key]: event.value };
+                        onPartial?.(toAnalysisResult(partial), 'model');
+                        break;
+                    case 'complete':
+                        await reader.cancel();
+                        return {
+                            success: true,
+                            data: toAnalysisResult(event.analysis),
+                        };
+                    case 'error':
+                        await reader.cancel();
+                        return {
+                            success: false,
+                            error: event.error || 'เกิดข้อผิดพลาดในการวิเคราะห์',
+                        };
+                }
+            }
+        }
+
+        return {
+            success: false,
+            error: 'การเชื่อมต่อถูกตัดก่อนการวิเคราะห์เสร็จสิ้น',
+        };
+    } catch (error) {
+        console.error('API Error:', error);
+        return {
+            success: false,
+            error: 'ไม่สามารถเชื่อมต่อกับ API ได้',
+        };
+    }
+}
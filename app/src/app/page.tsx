@@ -6,7 +6,7 @@ import { Button } from '@/components/ui/button';
 import { Progress } from '@/components/ui/progress';
 import ResumeUpload from '@/components/resume-upload';
 import AnalysisResult from '@/components/analysis-result';
-import { analyzeResume } from '@/api/resume-api';
+import { analyzeResumeStream } from '@/api/resume-api';
 import { Upload, BarChart3, Target } from 'lucide-react';
 
 interface AnalysisData {
@@ -38,9 +38,13 @@ export default function Home() {
   const handleFileUpload = async (file: File) => {
     setIsAnalyzing(true);
     setError(null);
+    setAnalysisData(null);
 
     try {
-      const result = await analyzeResume(file);
+      // Show the local match straight away and refine it as the model streams
+      const result = await analyzeResumeStream(file, {
+        onPartial: (partial) => setAnalysisData(partial),
+      });
       if (result.success && result.data) {
         setAnalysisData(result.data);
       } else {
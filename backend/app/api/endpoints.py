@@ -1,44 +1,38 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, UploadFile, File, HTTPException, Request
 from typing import List
-from app.services.analysis_service import AnalysisService
-from app.schemas import AnalysisResponse
+from app.schemas import AnalysisData, AnalysisResponse
+from app.services.uploads import UploadRejected, receive_pdf
 import logging
 
 router = APIRouter()
-analysis_service = AnalysisService()
 logger = logging.getLogger(__name__)
 
 @router.post("/analyze", response_model=AnalysisResponse)
-async def analyze_resume(file: UploadFile = File(...)):
+async def analyze_resume(request: Request, file: UploadFile = File(...)):
     """
-    Analyze uploaded resume PDF
+    Analyze uploaded resume PDF with the app's AnalysisService
+    (app.state.analysis_service)
     """
     try:
-        # Check file type
-        if not file.filename.lower().endswith('.pdf'):
+        # Check type, magic bytes and size while reading; large files go to disk
+        try:
+            pdf = await receive_pdf(file)
+        except UploadRejected as e:
             return AnalysisResponse(
                 success=False,
-                error="Only PDF files are allowed"
-            )
-        
-        # Read file content
-        file_content = await file.read()
-        
-        if len(file_content) == 0:
-            return AnalysisResponse(
-                success=False,
-                error="Uploaded file is empty"
+                error=str(e)
             )
         
         # Analyze resume
-        analysis_result = await analysis_service.analyze_resume(
-            file_content, 
-            file.filename
-        )
+        with pdf:
+            analysis_result = await request.app.state.analysis_service.analyze(
+                pdf, 
+                file.filename
+            )
         
         return AnalysisResponse(
             success=True,
-            data=analysis_result
+            data=AnalysisData(**analysis_result)
         )
         
     except Exception as e:
@@ -1,24 +1,111 @@
 # backend/app/main.py
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from google import genai
-from google.genai import types
-import fitz  # PyMuPDF
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+import asyncio
+import functools
 import os
-import json
-import uuid
-from typing import Optional
+import time
+from typing import List, Optional, Union
 import logging
 
+from app.services.analysis_service import AnalysisInputError, AnalysisService, PdfExtractor
+from app.services.artifacts import ARTIFACT_STORE_SIZE, ArtifactStore
+from app.services.backends import make_backend
+from app.services.cache import ResultCache, hash_bytes
+from app.services.compact import RESPONSE_VIEWS, CompactResult, dumps, negotiated_response, parse_fields
+from app.services.dedup import DEDUP_INDEX_SIZE, DuplicateIndex
+from app.services.batch_service import BatchAnalyzer, expand_uploads
+from app.services.executor import AnalysisExecutor
+from app.services.jd_registry import DEFAULT_JD_ID, CompiledJD, JDRegistry
+from app.services.job_queue import CallbackRejected, JobQueue, QueueFullError, resolve_callback
+from app.services.metrics import (
+    HTTP_IN_FLIGHT,
+    HTTP_REQUEST_SECONDS,
+    STAGE_SECONDS,
+    format_timings,
+    registry as metrics_registry,
+    request_timings,
+    server_timing_header,
+    stage,
+)
+from app.models import JD_AI_DATA_INTERN
+from app.schemas import JobDescriptionIn, RankRequest
+from app.services.tiering import ANALYSIS_MODE, ANALYSIS_MODES, TIER_CACHE
+from app.services.ocr_service import PdfSource
+from app.services.uploads import (
+    MAX_REQUEST_BYTES,
+    MAX_UPLOAD_BYTES,
+    UPLOAD_FORM_OVERHEAD_BYTES,
+    RequestSizeLimit,
+    SpooledPDF,
+    UploadRejected,
+    read_upload,
+    receive_pdf,
+)
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Process/thread pools for PDF parsing and model calls
+executor = AnalysisExecutor()
+
+# Extracted text and analyses keyed by PDF hash + JD + prompt version + model
+result_cache = ResultCache()
+
+# Analyzed resumes' text, signals and per-JD judgments, so JD changes are
+# re-scored without the model (ARTIFACT_STORE_SIZE=0 disables)
+artifact_store = ArtifactStore() if ARTIFACT_STORE_SIZE > 0 else None
+
+# MinHash/LSH signatures of extracted resumes: near-duplicates of an analyzed
+# resume reuse its analysis (DEDUP_INDEX_SIZE=0 disables)
+duplicate_index = DuplicateIndex() if DEDUP_INDEX_SIZE > 0 else None
+
+def init_search_index():
+    directory = os.getenv("SEARCH_INDEX_DIR")
+    if not directory:
+        return None
+    # Imported here: numpy is only loaded when the index is enabled
+    from app.services.search_index import SearchIndex
+    
+    try:
+        return SearchIndex(directory)
+    except Exception as e:
+        logger.error(f"Failed to open search index in {directory}: {e}")
+        return None
+
+# Opt-in persistent store of analyzed resumes for candidate search
+# (SEARCH_INDEX_DIR); None keeps the API stateless
+search_index = init_search_index()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await job_queue.start()
+    # Serve right away; /health reports ready once the warm-up has finished
+    warm_up = asyncio.create_task(analysis_service.warm_up())
+    yield
+    warm_up.cancel()
+    await job_queue.stop()
+    await analysis_service.close()
+    executor.shutdown()
+    result_cache.close()
+    if artifact_store:
+        artifact_store.close()
+    if duplicate_index:
+        duplicate_index.close()
+    if search_index:
+        search_index.close()
+
+
 app = FastAPI(
     title="Resume Analysis API",
     description="API for analyzing resumes without database storage",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
 
 # CORS configuration
@@ -30,143 +117,83 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize Gemini AI
-def init_gemini():
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
-        logger.warning("GEMINI_API_KEY not found. Using mock analysis.")
-        return None
-    
-    try:
-        client = genai.Client(api_key=api_key)
-        return client
-    except Exception as e:
-        logger.error(f"Failed to initialize Gemini: {e}")
-        return None
+# Endpoints taking a single PDF: their body is that file plus form fields
+SINGLE_UPLOAD_PATHS = {"/api/v1/analyze", "/api/v1/analyze/stream", "/api/v1/analyze/multi", "/api/v1/jobs"}
 
-gemini_client = init_gemini()
-
-# Job Description for AI & Data Solution Intern
-JOB_DESCRIPTION = {
-    "position": "AI & Data Solution Intern",
-    "required_skills": ["Python", "Machine Learning", "Data Analysis", "SQL", "Git"],
-    "preferred_skills": ["Deep Learning", "Natural Language Processing", "Cloud Computing", "Docker"],
-    "required_tools": ["Python", "Pandas", "NumPy", "Jupyter", "Git"],
-    "responsibilities": [
-        "Develop AI/ML models",
-        "Analyze and process data",
-        "Create data visualizations",
-        "Collaborate with development team"
-    ]
-}
+def request_body_limit(path: str) -> int:
+    """Hard body limit for a route: one upload's worth, or MAX_REQUEST_BYTES"""
+    if path in SINGLE_UPLOAD_PATHS:
+        return MAX_UPLOAD_BYTES + UPLOAD_FORM_OVERHEAD_BYTES
+    return MAX_REQUEST_BYTES
+
+app.add_middleware(RequestSizeLimit, limit_for=request_body_limit)
 
-def extract_text_from_pdf(pdf_content: bytes) -> str:
-    """Extract text from PDF using PyMuPDF"""
+@app.middleware("http")
+async def track_requests(request: Request, call_next):
+    """Request latency histogram (by route template) and in-flight gauge"""
+    HTTP_IN_FLIGHT.inc()
+    started = time.perf_counter()
+    status = 500
     try:
-        doc = fitz.open(stream=pdf_content, filetype="pdf")
-        text = ""
-        for page in doc:
-            text += page.get_text()
-        doc.close()
-        return text.strip()
-    except Exception as e:
-        logger.error(f"PDF extraction error: {e}")
-        raise HTTPException(status_code=400, detail="Failed to extract text from PDF")
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        HTTP_IN_FLIGHT.dec()
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=status,
+        )
 
-def analyze_with_gemini(resume_text: str) -> dict:
-    """Analyze resume using Gemini AI"""
-    if not gemini_client:
-        return get_mock_analysis()
-    
-    prompt = f"""
-    Analyze this resume for the position: {JOB_DESCRIPTION['position']}
-    
-    Required Skills: {', '.join(JOB_DESCRIPTION['required_skills'])}
-    Preferred Skills: {', '.join(JOB_DESCRIPTION['preferred_skills'])}
-    Required Tools: {', '.join(JOB_DESCRIPTION['required_tools'])}
-    
-    Resume Text:
-    {resume_text[:3000]}
-    
-    Provide analysis in this JSON format:
-    {{
-        "scores": {{
-            "education": 0-100,
-            "skills": 0-100,
-            "experience": 0-100,
-            "tools": 0-100
-        }},
-        "match_percentage": 0-100,
-        "strengths": ["list strengths"],
-        "weaknesses": ["list weaknesses"],
-        "recommendations": ["list recommendations"],
-        "matched_skills": ["list matched skills"],
-        "missing_skills": ["list missing skills"]
-    }}
-    
-    Respond only with valid JSON.
-    """
-    
-    max_retries = 2
-    for attempt in range(max_retries):
-        try:
-            response = gemini_client.models.generate_content(
-                model="gemini-2.0-flash",
-                contents=prompt
-            )
-            
-            # Extract JSON from response
-            response_text = response.text.strip()
-            if response_text.startswith('```json'):
-                response_text = response_text[7:-3]
-            elif response_text.startswith('```'):
-                response_text = response_text[3:-3]
-            
-            analysis = json.loads(response_text)
-            logger.info("AI analysis completed successfully!")
-            return analysis
-        except Exception as e:
-            error_str = str(e)
-            if "429" in error_str or "RESOURCE_EXHAUSTED" in error_str:
-                logger.warning(f"Quota exceeded (attempt {attempt + 1}/{max_retries}). Using mock analysis.")
-                break
-            logger.error(f"Gemini analysis error (attempt {attempt + 1}): {e}")
-            if attempt < max_retries - 1:
-                import time
-                time.sleep(2)
-    
-    logger.info("Returning mock analysis due to API limitations.")
-    return get_mock_analysis()
+# Registered JDs, each compiled once (prompt prefix, matcher, weights);
+# JD_AI_DATA_INTERN is the built-in default
+jd_registry = JDRegistry({DEFAULT_JD_ID: JD_AI_DATA_INTERN})
 
-def get_mock_analysis() -> dict:
-    """Return mock analysis when Gemini is not available"""
-    return {
-        "scores": {
-            "education": 85,
-            "skills": 75,
-            "experience": 65,
-            "tools": 80
-        },
-        "match_percentage": 76,
-        "strengths": [
-            "Strong educational background",
-            "Good foundation in Python",
-            "Basic understanding of machine learning concepts"
-        ],
-        "weaknesses": [
-            "Limited practical experience",
-            "Need more project work",
-            "Could improve knowledge in advanced ML techniques"
-        ],
-        "recommendations": [
-            "Work on personal AI/ML projects",
-            "Take online courses on deep learning",
-            "Contribute to open-source projects",
-            "Practice with real datasets"
-        ],
-        "matched_skills": ["Python", "Data Analysis", "Git"],
-        "missing_skills": ["Deep Learning", "Cloud Computing", "Docker"]
-    }
+def index_analysis(pdf_hash: str, resume_text: str, filename: str, analysis: dict, jd: Optional[CompiledJD] = None):
+    """Queue an analyzed resume for the search index (no-op when disabled)"""
+    if search_index:
+        search_index.submit(pdf_hash, resume_text, filename, (jd or jd_registry.default).jd_id, analysis)
+
+# The one analysis pipeline: PDF extractor -> resume condenser -> local
+# scorer and model backend (ANALYSIS_BACKEND: gemini, fake or local) ->
+# aggregated analysis, cached by PDF hash + JD + prompt version + model
+analysis_service = AnalysisService(
+    jd_registry,
+    PdfExtractor(executor, result_cache),
+    backend=make_backend(executor=executor),
+    cache=result_cache,
+    on_analyzed=index_analysis,
+    artifacts=artifact_store,
+    dedup=duplicate_index
+)
+app.state.analysis_service = analysis_service
+
+async def extract_text_from_pdf(pdf_content: PdfSource, pdf_hash: Optional[str] = None) -> str:
+    """Extract text from PDF using PyMuPDF in the PDF worker pool"""
+    return await analysis_service.extract_text(pdf_content, pdf_hash or hash_bytes(pdf_content))
+
+batch_analyzer = BatchAnalyzer(
+    extract=extract_text_from_pdf,
+    analyze_pack=analysis_service.analyze_pack,
+    lookup=analysis_service.lookup,
+    # Every fresh batch result has a tier: screened, duplicate, model or fallback
+    on_analyzed=lambda item, analysis: analysis_service.record(
+        item.pdf_hash, item.text, item.filename, analysis, None, item.tier["tier"]
+    )
+)
+
+def resolve_mode(mode: Optional[str]):
+    """(mode, None) or (None, 400 response) for an analysis mode parameter"""
+    mode = mode or ANALYSIS_MODE
+    if mode not in ANALYSIS_MODES:
+        return None, JSONResponse(
+            status_code=400,
+            content={"success": False, "error": f"mode must be one of: {', '.join(ANALYSIS_MODES)}"}
+        )
+    return mode, None
 
 @app.get("/")
 async def root():
@@ -174,80 +201,578 @@ async def root():
         "app": "Resume Analysis System",
         "version": "2.0.0",
         "status": "running",
-        "database": "none",
+        "database": "search-index" if search_index else "none",
         "features": ["PDF processing", "AI analysis", "Real-time scoring"]
     }
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "timestamp": "2024-01-01T00:00:00Z"}
+    """
+    Readiness: 503 until the warm-up (PyMuPDF, PDF workers, model client)
+    has finished, so load balancers only route to warm workers
+    """
+    ready = analysis_service.ready
+    content = {
+        "status": "healthy" if ready else "starting",
+        "ready": ready,
+        "warm_up_ms": analysis_service.warm_up_ms,
+        "pid": os.getpid(),
+        "timestamp": datetime.now(timezone.utc).isoformat()
+    }
+    if not ready:
+        return JSONResponse(status_code=503, content=content)
+    return content
+
+@app.get("/health/live")
+async def liveness_check():
+    """Liveness: the process is serving requests, warm or not"""
+    return {"status": "alive", "timestamp": datetime.now(timezone.utc).isoformat()}
 
 @app.get("/job-description")
-async def get_job_description():
+async def get_job_description(jd_id: Optional[str] = None):
+    jd, error = resolve_jd(jd_id)
+    if error:
+        return error
     return {
         "success": True,
-        "data": JOB_DESCRIPTION
+        "data": jd.jd
     }
 
+def resolve_jd(jd_id: Optional[str]):
+    """(CompiledJD, None) or (None, 404 response) for a request's jd_id"""
+    try:
+        return jd_registry.get(jd_id), None
+    except KeyError:
+        return None, JSONResponse(
+            status_code=404,
+            content={"success": False, "error": f"Unknown job description: {jd_id}"}
+        )
+
+def resolve_view(view: Optional[str], fields: Optional[str]):
+    """((view, fields), None) or (None, 400 response); a fields= selector implies the compact view"""
+    try:
+        selected = parse_fields(fields)
+    except ValueError as e:
+        return None, JSONResponse(
+            status_code=400,
+            content={"success": False, "error": str(e)}
+        )
+    view = "compact" if selected else (view or "full")
+    if view not in RESPONSE_VIEWS:
+        return None, JSONResponse(
+            status_code=400,
+            content={"success": False, "error": f"view must be one of: {', '.join(RESPONSE_VIEWS)}"}
+        )
+    return (view, selected), None
+
+def upload_error(e: UploadRejected) -> JSONResponse:
+    return JSONResponse(
+        status_code=e.status_code,
+        content={"success": False, "error": str(e)}
+    )
+
+async def run_analysis(
+    file_content: Union[bytes, SpooledPDF],
+    filename: str,
+    jd: Optional[CompiledJD] = None,
+    mode: Optional[str] = None
+) -> dict:
+    """Response `data` payload for one PDF (see AnalysisService.analyze)"""
+    return await analysis_service.analyze(file_content, filename, jd, mode)
+
+# Submit/poll analyses drained by background workers
+job_queue = JobQueue(handler=run_analysis)
+
 @app.post("/api/v1/analyze")
-async def analyze_resume(file: UploadFile = File(...)):
+async def analyze_resume(
+    request: Request,
+    file: UploadFile = File(...),
+    jd_id: Optional[str] = Form(None),
+    mode: Optional[str] = Form(None),
+    view: Optional[str] = None,
+    fields: Optional[str] = None
+):
     """
-    Analyze a resume PDF file
+    Analyze a resume PDF file against a registered job description
+    (the default one unless jd_id is given). mode=tiered answers clear
+    rejects/fits from the local pre-screen and only asks the model about
+    borderline resumes; data.tier says which step produced the analysis.
+    Near-duplicates of earlier resumes are listed in data.duplicates and
+    reuse the closest one's analysis instead of a model call.
+    
+    ?view=compact returns a CompactResult instead (scores as an array in
+    SCORE_FIELDS order, skills as ids into the JD's vocabulary, no job
+    description or diagnostics); ?fields=match,scores keeps only those
+    fields. Responses are MessagePack when Accept prefers
+    application/msgpack and gzip/br compressed per Accept-Encoding.
     """
+    jd, error = resolve_jd(jd_id)
+    if error:
+        return error
+    mode, error = resolve_mode(mode)
+    if error:
+        return error
+    selection, error = resolve_view(view, fields)
+    if error:
+        return error
+    view, fields = selection
+    
     try:
-        # Validate file
-        if not file.filename.lower().endswith('.pdf'):
-            return JSONResponse(
-                status_code=400,
-                content={"success": False, "error": "Only PDF files are accepted"}
-            )
+        with request_timings() as timings:
+            # Read, validate and (if large) spool the upload to disk
+            with stage("upload_read"):
+                pdf = await receive_pdf(file)
+            
+            # Prepare response
+            with pdf:
+                data = await run_analysis(pdf, file.filename, jd, mode)
+            if view == "compact":
+                data = CompactResult.from_data(data, jd).to_dict(fields)
+            response_data = {
+                "success": True,
+                "data": data
+            }
+            
+            # Serialization is timed too; it lands in the histogram and the
+            # Server-Timing header but can't be part of the body it produces
+            with stage("serialize"):
+                response = await negotiated_response(request, response_data)
+            response.headers["Server-Timing"] = server_timing_header(timings)
+            return response
         
-        # Read file
-        file_content = await file.read()
-        if len(file_content) == 0:
+    except UploadRejected as e:
+        return upload_error(e)
+    except AnalysisInputError as e:
+        return JSONResponse(
+            status_code=400,
+            content={"success": False, "error": str(e)}
+        )
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Analysis error: {e}", exc_info=True)
+        return JSONResponse(
+            status_code=500,
+            content={"success": False, "error": f"Internal server error: {str(e)}"}
+        )
+
+@app.post("/api/v1/jobs", status_code=202)
+async def submit_analysis_job(
+    file: UploadFile = File(...),
+    callback_url: Optional[str] = Form(None)
+):
+    """
+    Queue a resume PDF for analysis and return a job id immediately.
+    Poll GET /api/v1/jobs/{job_id}; if callback_url is given the finished
+    job is also POSTed there. The callback host must resolve to public
+    addresses only, or be listed in JOB_CALLBACK_ALLOWED_HOSTS.
+    """
+    if callback_url:
+        try:
+            await resolve_callback(callback_url)
+        except CallbackRejected as e:
             return JSONResponse(
                 status_code=400,
-                content={"success": False, "error": "Empty file"}
+                content={"success": False, "error": str(e)}
             )
-        
-        # Extract text from PDF
-        logger.info(f"Processing file: {file.filename}")
-        resume_text = extract_text_from_pdf(file_content)
-        
+    
+    try:
+        pdf = await receive_pdf(file)
+    except UploadRejected as e:
+        return upload_error(e)
+    
+    try:
+        # The queue owns the upload now: the memory backend keeps it spooled
+        # until a worker runs the job, the Redis backend stores its bytes
+        job = await job_queue.submit(pdf, file.filename, callback_url)
+    except QueueFullError as e:
+        return JSONResponse(
+            status_code=503,
+            content={"success": False, "error": str(e)}
+        )
+    
+    return {
+        "success": True,
+        "data": {
+            "job_id": job.job_id,
+            "status": job.status,
+            "status_url": f"/api/v1/jobs/{job.job_id}"
+        }
+    }
+
+@app.get("/api/v1/jobs/{job_id}")
+async def get_analysis_job(job_id: str):
+    """
+    Status of a queued analysis, with the result once completed
+    """
+    job = await job_queue.get(job_id)
+    if job is None:
+        return JSONResponse(
+            status_code=404,
+            content={"success": False, "error": "Job not found"}
+        )
+    
+    return {
+        "success": True,
+        "data": job.to_dict()
+    }
+
+def format_stream_event(event: dict, stream_format: str) -> str:
+    """Serialize one streamed event as an NDJSON line or an SSE message"""
+    payload = dumps(event).decode("utf-8")
+    if stream_format == "sse":
+        return f"event: {event['event']}\ndata: {payload}\n\n"
+    return payload + "\n"
+
+@app.post("/api/v1/analyze/batch")
+async def analyze_batch(
+    files: List[UploadFile] = File(...),
+    format: str = "ndjson",
+    mode: Optional[str] = None,
+    view: Optional[str] = None,
+    fields: Optional[str] = None
+):
+    """
+    Analyze many resumes (PDF files and/or ZIP archives of PDFs) against the
+    job description. Results are streamed as NDJSON, or as Server-Sent Events
+    with ?format=sse, in the order they complete. With ?mode=tiered only
+    borderline resumes are packed into model requests. ?view=compact and
+    ?fields= slim every result as for /api/v1/analyze.
+    """
+    mode, error = resolve_mode(mode)
+    if error:
+        return error
+    selection, error = resolve_view(view, fields)
+    if error:
+        return error
+    view, fields = selection
+    if format not in ("ndjson", "sse"):
+        return JSONResponse(
+            status_code=400,
+            content={"success": False, "error": "format must be 'ndjson' or 'sse'"}
+        )
+    
+    try:
+        uploads = [await read_upload(file) for file in files]
+    except UploadRejected as e:
+        return upload_error(e)
+    try:
+        # Decompressing ZIPs is CPU work; keep it off the event loop
+        items = await asyncio.to_thread(expand_uploads, uploads)
+    except ValueError as e:
+        return JSONResponse(
+            status_code=400,
+            content={"success": False, "error": str(e)}
+        )
+    
+    if not items:
+        return JSONResponse(
+            status_code=400,
+            content={"success": False, "error": "No resumes found in upload"}
+        )
+    
+    logger.info(f"Processing batch of {len(items)} resumes")
+    
+    jd = jd_registry.default
+    
+    def compact(result: dict) -> dict:
+        data = result["data"]
+        tier = TIER_CACHE if data["cached"] else (data.get("tier") or {}).get("tier")
+        slim = CompactResult.from_analysis(data["analysis"], jd, data["resume_id"], result["filename"], tier)
+        return {**result, "data": slim.to_dict(fields)}
+    
+    async def events():
+        start = {"event": "start", "total": len(items)}
+        if view == "compact":
+            start.update(jd_id=jd.jd_id, jd_version=jd.version)
+        else:
+            start["job_description"] = jd.jd
+        yield format_stream_event(start, format)
+        screen = None
+        if mode == "tiered" or duplicate_index:
+            screen = functools.partial(analysis_service.screen_batch_item, tiered=mode == "tiered")
+        async for result in batch_analyzer.stream(items, screen=screen):
+            if view == "compact" and result.get("success"):
+                result = compact(result)
+            yield format_stream_event(result, format)
+    
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(events(), media_type=media_type)
+
+@app.post("/api/v1/analyze/stream")
+async def analyze_resume_stream(
+    file: UploadFile = File(...),
+    jd_id: Optional[str] = Form(None),
+    mode: Optional[str] = Form(None),
+    format: str = "sse"
+):
+    """
+    Analyze a resume PDF and stream partial results (Server-Sent Events,
+    or NDJSON with ?format=ndjson): extraction stats and local keyword
+    matches arrive within milliseconds, model sections as they are generated.
+    """
+    jd, error = resolve_jd(jd_id)
+    if error:
+        return error
+    mode, error = resolve_mode(mode)
+    if error:
+        return error
+    if format not in ("ndjson", "sse"):
+        return JSONResponse(
+            status_code=400,
+            content={"success": False, "error": "format must be 'ndjson' or 'sse'"}
+        )
+    try:
+        pdf = await receive_pdf(file)
+    except UploadRejected as e:
+        return upload_error(e)
+    
+    async def events():
+        # The body outlives the handler; the spooled file goes with the stream
+        with pdf:
+            async for item in analysis_service.analyze_events(pdf, file.filename, jd, mode):
+                yield format_stream_event(item, format)
+    
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    # Stop proxies (nginx) from buffering the stream
+    return StreamingResponse(events(), media_type=media_type, headers={"X-Accel-Buffering": "no"})
+
+@app.post("/api/v1/rank")
+async def rank_resumes(files: List[UploadFile] = File(...), top_k: int = 10, jd_id: Optional[str] = None):
+    """
+    Rank uploaded resumes (PDF files and/or ZIP archives) against a job
+    description with the local scorer and return the top-K shortlist.
+    No model calls are made.
+    """
+    jd, error = resolve_jd(jd_id)
+    if error:
+        return error
+    
+    try:
+        uploads = [await read_upload(file) for file in files]
+    except UploadRejected as e:
+        return upload_error(e)
+    try:
+        # Decompressing ZIPs is CPU work; keep it off the event loop
+        items = await asyncio.to_thread(expand_uploads, uploads)
+    except ValueError as e:
+        return JSONResponse(
+            status_code=400,
+            content={"success": False, "error": str(e)}
+        )
+    
+    async def extract(item):
+        if item.error:
+            return item.error
+        try:
+            item.text = await extract_text_from_pdf(item.content, item.pdf_hash)
+        except AnalysisInputError as e:
+            return str(e)
+        return None if item.text else "No text found in PDF"
+    
+    extraction_errors = await asyncio.gather(*[extract(item) for item in items])
+    errors = [
+        {"filename": item.filename, "error": error}
+        for item, error in zip(items, extraction_errors) if error
+    ]
+    ranked_items = [item for item, error in zip(items, extraction_errors) if not error]
+    
+    shortlist = await asyncio.to_thread(
+        jd.ranker.rank,
+        [item.text for item in ranked_items],
+        [item.filename for item in ranked_items],
+        top_k
+    )
+    
+    return {
+        "success": True,
+        "data": {
+            "jd_id": jd.jd_id,
+            "total": len(ranked_items),
+            "shortlist": shortlist,
+            "errors": errors
+        }
+    }
+
+@app.post("/api/v1/rank/text")
+async def rank_resume_texts(request: RankRequest, jd_id: Optional[str] = None):
+    """
+    Rank already-extracted resume texts against a job description and
+    return the top-K shortlist
+    """
+    jd, error = resolve_jd(jd_id)
+    if error:
+        return error
+    
+    shortlist = await asyncio.to_thread(
+        jd.ranker.rank,
+        [resume.text for resume in request.resumes],
+        [resume.id for resume in request.resumes],
+        request.top_k
+    )
+    
+    return {
+        "success": True,
+        "data": {
+            "jd_id": jd.jd_id,
+            "total": len(request.resumes),
+            "shortlist": shortlist
+        }
+    }
+
+@app.get("/api/v1/jds")
+async def list_job_descriptions():
+    """Registered job descriptions"""
+    return {
+        "success": True,
+        "data": [entry.to_dict() for entry in jd_registry.list()]
+    }
+
+@app.post("/api/v1/jds", status_code=201)
+async def create_job_description(request: JobDescriptionIn):
+    """
+    Register a job description. Its prompt prefix, term matcher and
+    weights are compiled once here instead of on every analysis.
+    """
+    try:
+        entry = jd_registry.create(request.to_jd(), request.id)
+    except ValueError as e:
+        return JSONResponse(
+            status_code=400,
+            content={"success": False, "error": str(e)}
+        )
+    return {
+        "success": True,
+        "data": entry.to_dict()
+    }
+
+@app.get("/api/v1/jds/{jd_id}")
+async def get_registered_job_description(jd_id: str):
+    jd, error = resolve_jd(jd_id)
+    if error:
+        return error
+    return {
+        "success": True,
+        "data": jd.to_dict()
+    }
+
+@app.put("/api/v1/jds/{jd_id}")
+async def update_job_description(jd_id: str, request: JobDescriptionIn):
+    """
+    Replace a job description. Stored analyses against it are re-scored
+    for the new version right away, without model calls; re-uploads of
+    those resumes are answered from the re-scored analyses.
+    """
+    _, error = resolve_jd(jd_id)
+    if error:
+        return error
+    try:
+        entry = jd_registry.update(jd_id, request.to_jd())
+    except ValueError as e:
+        return JSONResponse(
+            status_code=400,
+            content={"success": False, "error": str(e)}
+        )
+    return {
+        "success": True,
+        "data": {
+            **entry.to_dict(),
+            "rescored": await analysis_service.rescore(entry)
+        }
+    }
+
+@app.get("/api/v1/jds/{jd_id}/candidates")
+async def rank_stored_candidates(jd_id: str, top_k: int = 10):
+    """
+    Every resume analyzed so far, ranked for the job description's current
+    version: analyzed ones by their (re-scored) analysis, the rest by the
+    local scorer. No uploads or model calls.
+    """
+    jd, error = resolve_jd(jd_id)
+    if error:
+        return error
+    ranking = await analysis_service.rank_stored(jd, max(1, min(top_k, 1000)))
+    if ranking is None:
+        return JSONResponse(
+            status_code=503,
+            content={"success": False, "error": "Resume artifacts are not kept (ARTIFACT_STORE_SIZE=0)"}
+        )
+    return {
+        "success": True,
+        "data": ranking
+    }
+
+@app.delete("/api/v1/jds/{jd_id}")
+async def delete_job_description(jd_id: str):
+    _, error = resolve_jd(jd_id)
+    if error:
+        return error
+    try:
+        jd_registry.delete(jd_id)
+    except ValueError as e:
+        return JSONResponse(
+            status_code=400,
+            content={"success": False, "error": str(e)}
+        )
+    return {
+        "success": True,
+        "data": {"id": jd_id, "deleted": True}
+    }
+
+@app.post("/api/v1/analyze/multi")
+async def analyze_resume_multi(file: UploadFile = File(...), jd_ids: str = Form(...)):
+    """
+    Analyze one resume PDF against several registered job descriptions
+    (comma-separated jd_ids). The PDF is parsed once and the model is asked
+    about all positions in one request. Results are sorted by match.
+    """
+    requested = list(dict.fromkeys(jd_id.strip() for jd_id in jd_ids.split(",") if jd_id.strip()))
+    if not requested:
+        return JSONResponse(
+            status_code=400,
+            content={"success": False, "error": "jd_ids is required"}
+        )
+    jds = []
+    for jd_id in requested:
+        jd, error = resolve_jd(jd_id)
+        if error:
+            return error
+        jds.append(jd)
+    
+    try:
+        pdf = await receive_pdf(file)
+    except UploadRejected as e:
+        return upload_error(e)
+    
+    with request_timings() as timings, pdf:
+        started = time.perf_counter()
+        pdf_hash = pdf.sha256
+        try:
+            resume_text = await extract_text_from_pdf(pdf.source, pdf_hash)
+        except AnalysisInputError as e:
+            resume_text = None
+            error = str(e)
+        else:
+            error = "No text found in PDF"
         if not resume_text:
             return JSONResponse(
                 status_code=400,
-                content={"success": False, "error": "No text found in PDF"}
+                content={"success": False, "error": error}
             )
+        results = await analysis_service.analyze_against_jds(resume_text, pdf_hash, jds, file.filename)
+        results.sort(key=lambda item: item["analysis"].get("match_percentage") or 0, reverse=True)
         
-        # Analyze with AI
-        logger.info("Analyzing resume with AI...")
-        analysis_result = analyze_with_gemini(resume_text)
-        
-        # Prepare response
-        response_data = {
+        return {
             "success": True,
             "data": {
-                "analysis_id": str(uuid.uuid4()),
                 "filename": file.filename,
-                "file_size": len(file_content),
+                "file_size": pdf.size,
                 "extracted_text_length": len(resume_text),
-                "analysis": analysis_result,
-                "processing_time": "real-time",
-                "job_description": JOB_DESCRIPTION
+                "results": results,
+                "processing_time": round(time.perf_counter() - started, 3),
+                "timings": format_timings(timings)
             }
         }
-        
-        return response_data
-        
-    except HTTPException as e:
-        raise e
-    except Exception as e:
-        logger.error(f"Analysis error: {e}", exc_info=True)
-        return JSONResponse(
-            status_code=500,
-            content={"success": False, "error": f"Internal server error: {str(e)}"}
-        )
 
 @app.get("/api/v1/test")
 async def test_endpoint():
@@ -255,10 +780,183 @@ async def test_endpoint():
     return {
         "status": "ok",
         "message": "API is working",
-        "gemini_available": gemini_client is not None,
+        "backend": analysis_service.stats()["backend"],
+        "gemini_available": analysis_service.model_available,
         "endpoints": {
-            "POST /api/v1/analyze": "Upload and analyze resume",
+            "POST /api/v1/analyze": "Upload and analyze resume (?view=compact, ?fields=match,scores)",
+            "POST /api/v1/analyze/batch": "Upload many resumes (PDFs or ZIP) and stream results",
+            "POST /api/v1/analyze/stream": "Analyze a resume with streamed partial results (SSE)",
+            "POST /api/v1/analyze/multi": "Analyze one resume against several job descriptions",
+            "POST /api/v1/jobs": "Queue a resume for analysis and return a job id",
+            "POST /api/v1/rank": "Rank uploaded resumes and return a top-K shortlist",
+            "POST /api/v1/rank/text": "Rank extracted resume texts and return a top-K shortlist",
+            "GET /api/v1/jobs/{job_id}": "Poll a queued analysis",
             "GET /job-description": "Get job requirements",
-            "GET /health": "Health check"
+            "GET/POST /api/v1/jds": "List or register job descriptions",
+            "GET/PUT/DELETE /api/v1/jds/{jd_id}": "Read, replace (re-scoring stored analyses) or remove a job description",
+            "GET /api/v1/jds/{jd_id}/candidates": "Rank every analyzed resume for a job description",
+            "GET /api/v1/search": "Search analyzed resumes by free text (needs SEARCH_INDEX_DIR)",
+            "GET /api/v1/search/similar/{resume_id}": "Resumes similar to an analyzed one",
+            "DELETE /api/v1/search/{resume_id}": "Remove a resume from the search index",
+            "GET /api/v1/stats": "Pipeline concurrency and queue stats",
+            "GET /metrics": "Prometheus metrics",
+            "GET /health": "Readiness check (503 until warmed up)",
+            "GET /health/live": "Liveness check"
         }
-    }
\ No newline at end of file
+    }
+
+def search_disabled() -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content={"success": False, "error": "Search index is disabled (set SEARCH_INDEX_DIR)"}
+    )
+
+@app.get("/api/v1/search")
+async def search_resumes(q: str, k: int = 10):
+    """
+    Top-k analyzed resumes for a free-text query such as
+    "PyTorch Docker", with their stored per-JD analysis summaries
+    """
+    if not search_index:
+        return search_disabled()
+    if not q.strip():
+        return JSONResponse(
+            status_code=400,
+            content={"success": False, "error": "q is required"}
+        )
+    started = time.perf_counter()
+    results = await asyncio.to_thread(search_index.search, q, max(1, min(k, 100)))
+    return {
+        "success": True,
+        "data": {
+            "query": q,
+            "results": results,
+            "took_ms": round((time.perf_counter() - started) * 1000, 3)
+        }
+    }
+
+@app.get("/api/v1/search/similar/{resume_id}")
+async def similar_resumes(resume_id: str, k: int = 10):
+    """Top-k resumes most similar to an indexed one (resume_id from an analysis)"""
+    if not search_index:
+        return search_disabled()
+    started = time.perf_counter()
+    results = await asyncio.to_thread(search_index.similar, resume_id, max(1, min(k, 100)))
+    if results is None:
+        return JSONResponse(
+            status_code=404,
+            content={"success": False, "error": f"Resume not in search index: {resume_id}"}
+        )
+    return {
+        "success": True,
+        "data": {
+            "resume_id": resume_id,
+            "results": results,
+            "took_ms": round((time.perf_counter() - started) * 1000, 3)
+        }
+    }
+
+@app.delete("/api/v1/search/{resume_id}")
+async def delete_indexed_resume(resume_id: str):
+    """Remove a resume (text and analyses) from the search index"""
+    if not search_index:
+        return search_disabled()
+    if not await asyncio.to_thread(search_index.delete, resume_id):
+        return JSONResponse(
+            status_code=404,
+            content={"success": False, "error": f"Resume not in search index: {resume_id}"}
+        )
+    return {
+        "success": True,
+        "data": {"resume_id": resume_id, "deleted": True}
+    }
+
+@app.get("/api/v1/stats")
+async def get_stats():
+    """Concurrency limits, in-flight work and queue depth of the pipeline"""
+    return {
+        "success": True,
+        "data": {
+            "executor": executor.stats(),
+            "cache": result_cache.stats(),
+            "jobs": await job_queue.stats(),
+            **analysis_service.stats(),
+            "screening": analysis_service.screening.report(),
+            "search": search_index.stats() if search_index else None,
+            "stages": STAGE_SECONDS.summary()
+        }
+    }
+
+async def collect_component_metrics() -> list:
+    """Cache, Gemini client, executor and job queue numbers at scrape time"""
+    cache_stats = result_cache.stats()["namespaces"]
+    backend_stats = analysis_service.stats()
+    lanes = executor.stats()
+    jobs = await job_queue.stats()
+    families = [
+        ("cache_hits_total", "counter", "Result cache hits",
+         [({"namespace": ns}, item["hits"]) for ns, item in cache_stats.items()]),
+        ("cache_misses_total", "counter", "Result cache misses",
+         [({"namespace": ns}, item["misses"]) for ns, item in cache_stats.items()]),
+        ("cache_hit_ratio", "gauge", "Result cache hit ratio",
+         [({"namespace": ns}, item["hit_ratio"]) for ns, item in cache_stats.items()]),
+        ("executor_running", "gauge", "Jobs running per executor lane",
+         [({"lane": lane}, lanes[lane]["running"]) for lane in ("pdf", "ocr", "llm")]),
+        ("executor_queued", "gauge", "Jobs waiting per executor lane",
+         [({"lane": lane}, lanes[lane]["queued"]) for lane in ("pdf", "ocr", "llm")]),
+        ("jobs_pending", "gauge", "Queued analysis jobs", [({}, jobs["pending"])]),
+        ("jobs_finished_total", "counter", "Finished analysis jobs",
+         [({"status": "completed"}, jobs["completed"]), ({"status": "failed"}, jobs["failed"])]),
+    ]
+    if backend_stats["gemini"]:
+        gemini = backend_stats["gemini"]
+        families += [
+            ("gemini_requests_total", "counter", "Gemini requests sent (including retries)", [({}, gemini["requests"])]),
+            ("gemini_retries_total", "counter", "Gemini requests retried", [({}, gemini["retries"])]),
+            ("gemini_rate_limited_total", "counter", "Gemini 429 responses", [({}, gemini["rate_limited"])]),
+            ("gemini_failures_total", "counter", "Gemini calls that gave up", [({}, gemini["failed"])]),
+            ("gemini_short_circuited_total", "counter", "Calls rejected by the open circuit", [({}, gemini["short_circuited"])]),
+            ("gemini_tokens_total", "counter", "Tokens reported by Gemini", [({}, gemini["tokens_used"])]),
+            ("gemini_circuit_open", "gauge", "1 while the circuit breaker is open", [({}, int(gemini["circuit"] != "closed"))]),
+        ]
+    if backend_stats["artifacts"]:
+        artifacts = backend_stats["artifacts"]
+        families += [
+            ("artifact_resumes", "gauge", "Analyzed resumes kept for re-scoring", [({}, artifacts["resumes"])]),
+            ("rescored_analyses_total", "counter", "Analyses carried over to a new JD version without the model",
+             [({}, artifacts["rescored"])]),
+        ]
+    if backend_stats["dedup"]:
+        dedup = backend_stats["dedup"]
+        families += [
+            ("dedup_resumes", "gauge", "Resume signatures in the near-duplicate index", [({}, dedup["resumes"])]),
+            ("dedup_checks_total", "counter", "Resumes checked for near-duplicates",
+             [({"outcome": "duplicate"}, dedup["duplicates_found"]),
+              ({"outcome": "unique"}, dedup["checked"] - dedup["duplicates_found"])]),
+            ("dedup_reused_total", "counter", "Near-duplicate analyses reused instead of a model call",
+             [({}, dedup["reused"])]),
+        ]
+    screening = analysis_service.screening.report()
+    families.append(
+        ("screening_llm_call_reduction", "gauge", "Share of tiered-mode resumes resolved without the model",
+         [({}, screening["llm_call_reduction"])])
+    )
+    if backend_stats["context_cache"]:
+        cached = backend_stats["context_cache"]
+        families += [
+            ("context_cache_entries", "gauge", "Live Gemini context caches", [({}, cached["entries"])]),
+            ("context_cache_events_total", "counter", "Gemini context cache lookups by outcome",
+             [({"event": event}, cached[event]) for event in
+              ("hits", "created", "refreshed", "expired_fallbacks", "create_failures", "ineligible")]),
+        ]
+    return families
+
+metrics_registry.add_collector(collect_component_metrics)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(
+        await metrics_registry.render(),
+        media_type="text/plain; version=0.0.4"
+    )
\ No newline at end of file
@@ -1,6 +1,6 @@
 # backend/app/models.py
-from pydantic import BaseModel
-from typing import Dict, List, Any, Optional
+from pydantic import BaseModel, model_validator
+from typing import List
 
 
 # Job Description for AI & Data Solution Intern position
@@ -59,23 +59,47 @@ class Scores(BaseModel):
     overall: float = 0
 
 
-class AnalysisDetails(BaseModel):
-    education_match: List[str] = []
-    skills_match: List[str] = []
-    skills_missing: List[str] = []
-    tools_match: List[str] = []
-    tools_missing: List[str] = []
-    experience_relevance: str = ""
+class AnalysisScores(Scores):
+    """Scores the model must always return (overall stays optional)"""
+    education: float
+    skills: float
+    experience: float
+    tools: float
+
+
+def _clamp_score(value: float) -> float:
+    return min(100.0, max(0.0, value))
+
+
+class AnalysisResult(BaseModel):
+    """
+    Model analysis as the API returns it. Also sent to Gemini as the
+    response schema, so replies are JSON of exactly this shape.
+    """
+    scores: AnalysisScores
+    match_percentage: float
     strengths: List[str] = []
     weaknesses: List[str] = []
+    recommendations: List[str] = []
+    matched_skills: List[str] = []
+    missing_skills: List[str] = []
 
+    @model_validator(mode="after")
+    def clamp_scores(self):
+        overall_given = "overall" in self.scores.model_fields_set
+        for name, value in self.scores:
+            setattr(self.scores, name, _clamp_score(value))
+        self.match_percentage = _clamp_score(self.match_percentage)
+        if not overall_given:
+            self.scores.overall = self.match_percentage
+        return self
 
-class ResumeAnalysis(BaseModel):
-    resume_id: str
-    filename: str
-    extracted_text: str
-    scores: Dict[str, float]
-    analysis_details: Dict[str, Any]
-    recommendations: List[str]
-    match_percentage: float
-    processing_time: float
+
+class BatchAnalysisItem(AnalysisResult):
+    """One entry of a multi-resume reply"""
+    resume_index: int
+
+
+class JDAnalysisItem(AnalysisResult):
+    """One entry of a one-resume, several-positions reply"""
+    jd_index: int
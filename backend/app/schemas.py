@@ -10,7 +10,8 @@ class AnalysisData(BaseModel):
     file_size: Optional[int] = None
     extracted_text_length: Optional[int] = None
     analysis: Optional[Dict[str, Any]] = None
-    processing_time: Optional[str] = None
+    processing_time: Optional[float] = None
+    timings: Optional[Dict[str, float]] = None
     job_description: Optional[Dict[str, Any]] = None
 
 
@@ -19,3 +20,33 @@ class AnalysisResponse(BaseModel):
     success: bool
     data: Optional[AnalysisData] = None
     error: Optional[str] = None
+
+
+class RankResume(BaseModel):
+    """One already-extracted resume to rank"""
+    id: str
+    text: str
+
+
+class RankRequest(BaseModel):
+    """Request model for ranking a candidate pool by extracted text"""
+    resumes: List[RankResume]
+    top_k: int = 10
+
+
+class JobDescriptionIn(BaseModel):
+    """Job description to register; only position and one term list are required"""
+    id: Optional[str] = None
+    position: str
+    required_education: List[str] = []
+    required_skills: List[str] = []
+    preferred_skills: List[str] = []
+    required_tools: List[str] = []
+    preferred_tools: List[str] = []
+    responsibilities: List[str] = []
+    weights: Optional[Dict[str, float]] = None
+    screening: Optional[Dict[str, float]] = None
+
+    def to_jd(self) -> Dict[str, Any]:
+        jd = self.model_dump(exclude={"id"}, exclude_none=True)
+        return {key: value for key, value in jd.items() if value}
@@ -1,5 +1,9 @@
+from dotenv import load_dotenv
+
+# GEMINI_API_KEY, ANALYSIS_BACKEND etc. may come from backend/.env
+load_dotenv()
+
 from .ocr_service import OCRService
-from .gemini_service import GeminiService
 from .analysis_service import AnalysisService
 
-__all__ = ['OCRService', 'GeminiService', 'AnalysisService']
\ No newline at end of file
+__all__ = ['OCRService', 'AnalysisService']
\ No newline at end of file
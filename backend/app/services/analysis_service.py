@@ -1,64 +1,704 @@
-from typing import Dict, Any, Tuple
+# backend/app/services/analysis_service.py
+import asyncio
 import time
-from .ocr_service import OCRService
-from .gemini_service import GeminiService
-from app.models import JD_AI_DATA_INTERN, ResumeAnalysis
 import uuid
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
 import logging
 
+from .artifacts import ArtifactStore, rescore_judgment
+from .backends import PROMPT_VERSION, ModelBackend, ModelUnavailableError
+from .cache import make_key
+from .coalescer import MODEL_COALESCE_WINDOW_MS, RequestCoalescer
+from .condenser import condense_resume
+from .dedup import DuplicateIndex
+from .jd_registry import CompiledJD, JDRegistry
+from .json_stream import JsonSectionParser
+from .metrics import (
+    ANALYSIS_FALLBACKS,
+    SCREENING_DECISIONS,
+    format_timings,
+    request_timings,
+    stage,
+    token_usage_report,
+)
+from .ocr_service import OCR_ENABLED, PDF_TEXT_BUDGET, PdfSource, extract_pdf_parallel, load_pymupdf, warm_up_worker
+from .structured_output import parse_model_output
+from .tiering import (
+    ANALYSIS_MODE,
+    DECISION_BORDERLINE,
+    TIER_CACHE,
+    TIER_DUPLICATE,
+    TIER_FALLBACK,
+    TIER_LOCAL,
+    TIER_MODEL,
+    TIER_RESCORED,
+    ScreeningBand,
+    ScreeningStats,
+    tier_info,
+)
+from .uploads import SpooledPDF, as_spooled_pdf
+
 logger = logging.getLogger(__name__)
 
+
+class AnalysisInputError(ValueError):
+    """The upload cannot be analyzed (maps to a 400 response)"""
+
+
+class PdfExtractor:
+    """
+    Extractor stage: PyMuPDF text layer in the executor's PDF pool, up to
+    PDF_TEXT_BUDGET characters, with page count and per-page timings.
+    Scanned pages are OCR'd; text and OCR results are cached by hash.
+    """
+
+    def __init__(self, executor: Any, cache: Any = None):
+        self.executor = executor
+        self.cache = cache
+
+    async def extract(self, source: PdfSource, pdf_hash: str) -> Dict[str, Any]:
+        text_key = make_key(pdf_hash, PDF_TEXT_BUDGET)
+        cached = await self.cache.aget("text", text_key) if self.cache else None
+        if cached is not None:
+            return {**cached, "cached": True}
+
+        try:
+            with stage("pdf_parse"):
+                extraction = await extract_pdf_parallel(self.executor, source, cache=self.cache)
+        except Exception as e:
+            logger.error(f"PDF extraction error: {e}")
+            raise AnalysisInputError("Failed to extract text from PDF") from e
+
+        # Don't pin a partial result when OCR failed or ran out of time
+        if self.cache and (not OCR_ENABLED or len(extraction["ocr_pages"]) == len(extraction["scanned_pages"])):
+            self.cache.set("text", text_key, extraction)
+        return {**extraction, "cached": False}
+
+    async def warm_up(self):
+        """Load PyMuPDF here and in every PDF/OCR pool worker"""
+        await asyncio.to_thread(load_pymupdf)
+        pids = await self.executor.warm_up(warm_up_worker)
+        logger.info(f"PDF workers ready ({len(set(pids))} processes)")
+
+
+class ResumeCondenser:
+    """Preprocessor stage: the resume text sent to the model (see condense_resume)"""
+
+    def prepare(self, resume_text: str, jds: List[CompiledJD]) -> str:
+        if len(jds) == 1:
+            return jds[0].condense(resume_text)
+        return condense_resume(resume_text, relevance=lambda text: sum(jd.relevance(text) for jd in jds))
+
+
 class AnalysisService:
-    def __init__(self):
-        self.ocr_service = OCRService()
-        self.gemini_service = GeminiService()
-        
-    async def analyze_resume(self, file_content: bytes, filename: str) -> ResumeAnalysis:
+    """
+    The analysis pipeline: extractor -> preprocessor -> scorers -> aggregator.
+
+    Every resume is scored by its JD's local scorer (one regex pass). The
+    model backend (see backends.make_backend; None for local-only) is
+    asked as well unless tiered mode settles the resume from the local
+    score. The aggregator returns the model's analysis, or the local one
+    when the model is skipped, unavailable or answers with invalid JSON.
+    Model analyses are cached per PDF hash, JD version, prompt version and
+    model; `on_analyzed(pdf_hash, text, filename, analysis, jd)` sees every
+    fresh analysis. Concurrent single-resume model calls go through a
+    RequestCoalescer unless MODEL_COALESCE_WINDOW_MS is 0. With an
+    ArtifactStore every fresh analysis is kept with its resume's signals,
+    so a JD change re-scores them (rescore) instead of re-calling the model.
+    With a DuplicateIndex every extracted resume is checked for near-
+    duplicates of earlier ones; when one has a model judgment for the JD,
+    it is adapted to this resume (reuse_duplicate) instead of a model call.
+    """
+
+    def __init__(
+        self,
+        jd_registry: JDRegistry,
+        extractor: PdfExtractor,
+        backend: Optional[ModelBackend] = None,
+        preprocessor: Optional[ResumeCondenser] = None,
+        cache: Any = None,
+        on_analyzed: Optional[Callable[..., None]] = None,
+        artifacts: Optional[ArtifactStore] = None,
+        dedup: Optional[DuplicateIndex] = None,
+    ):
+        self.jd_registry = jd_registry
+        self.extractor = extractor
+        self.backend = backend
+        self.preprocessor = preprocessor or ResumeCondenser()
+        self.cache = cache
+        self.on_analyzed = on_analyzed
+        self.artifacts = artifacts
+        self.dedup = dedup
+        # Tiered-mode screening outcomes per JD (LLM-call reduction report)
+        self.screening = ScreeningStats()
+        # Set once warm_up() has loaded PyMuPDF, started the PDF workers
+        # and connected the backend
+        self.ready = False
+        self.warm_up_ms: Optional[float] = None
+        self.coalescer = RequestCoalescer(backend) if backend is not None and MODEL_COALESCE_WINDOW_MS > 0 else None
+        if backend is not None:
+            jd_registry.add_listener(backend.jd_changed)
+        jd_registry.add_listener(self._jd_changed)
+
+    @property
+    def model_name(self) -> str:
+        return self.backend.model if self.backend else "local"
+
+    @property
+    def model_available(self) -> bool:
+        return self.backend is not None and self.backend.available
+
+    def _jd(self, jd: Optional[CompiledJD]) -> CompiledJD:
+        return jd or self.jd_registry.default
+
+    # Cache
+
+    def cache_key(self, pdf_hash: str, jd: Optional[CompiledJD] = None) -> str:
+        """Cache key for an analysis of one PDF against a JD, prompt and model"""
+        return make_key(pdf_hash, self._jd(jd).version, PROMPT_VERSION, self.model_name)
+
+    async def lookup(self, pdf_hash: str, jd: Optional[CompiledJD] = None) -> Optional[Dict[str, Any]]:
+        """Cached analysis, or a model analysis re-scored for this JD version"""
+        cache_key = self.cache_key(pdf_hash, jd)
+        cached = await self.cache.aget("analysis", cache_key) if self.cache else None
+        if cached is None and self.artifacts is not None:
+            cached = self.artifacts.rescored_analysis(pdf_hash, self._jd(jd), cache_key)
+        return cached
+
+    def _store(self, cache_key: Optional[str], analysis: Dict[str, Any], resume_text: str, **extra: Any):
+        if cache_key and self.cache:
+            self.cache.set("analysis", cache_key, {
+                "analysis": analysis,
+                "extracted_text_length": len(resume_text),
+                **extra,
+            })
+
+    def record(
+        self,
+        pdf_hash: str,
+        resume_text: str,
+        filename: str,
+        analysis: Dict[str, Any],
+        jd: Optional[CompiledJD],
+        tier: str,
+    ):
+        """Keep a fresh analysis (`tier`: who produced it) for re-scoring and pass it to on_analyzed"""
+        jd = self._jd(jd)
+        if self.artifacts is not None:
+            self.artifacts.record(pdf_hash, resume_text, filename, jd, analysis, tier, self.cache_key(pdf_hash, jd))
+        if self.dedup is not None:
+            self.dedup.add(pdf_hash, filename, resume_text)
+        if self.on_analyzed:
+            self.on_analyzed(pdf_hash, resume_text, filename, analysis, jd)
+
+    def _jd_changed(self, event: str, jd: CompiledJD):
+        if event == "deleted" and self.artifacts is not None:
+            self.artifacts.forget_jd(jd.jd_id)
+
+    # Re-scoring
+
+    async def rescore(self, jd: CompiledJD) -> Optional[Dict[str, Any]]:
+        """
+        Carry every stored analysis against this JD over to its current
+        version without model calls (see ArtifactStore.rescore); None when
+        no artifacts are kept
+        """
+        if self.artifacts is None:
+            return None
+        return await asyncio.to_thread(self.artifacts.rescore, jd, lambda pdf_hash: self.cache_key(pdf_hash, jd))
+
+    async def rank_stored(self, jd: CompiledJD, k: int = 10) -> Optional[Dict[str, Any]]:
+        """Every stored resume ranked for the JD's current version; None when no artifacts are kept"""
+        if self.artifacts is None:
+            return None
+        await self.rescore(jd)
+        return await asyncio.to_thread(self.artifacts.rank, jd, k)
+
+    # Near-duplicates
+
+    def near_duplicates(self, pdf_hash: str, resume_text: str) -> List[Dict[str, Any]]:
+        """Earlier resumes whose text is a near-duplicate of this one, most similar first"""
+        if self.dedup is None:
+            return []
+        with stage("dedup"):
+            return self.dedup.find(resume_text, exclude=pdf_hash)
+
+    def reuse_duplicate(
+        self, duplicates: List[Dict[str, Any]], resume_text: str, pdf_hash: str, jd: CompiledJD
+    ) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """
+        (analysis, duplicate) from the most similar near-duplicate with a
+        model judgment for this JD under the current prompt and model, or
+        None. The judgment is adapted like a JD edit (rescore_judgment):
+        categories where this resume's local score differs are shifted by
+        the difference. The result is cached under this PDF's key.
+        """
+        if self.artifacts is None:
+            return None
+        for duplicate in duplicates:
+            judgment = self.artifacts.judgment(duplicate["resume_id"], jd.jd_id)
+            if not judgment or judgment["source"] != TIER_MODEL:
+                continue
+            # Judged by another prompt or model: not reusable
+            if judgment["key"] != make_key(duplicate["resume_id"], judgment["version"], PROMPT_VERSION, self.model_name):
+                continue
+            cache_key = self.cache_key(pdf_hash, jd)
+            analysis = rescore_judgment(judgment, jd, cache_key, jd.scorer.match(resume_text))["analysis"]
+            self._store(cache_key, analysis, resume_text, duplicate=duplicate)
+            self.dedup.count_reused()
+            logger.info(f"Near-duplicate of {duplicate['filename']} ({duplicate['similarity']}): reusing its analysis")
+            return analysis, duplicate
+        return None
+
+    # Stages
+
+    async def extract(self, source: PdfSource, pdf_hash: str) -> Dict[str, Any]:
+        return await self.extractor.extract(source, pdf_hash)
+
+    async def extract_text(self, source: PdfSource, pdf_hash: str) -> str:
+        return (await self.extract(source, pdf_hash))["text"]
+
+    def local_analysis(self, resume_text: str, jd: Optional[CompiledJD] = None) -> Dict[str, Any]:
+        """Score the resume locally against the JD"""
+        with stage("local_score"):
+            return self._jd(jd).scorer.match(resume_text).as_analysis()
+
+    def screen(self, local_analysis: Dict[str, Any], jd: CompiledJD) -> str:
+        """Tiered-mode decision on a local analysis: reject, accept or borderline (ask the model)"""
+        decision = jd.band.decide(local_analysis["match_percentage"])
+        self.screening.record(jd.jd_id, decision)
+        SCREENING_DECISIONS.inc(decision=decision)
+        return decision
+
+    def screen_batch_item(
+        self, resume_text: str, pdf_hash: str, tiered: bool = True
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Batch pre-screen: (local or near-duplicate analysis, or None to
+        send the resume to the model; tier block)
+        """
+        jd = self.jd_registry.default
+        local_analysis = self.local_analysis(resume_text, jd)
+        band = jd.band if tiered else None
+        if tiered and self.screen(local_analysis, jd) != DECISION_BORDERLINE:
+            return local_analysis, tier_info(TIER_LOCAL, local_analysis, band)
+        if self.backend is not None:
+            reused = self.reuse_duplicate(self.near_duplicates(pdf_hash, resume_text), resume_text, pdf_hash, jd)
+            if reused is not None:
+                return reused[0], self._duplicate_tier(reused[1], local_analysis, band)
+        return None, tier_info(TIER_MODEL, local_analysis, band) if tiered else None
+
+    @staticmethod
+    def _duplicate_tier(
+        duplicate: Dict[str, Any], local_analysis: Dict[str, Any], band: Optional[ScreeningBand]
+    ) -> Dict[str, Any]:
+        return {
+            **tier_info(TIER_DUPLICATE, local_analysis, band),
+            "duplicate_of": duplicate["resume_id"],
+            "similarity": duplicate["similarity"],
+        }
+
+    def _fallback(self, reason: str, count: int = 1):
+        ANALYSIS_FALLBACKS.inc(count, reason=reason)
+
+    async def model_analysis(
+        self,
+        resume_text: str,
+        cache_key: Optional[str] = None,
+        jd: Optional[CompiledJD] = None,
+        local_analysis: Optional[Dict[str, Any]] = None,
+        coalesce: bool = True,
+    ) -> Dict[str, Any]:
         """
-        Main analysis pipeline
+        Ask the model backend about one resume. The reply is schema-checked
+        (and repaired locally if malformed), so a bad reply falls back to
+        local scoring instead of a second call. Model results are stored
+        under `cache_key`; the precomputed `local_analysis` is returned (and
+        not cached) as the fallback. coalesce=False skips the coalescer, for
+        retries of items a combined request already got wrong.
         """
-        start_time = time.time()
-        
+        jd = self._jd(jd)
+        if not self.model_available:
+            if self.backend is not None:
+                self._fallback("no_client")
+            return local_analysis or self.local_analysis(resume_text, jd)
+
+        with stage("preprocess"):
+            prepared = self.preprocessor.prepare(resume_text, [jd])
+        # Transport errors and rate limits are retried inside the backend
         try:
-            # Step 1: Extract text from PDF
-            logger.info("Extracting text from PDF...")
-            extracted_text = self.ocr_service.extract_text_from_pdf(file_content)
-            
-            if not extracted_text:
-                raise ValueError("Could not extract text from PDF")
-            
-            # Step 2: Analyze with Gemini
-            logger.info("Analyzing resume with Gemini...")
-            analysis_result = self.gemini_service.analyze_resume(
-                extracted_text, 
-                JD_AI_DATA_INTERN
+            if coalesce and self.coalescer is not None:
+                analysis = await self.coalescer.analyze(prepared, jd)
+            else:
+                analysis = await self.backend.analyze(prepared, jd)
+            logger.info("AI analysis completed successfully!")
+            self._store(cache_key, analysis, resume_text)
+            return analysis
+        except ModelUnavailableError as e:
+            logger.warning(f"Model unavailable: {e}")
+            reason = "unavailable"
+        except Exception as e:
+            logger.error(f"Model analysis error: {e}")
+            reason = "invalid_response"
+
+        logger.info("Returning local analysis due to API limitations.")
+        self._fallback(reason)
+        return local_analysis or self.local_analysis(resume_text, jd)
+
+    async def tiered_model_analysis(
+        self, resume_text: str, cache_key: Optional[str], jd: CompiledJD, coalesce: bool = True
+    ) -> Tuple[Dict[str, Any], str]:
+        """model_analysis plus who answered: TIER_MODEL, TIER_FALLBACK, or TIER_LOCAL without a backend"""
+        local_analysis = self.local_analysis(resume_text, jd)
+        analysis = await self.model_analysis(resume_text, cache_key, jd, local_analysis, coalesce=coalesce)
+        if analysis is not local_analysis:
+            return analysis, TIER_MODEL
+        return analysis, TIER_LOCAL if self.backend is None else TIER_FALLBACK
+
+    # Pipelines
+
+    async def analyze(
+        self,
+        content: Union[bytes, SpooledPDF],
+        filename: str,
+        jd: Optional[CompiledJD] = None,
+        mode: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Run the pipeline for one PDF against a registered JD (default if None)
+        and return the response `data` payload. In "tiered" mode (ANALYSIS_MODE
+        unless given) only resumes in the JD's uncertainty band reach the model.
+        """
+        with request_timings() as timings:
+            started = time.perf_counter()
+            data = await self._analyze(content, filename, self._jd(jd), mode or ANALYSIS_MODE)
+            data["processing_time"] = round(time.perf_counter() - started, 3)
+            data["timings"] = format_timings(timings)
+            data["tokens"] = token_usage_report()
+            return data
+
+    async def _analyze(self, content: Union[bytes, SpooledPDF], filename: str, jd: CompiledJD, mode: str) -> Dict[str, Any]:
+        # Same PDF against the same JD/prompt/model: skip parsing and the model
+        pdf = as_spooled_pdf(content, filename)
+        pdf_hash = pdf.sha256
+        cache_key = self.cache_key(pdf_hash, jd)
+        cached = await self.lookup(pdf_hash, jd)
+
+        extraction = None
+        if cached is not None:
+            logger.info(f"Cache hit for file: {filename}")
+            analysis_result = cached["analysis"]
+            extracted_text_length = cached["extracted_text_length"]
+            tier = tier_info(TIER_RESCORED if cached.get("rescored") else TIER_CACHE)
+            duplicates = [cached["duplicate"]] if cached.get("duplicate") else []
+        else:
+            logger.info(f"Processing file: {filename}")
+            extraction = await self.extract(pdf.source, pdf_hash)
+            resume_text = extraction["text"]
+            if not resume_text:
+                raise AnalysisInputError("No text found in PDF")
+            extracted_text_length = len(resume_text)
+
+            # Local pre-screen: one regex pass, and the fallback if the model fails
+            local_analysis = self.local_analysis(resume_text, jd)
+            duplicates = self.near_duplicates(pdf_hash, resume_text)
+            band = jd.band if mode == "tiered" else None
+            if mode == "tiered" and self.screen(local_analysis, jd) != DECISION_BORDERLINE:
+                analysis_result = local_analysis
+                tier = tier_info(TIER_LOCAL, local_analysis, band)
+            elif self.backend is None:
+                analysis_result = local_analysis
+                tier = tier_info(TIER_LOCAL, local_analysis, band)
+            else:
+                reused = self.reuse_duplicate(duplicates, resume_text, pdf_hash, jd)
+                if reused is not None:
+                    analysis_result = reused[0]
+                    tier = self._duplicate_tier(reused[1], local_analysis, band)
+                else:
+                    logger.info("Analyzing resume with AI...")
+                    analysis_result = await self.model_analysis(resume_text, cache_key, jd, local_analysis)
+                    tier = tier_info(
+                        TIER_FALLBACK if analysis_result is local_analysis else TIER_MODEL, local_analysis, band
+                    )
+            self.record(pdf_hash, resume_text, filename, analysis_result, jd, tier["tier"])
+
+        return {
+            "analysis_id": str(uuid.uuid4()),
+            "resume_id": pdf_hash,
+            "filename": filename,
+            "file_size": pdf.size,
+            "extracted_text_length": extracted_text_length,
+            "extraction": {key: value for key, value in extraction.items() if key != "text"} if extraction else None,
+            "analysis": analysis_result,
+            "tier": tier,
+            "duplicates": duplicates,
+            "jd_id": jd.jd_id,
+            "job_description": jd.jd,
+            "cache": {
+                "hit": cached is not None,
+                **(self.cache.stats()["namespaces"].get("analysis", {}) if self.cache else {}),
+            },
+        }
+
+    async def analyze_events(
+        self,
+        content: Union[bytes, SpooledPDF],
+        filename: str,
+        jd: Optional[CompiledJD] = None,
+        mode: Optional[str] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Events for one resume as soon as each piece is known: extraction stats,
+        the local keyword match, model sections as they finish streaming, then
+        the complete analysis. Every event carries elapsed_ms since the start.
+        In tiered mode clear rejects/fits complete right after the local match.
+        """
+        started = time.perf_counter()
+
+        def event(name: str, **fields: Any) -> Dict[str, Any]:
+            return {"event": name, "elapsed_ms": round((time.perf_counter() - started) * 1000, 3), **fields}
+
+        jd = self._jd(jd)
+        pdf = as_spooled_pdf(content, filename)
+        yield event("start", filename=filename, file_size=pdf.size, jd_id=jd.jd_id)
+
+        pdf_hash = pdf.sha256
+        cache_key = self.cache_key(pdf_hash, jd)
+        cached = await self.lookup(pdf_hash, jd)
+        if cached is not None:
+            yield event(
+                "complete",
+                source="cache",
+                tier=tier_info(TIER_RESCORED if cached.get("rescored") else TIER_CACHE),
+                extracted_text_length=cached["extracted_text_length"],
+                analysis=cached["analysis"],
+                duplicates=[cached["duplicate"]] if cached.get("duplicate") else [],
             )
-            
-            # Step 3: Calculate overall match percentage
-            scores = analysis_result["scores"]
-            match_percentage = (
-                scores["education"] * 0.25 +
-                scores["skills"] * 0.30 +
-                scores["experience"] * 0.25 +
-                scores["tools"] * 0.20
+            return
+
+        try:
+            extraction = await self.extract(pdf.source, pdf_hash)
+        except AnalysisInputError as e:
+            yield event("error", error=str(e))
+            return
+        resume_text = extraction["text"]
+        if not resume_text:
+            yield event("error", error="No text found in PDF")
+            return
+
+        yield event(
+            "extracted",
+            extracted_text_length=len(resume_text),
+            extraction={key: value for key, value in extraction.items() if key != "text"},
+        )
+
+        local_analysis = self.local_analysis(resume_text, jd)
+        yield event("local", analysis=local_analysis)
+        duplicates = self.near_duplicates(pdf_hash, resume_text)
+        if duplicates:
+            yield event("duplicates", duplicates=duplicates)
+
+        mode = mode or ANALYSIS_MODE
+        band = jd.band if mode == "tiered" else None
+
+        def complete_locally(tier: str) -> Dict[str, Any]:
+            self.record(pdf_hash, resume_text, filename, local_analysis, jd, tier)
+            return event(
+                "complete",
+                source="local",
+                tier=tier_info(tier, local_analysis, band),
+                extracted_text_length=len(resume_text),
+                analysis=local_analysis,
             )
-            
-            # Step 4: Create response
-            processing_time = time.time() - start_time
-            
-            resume_analysis = ResumeAnalysis(
-                resume_id=str(uuid.uuid4()),
-                filename=filename,
-                extracted_text=extracted_text[:500] + "..." if len(extracted_text) > 500 else extracted_text,
-                scores=scores,
-                analysis_details=analysis_result["analysis_details"],
-                recommendations=analysis_result["recommendations"],
-                match_percentage=round(match_percentage, 2),
-                processing_time=round(processing_time, 2)
+
+        if mode == "tiered" and self.screen(local_analysis, jd) != DECISION_BORDERLINE:
+            yield complete_locally(TIER_LOCAL)
+            return
+        if self.backend is None:
+            yield complete_locally(TIER_LOCAL)
+            return
+        reused = self.reuse_duplicate(duplicates, resume_text, pdf_hash, jd)
+        if reused is not None:
+            analysis, duplicate = reused
+            self.record(pdf_hash, resume_text, filename, analysis, jd, TIER_DUPLICATE)
+            yield event(
+                "complete",
+                source="duplicate",
+                tier=self._duplicate_tier(duplicate, local_analysis, band),
+                extracted_text_length=len(resume_text),
+                analysis=analysis,
             )
-            
-            return resume_analysis
-            
+            return
+        if not self.model_available:
+            self._fallback("no_client")
+            yield complete_locally(TIER_FALLBACK)
+            return
+
+        with stage("preprocess"):
+            prepared = self.preprocessor.prepare(resume_text, [jd])
+        parser = JsonSectionParser()
+        try:
+            with stage("model_call"):
+                async for text in self.backend.stream(prepared, jd):
+                    for key, value in parser.feed(text):
+                        yield event("section", key=key, value=value)
+            with stage("json_parse"):
+                analysis = parse_model_output(parser.text())
+        except Exception as e:
+            reason = "unavailable" if isinstance(e, ModelUnavailableError) else "invalid_response"
+            logger.warning(f"Streaming analysis failed ({reason}): {e}. Using local analysis.")
+            self._fallback(reason)
+            yield complete_locally(TIER_FALLBACK)
+            return
+
+        self._store(cache_key, analysis, resume_text)
+        self.record(pdf_hash, resume_text, filename, analysis, jd, TIER_MODEL)
+        yield event(
+            "complete",
+            source="model",
+            tier=tier_info(TIER_MODEL, local_analysis, band),
+            extracted_text_length=len(resume_text),
+            analysis=analysis,
+        )
+
+    async def analyze_pack(self, resume_texts: List[str], pdf_hashes: List[str]) -> List[Tuple[Dict[str, Any], str]]:
+        """
+        Analyze several resumes against the default JD with a single model
+        request. Items missing or malformed in the combined reply are
+        re-analyzed one by one. Returns (analysis, tier) per resume; the
+        tier tells model answers from local fallbacks.
+        """
+        jd = self.jd_registry.default
+        cache_keys = [self.cache_key(pdf_hash, jd) for pdf_hash in pdf_hashes]
+        if not self.model_available or len(resume_texts) == 1:
+            return await asyncio.gather(*[
+                self.tiered_model_analysis(text, key, jd) for text, key in zip(resume_texts, cache_keys)
+            ])
+
+        analyses: List[Optional[Dict[str, Any]]] = [None] * len(resume_texts)
+        try:
+            with stage("preprocess"):
+                prepared = [self.preprocessor.prepare(text, [jd]) for text in resume_texts]
+            analyses = await self.backend.analyze_many(prepared, jd)
+        except ModelUnavailableError as e:
+            logger.warning(f"Model unavailable for batch request: {e}. Using local analysis.")
+            self._fallback("unavailable", len(resume_texts))
+            return [(self.local_analysis(text, jd), TIER_FALLBACK) for text in resume_texts]
         except Exception as e:
-            logger.error(f"Error in analysis pipeline: {e}")
-            raise
\ No newline at end of file
+            logger.error(f"Model batch analysis error: {e}")
+
+        results: List[Optional[Tuple[Dict[str, Any], str]]] = [None] * len(resume_texts)
+        for index, (analysis, text, key) in enumerate(zip(analyses, resume_texts, cache_keys)):
+            if analysis is not None:
+                self._store(key, analysis, text)
+                results[index] = (analysis, TIER_MODEL)
+
+        missing = [index for index, result in enumerate(results) if result is None]
+        if missing:
+            logger.info(f"Re-analyzing {len(missing)} of {len(analyses)} resumes individually")
+            retried = await asyncio.gather(*[
+                self.tiered_model_analysis(resume_texts[index], cache_keys[index], jd, coalesce=False)
+                for index in missing
+            ])
+            for index, result in zip(missing, retried):
+                results[index] = result
+        return results
+
+    async def analyze_against_jds(
+        self, resume_text: str, pdf_hash: str, jds: List[CompiledJD], filename: str
+    ) -> List[Dict[str, Any]]:
+        """
+        Analyze one resume against several JDs. Cached pairs are reused; the
+        rest share a single model request, and items missing or malformed in
+        its output are re-analyzed one by one. Each result's `source` is the
+        tier that answered; fresh results are recorded like single analyses
+        so they can be re-scored and ranked.
+        """
+        cache_keys = [self.cache_key(pdf_hash, jd) for jd in jds]
+        analyses: List[Optional[Dict[str, Any]]] = [None] * len(jds)
+        sources: List[Optional[str]] = [None] * len(jds)
+        for index, jd in enumerate(jds):
+            cached = await self.lookup(pdf_hash, jd)
+            if cached is not None:
+                analyses[index] = cached["analysis"]
+                sources[index] = TIER_RESCORED if cached.get("rescored") else TIER_CACHE
+
+        pending = [index for index, analysis in enumerate(analyses) if analysis is None]
+        if self.model_available and len(pending) > 1:
+            pending_jds = [jds[index] for index in pending]
+            try:
+                with stage("preprocess"):
+                    prepared = self.preprocessor.prepare(resume_text, pending_jds)
+                for index, item in zip(pending, await self.backend.analyze_jds(prepared, pending_jds)):
+                    if item is not None:
+                        analyses[index] = item
+                        sources[index] = TIER_MODEL
+                        self._store(cache_keys[index], item, resume_text)
+            except ModelUnavailableError as e:
+                logger.warning(f"Model unavailable for multi-JD request: {e}. Using local analysis.")
+                self._fallback("unavailable", len(pending))
+                for index in pending:
+                    analyses[index] = self.local_analysis(resume_text, jds[index])
+                    sources[index] = TIER_FALLBACK
+            except Exception as e:
+                # Every pending item is retried alone below
+                logger.error(f"Model multi-JD analysis error: {e}")
+
+        missing = [index for index, analysis in enumerate(analyses) if analysis is None]
+        if missing:
+            retried = await asyncio.gather(*[
+                self.tiered_model_analysis(resume_text, cache_keys[index], jds[index], coalesce=False)
+                for index in missing
+            ])
+            for index, (analysis, tier) in zip(missing, retried):
+                analyses[index] = analysis
+                sources[index] = tier
+
+        for jd, source, analysis in zip(jds, sources, analyses):
+            if source not in (TIER_CACHE, TIER_RESCORED):
+                self.record(pdf_hash, resume_text, filename, analysis, jd, source)
+
+        return [
+            {"jd_id": jd.jd_id, "position": jd.position, "source": source, "analysis": analysis}
+            for jd, source, analysis in zip(jds, sources, analyses)
+        ]
+
+    async def warm_up(self):
+        """
+        Get every stage ready for traffic so the first requests don't pay
+        for imports, process start-up and connection set-up. A stage that
+        fails to warm up is logged and left to start on first use.
+        """
+        started = time.perf_counter()
+        stages = [self.extractor.warm_up()]
+        if self.backend is not None:
+            stages.append(self.backend.warm_up())
+        if self.dedup is not None:
+            stages.append(asyncio.to_thread(self.dedup.warm_up))
+        for result in await asyncio.gather(*stages, return_exceptions=True):
+            if isinstance(result, Exception):
+                logger.warning(f"Warm-up step failed: {result}")
+        self.warm_up_ms = round((time.perf_counter() - started) * 1000, 3)
+        self.ready = True
+        logger.info(f"Analysis service ready in {self.warm_up_ms} ms")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": {
+                "name": self.backend.name if self.backend else "local",
+                "model": self.model_name,
+                "available": self.model_available,
+            },
+            "coalescer": self.coalescer.stats() if self.coalescer else None,
+            "artifacts": self.artifacts.stats() if self.artifacts else None,
+            "dedup": self.dedup.stats() if self.dedup else None,
+            "gemini": None,
+            "context_cache": None,
+            **(self.backend.stats() if self.backend else {}),
+        }
+
+    async def close(self):
+        if self.coalescer:
+            await self.coalescer.close()
+        if self.backend:
+            await self.backend.close()
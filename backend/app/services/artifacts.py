@@ -0,0 +1,448 @@
+# backend/app/services/artifacts.py
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple
+import logging
+
+from .jd_registry import CompiledJD
+from .local_scorer import CATEGORY_WEIGHTS, LocalMatch, ResumeSignals, TermScanner
+from .tiering import TIER_FALLBACK, TIER_LOCAL, TIER_MODEL
+
+logger = logging.getLogger(__name__)
+
+# Resumes kept for re-scoring (0 disables the store) and an optional
+# SQLite file so they survive restarts
+ARTIFACT_STORE_SIZE = int(os.getenv("ARTIFACT_STORE_SIZE", "5000"))
+ARTIFACT_STORE_DB = os.getenv("ARTIFACT_STORE_DB") or None
+
+
+class JDTerms:
+    """A JD's terms (as written and lowercased) and responsibility words, worked out once per JD"""
+
+    def __init__(self, jd: CompiledJD):
+        self.terms = [(term, term.lower()) for values in jd.scorer.fields.values() for term in values]
+        self.lowered = frozenset(lowered for _, lowered in self.terms)
+        self.words = jd.scorer.responsibility_words
+
+
+def _skill_lists(jd: CompiledJD) -> List[str]:
+    return jd.jd.get("required_skills", []) + jd.jd.get("preferred_skills", [])
+
+
+def _clamp(value: float) -> float:
+    return round(min(100.0, max(0.0, value)), 2)
+
+
+def _blend(scores: Dict[str, Any], weights: Dict[str, float]) -> float:
+    return sum(float(scores.get(key) or 0) * weight for key, weight in weights.items())
+
+
+@dataclass
+class ResumeArtifacts:
+    """
+    What a resume's analyses are derived from: the extracted text
+    (normalized for TermScanner), which JD terms and responsibility words
+    it contains (every one checked so far), the JD-independent signals and
+    the latest judgment per JD id
+    """
+
+    resume_id: str
+    filename: str
+    text: str
+    text_length: int
+    degree_found: bool
+    experience_signals: int
+    years_of_experience: int
+    terms: Dict[str, bool] = field(default_factory=dict)
+    responsibilities: Dict[str, bool] = field(default_factory=dict)
+    judgments: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    updated_at: float = field(default_factory=time.time)
+
+    def observe(self, vocabulary: JDTerms, signals: ResumeSignals):
+        """Remember which of the JD's terms a full scan found"""
+        found = {term.lower() for term in signals.terms}
+        for term in vocabulary.lowered:
+            self.terms[term] = term in found
+        for word in vocabulary.words:
+            self.responsibilities[word] = word in signals.responsibilities
+
+    def unchecked(self, vocabulary: JDTerms) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+        """JD terms and responsibility words this resume was never checked for"""
+        return (
+            vocabulary.lowered.difference(self.terms),
+            frozenset(word for word in vocabulary.words if word not in self.responsibilities),
+        )
+
+    def signals(self, vocabulary: JDTerms) -> ResumeSignals:
+        """The local scorer's signals for a JD whose terms have all been checked"""
+        responsibilities = {word for word in vocabulary.words if self.responsibilities[word]}
+        return ResumeSignals(
+            terms={term for term, lowered in vocabulary.terms if self.terms[lowered]},
+            degree_found=self.degree_found,
+            experience_signals=self.experience_signals,
+            years_of_experience=self.years_of_experience,
+            responsibility_hits=len(responsibilities),
+            responsibilities=responsibilities,
+        )
+
+
+def make_judgment(jd: CompiledJD, key: str, tier: str, analysis: Dict[str, Any], local: LocalMatch) -> Dict[str, Any]:
+    """A resume's analysis against one JD version plus what re-scoring needs"""
+    return {
+        "version": jd.version,
+        "key": key,
+        # Duplicate (and re-scored) analyses are derived from the model's
+        "source": TIER_LOCAL if tier in (TIER_LOCAL, TIER_FALLBACK) else TIER_MODEL,
+        "analysis": analysis,
+        "local_scores": {name: local.scores[name] for name in CATEGORY_WEIGHTS},
+        "weights": dict(jd.weights),
+        "skills": _skill_lists(jd),
+        "rescored": None,
+    }
+
+
+def rescore_judgment(judgment: Dict[str, Any], jd: CompiledJD, key: str, local: LocalMatch) -> Dict[str, Any]:
+    """
+    Carry a judgment over to a new JD version without a model call.
+
+    A category's local score only moves when the JD lists it depends on
+    change (skills, tools, education; responsibilities for experience), so
+    the model's category scores are shifted by the local delta and left
+    alone where it is 0. The match percentage keeps the model's offset from
+    its own weighted blend and is re-blended with the new weights. Local
+    judgments are simply re-scored. The model's strengths, weaknesses and
+    recommendations are kept; matched/missing skills are re-derived
+    locally when the skill lists changed.
+    """
+    local_scores = {name: local.scores[name] for name in CATEGORY_WEIGHTS}
+    changed = [name for name in CATEGORY_WEIGHTS if local_scores[name] != judgment["local_scores"].get(name)]
+
+    if judgment["source"] == TIER_LOCAL:
+        analysis = local.as_analysis()
+    else:
+        previous = judgment["analysis"]
+        scores = dict(previous["scores"])
+        for name in changed:
+            delta = local_scores[name] - judgment["local_scores"].get(name, 0)
+            scores[name] = _clamp(float(scores.get(name) or 0) + delta)
+        offset = float(previous["match_percentage"]) - _blend(previous["scores"], judgment["weights"])
+        match_percentage = _clamp(_blend(scores, jd.weights) + offset)
+        if "overall" in scores:
+            scores["overall"] = match_percentage
+        analysis = {**previous, "scores": scores, "match_percentage": match_percentage}
+        if _skill_lists(jd) != judgment["skills"]:
+            analysis["matched_skills"] = local.matched_skills
+            analysis["missing_skills"] = local.missing_skills
+
+    previous_rescore = judgment.get("rescored") or {}
+    return {
+        **judgment,
+        "version": jd.version,
+        "key": key,
+        "analysis": analysis,
+        "local_scores": local_scores,
+        "weights": dict(jd.weights),
+        "skills": _skill_lists(jd),
+        "rescored": {
+            "from_version": previous_rescore.get("from_version", judgment["version"]),
+            "categories": changed,
+            "at": time.time(),
+        },
+    }
+
+
+class ArtifactStore:
+    """
+    Per-resume intermediate artifacts (see ResumeArtifacts), kept so a JD
+    change can be applied to every analyzed resume without uploading it
+    again or calling the model: only terms the resume was never checked
+    for are scanned for, and only categories whose local score moved are
+    re-derived (rescore_judgment). Bounded LRU in memory, optionally
+    persisted to SQLite (ARTIFACT_STORE_DB) and reloaded at startup.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, db_path: Optional[str] = None):
+        if max_entries is None:
+            max_entries = ARTIFACT_STORE_SIZE
+        if db_path is None:
+            db_path = ARTIFACT_STORE_DB
+        self.max_entries = max(1, max_entries)
+        self.db_path = db_path
+        self._items: "OrderedDict[str, ResumeArtifacts]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self.rescored = 0
+        self.rescanned = 0
+        self.last_rescore: Optional[Dict[str, Any]] = None
+
+        if db_path:
+            self._open_db(db_path)
+
+    def _open_db(self, db_path: str):
+        try:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS resume_artifacts (
+                    resume_id TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            self._db.commit()
+            rows = self._db.execute(
+                "SELECT value FROM resume_artifacts ORDER BY updated_at DESC LIMIT ?", (self.max_entries,)
+            ).fetchall()
+            for (value,) in reversed(rows):
+                artifacts = ResumeArtifacts(**json.loads(value))
+                self._items[artifacts.resume_id] = artifacts
+            logger.info(f"Loaded {len(rows)} resume artifacts from {db_path}")
+        except (sqlite3.Error, ValueError, TypeError) as e:
+            logger.error(f"Failed to open artifact store DB {db_path}: {e}")
+            self._db = None
+
+    def _db_write(self, items: List[ResumeArtifacts], evicted: Sequence[str] = ()):
+        if self._db is None:
+            return
+        try:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO resume_artifacts VALUES (?, ?, ?)",
+                [(item.resume_id, json.dumps(asdict(item), ensure_ascii=False), item.updated_at) for item in items],
+            )
+            self._db.executemany("DELETE FROM resume_artifacts WHERE resume_id = ?", [(key,) for key in evicted])
+            self._db.commit()
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.error(f"Artifact store write error: {e}")
+
+    def record(
+        self, resume_id: str, resume_text: str, filename: str, jd: CompiledJD, analysis: Dict[str, Any], tier: str, key: str
+    ):
+        """Keep a fresh analysis and the signals of one full scan of the resume"""
+        signals = jd.scorer.signals(resume_text)
+        judgment = make_judgment(jd, key, tier, analysis, jd.scorer.score_signals(signals))
+        with self._lock:
+            artifacts = self._items.get(resume_id)
+            if artifacts is None:
+                artifacts = ResumeArtifacts(
+                    resume_id=resume_id,
+                    filename=filename,
+                    text=TermScanner.normalize(resume_text),
+                    text_length=len(resume_text),
+                    degree_found=signals.degree_found,
+                    experience_signals=signals.experience_signals,
+                    years_of_experience=signals.years_of_experience,
+                )
+                self._items[resume_id] = artifacts
+            artifacts.filename = filename
+            artifacts.observe(JDTerms(jd), signals)
+            artifacts.judgments[jd.jd_id] = judgment
+            artifacts.updated_at = time.time()
+            self._items.move_to_end(resume_id)
+            evicted = []
+            while len(self._items) > self.max_entries:
+                evicted.append(self._items.popitem(last=False)[0])
+            self._db_write([artifacts], evicted)
+
+    def rescored_analysis(self, resume_id: str, jd: CompiledJD, key: str) -> Optional[Dict[str, Any]]:
+        """
+        A model analysis carried over to this JD version, in the result
+        cache's shape, or None. `key` must match: another model or prompt
+        version needs a real call.
+        """
+        with self._lock:
+            artifacts = self._items.get(resume_id)
+            judgment = artifacts.judgments.get(jd.jd_id) if artifacts else None
+            if not judgment or not judgment["rescored"] or judgment["source"] != TIER_MODEL or judgment["key"] != key:
+                return None
+            return {
+                "analysis": judgment["analysis"],
+                "extracted_text_length": artifacts.text_length,
+                "rescored": judgment["rescored"],
+            }
+
+    def judgment(self, resume_id: str, jd_id: str) -> Optional[Dict[str, Any]]:
+        """A resume's latest judgment against a JD (any version), or None"""
+        with self._lock:
+            artifacts = self._items.get(resume_id)
+            return artifacts.judgments.get(jd_id) if artifacts else None
+
+    def forget_jd(self, jd_id: str):
+        """Drop every judgment against a deleted JD"""
+        with self._lock:
+            changed = [item for item in self._items.values() if item.judgments.pop(jd_id, None) is not None]
+            self._db_write(changed)
+
+    def _check_terms(self, items: List[ResumeArtifacts], vocabulary: JDTerms) -> int:
+        """
+        Scan the stored texts for JD terms they were never checked for;
+        returns how many had to be. record() updates the same artifacts, so
+        they are read and merged under the lock while the scans run outside it.
+        """
+        with self._lock:
+            unchecked = [(item, item.text, *item.unchecked(vocabulary)) for item in items]
+
+        scanners: Dict[Any, Tuple[TermScanner, TermScanner]] = {}
+        scanned = []
+        for item, text, terms, words in unchecked:
+            if not terms and not words:
+                continue
+            scanner = scanners.get((terms, words))
+            if scanner is None:
+                # Resumes analyzed against the same JD versions miss the same terms
+                scanner = scanners[(terms, words)] = (TermScanner(terms), TermScanner(words, aliases={}))
+            found_terms = scanner[0].find(text) if terms else set()
+            found_words = scanner[1].find(text) if words else set()
+            scanned.append((
+                item,
+                {term: term in found_terms for term in terms},
+                {word: word in found_words for word in words},
+            ))
+
+        with self._lock:
+            for item, terms, responsibilities in scanned:
+                # A concurrent record() may have checked some of them already
+                for term, found in terms.items():
+                    item.terms.setdefault(term, found)
+                for word, found in responsibilities.items():
+                    item.responsibilities.setdefault(word, found)
+        return len(scanned)
+
+    def rescore(self, jd: CompiledJD, key_for: Callable[[str], str]) -> Dict[str, Any]:
+        """
+        Bring every judgment against `jd.jd_id` up to the current version.
+        `key_for(resume_id)` is the analysis cache key for the new version.
+        """
+        started = time.perf_counter()
+        with self._lock:
+            judged = [(item, item.judgments.get(jd.jd_id)) for item in self._items.values()]
+        judged = [(item, judgment) for item, judgment in judged if judgment is not None]
+        stale = [(item, judgment) for item, judgment in judged if judgment["version"] != jd.version]
+
+        vocabulary = JDTerms(jd)
+        rescanned = self._check_terms([item for item, _ in stale], vocabulary)
+        with self._lock:
+            signals = [(item, judgment, item.signals(vocabulary)) for item, judgment in stale]
+
+        categories = {name: 0 for name in CATEGORY_WEIGHTS}
+        updated = []
+        for item, judgment, resume_signals in signals:
+            local = jd.scorer.score_signals(resume_signals)
+            new = rescore_judgment(judgment, jd, key_for(item.resume_id), local)
+            for name in new["rescored"]["categories"]:
+                categories[name] += 1
+            updated.append((item, judgment, new))
+
+        with self._lock:
+            written = []
+            for item, judgment, new in updated:
+                # A fresh analysis may have landed in the meantime
+                if item.judgments.get(jd.jd_id) is judgment:
+                    item.judgments[jd.jd_id] = new
+                    written.append(item)
+            self._db_write(written)
+            self.rescored += len(written)
+            self.rescanned += rescanned
+
+        summary = {
+            "jd_id": jd.jd_id,
+            "version": jd.version,
+            "resumes": len(judged),
+            "rescored": len(written),
+            "up_to_date": len(judged) - len(stale),
+            "rescanned": rescanned,
+            "categories_changed": categories,
+            "model_calls": 0,
+            "took_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+        if stale:
+            self.last_rescore = summary
+            logger.info(f"Re-scored {len(written)} analyses for JD {jd.jd_id} in {summary['took_ms']} ms")
+        return summary
+
+    def rank(self, jd: CompiledJD, k: int = 10) -> Dict[str, Any]:
+        """
+        Every stored resume ranked for a JD: judged ones by their (possibly
+        re-scored) analysis, the rest by the vectorized local scorer
+        """
+        started = time.perf_counter()
+        with self._lock:
+            items = [(item, item.judgments.get(jd.jd_id)) for item in self._items.values()]
+
+        rows = []
+        unjudged = []
+        for item, judgment in items:
+            if judgment is not None and judgment["version"] == jd.version:
+                analysis = judgment["analysis"]
+                rows.append((
+                    float(analysis["match_percentage"]),
+                    item,
+                    {name: analysis["scores"].get(name) for name in CATEGORY_WEIGHTS},
+                    judgment["source"],
+                    judgment["rescored"] is not None,
+                ))
+            else:
+                unjudged.append(item)
+
+        if unjudged:
+            vocabulary = JDTerms(jd)
+            self._check_terms(unjudged, vocabulary)
+            with self._lock:
+                signals = [item.signals(vocabulary) for item in unjudged]
+            ranker = jd.ranker
+            scores = ranker.score(ranker.vectorize_signals(signals))
+            for item, row in zip(unjudged, scores):
+                rows.append((
+                    round(float(row[4]), 2),
+                    item,
+                    {name: round(float(row[i]), 2) for i, name in enumerate(CATEGORY_WEIGHTS)},
+                    TIER_LOCAL,
+                    False,
+                ))
+
+        rows.sort(key=lambda row: -row[0])
+        shortlist = [
+            {
+                "rank": rank,
+                "resume_id": item.resume_id,
+                "filename": item.filename,
+                "match_percentage": match,
+                "scores": scores,
+                "source": source,
+                "rescored": rescored,
+            }
+            for rank, (match, item, scores, source, rescored) in enumerate(rows[:max(0, k)], start=1)
+        ]
+        return {
+            "jd_id": jd.jd_id,
+            "version": jd.version,
+            "total": len(rows),
+            "judged": len(rows) - len(unjudged),
+            "shortlist": shortlist,
+            "took_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            judgments = sum(len(item.judgments) for item in self._items.values())
+            return {
+                "backend": "sqlite" if self._db is not None else "memory",
+                "resumes": len(self._items),
+                "max_entries": self.max_entries,
+                "judgments": judgments,
+                "rescored": self.rescored,
+                "rescanned": self.rescanned,
+                "last_rescore": self.last_rescore,
+            }
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
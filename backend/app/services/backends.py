@@ -0,0 +1,432 @@
+# backend/app/services/backends.py
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+import logging
+
+from app.models import AnalysisResult, BatchAnalysisItem, JDAnalysisItem
+from .context_cache import PromptContextCache
+from .gemini_client import GeminiClient, GeminiUnavailableError
+from .jd_registry import ANALYSIS_JSON_FORMAT, CompiledJD
+from .local_scorer import CATEGORY_WEIGHTS
+from .metrics import stage
+from .structured_output import generation_config, parse_model_items, parse_model_output
+
+logger = logging.getLogger(__name__)
+
+# "local" runs no model at all: every analysis comes from the local scorer
+ANALYSIS_BACKENDS = ("gemini", "fake", "local")
+ANALYSIS_BACKEND = os.getenv("ANALYSIS_BACKEND", "gemini")
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
+# Connections to the model endpoint kept per worker process. With HTTP/2
+# (needs the h2 package) concurrent calls share one multiplexed connection.
+GEMINI_HTTP2 = os.getenv("GEMINI_HTTP2", "1") != "0"
+GEMINI_MAX_CONNECTIONS = int(os.getenv("GEMINI_MAX_CONNECTIONS", "20"))
+# Seconds the warm-up waits for its priming request
+WARM_UP_TIMEOUT = float(os.getenv("WARM_UP_TIMEOUT", "10"))
+
+# Bump whenever the prompts change so cached analyses are not reused
+PROMPT_VERSION = "4"
+
+
+class ModelUnavailableError(Exception):
+    """The backend cannot answer right now; callers fall back to local scoring"""
+
+
+def build_batch_prompt(resume_texts: List[str], jd: CompiledJD) -> str:
+    """Prompt for analyzing several (prepared) resumes in one request"""
+    resumes = "\n".join(
+        f"""
+    --- Resume {index} ---
+    {text}
+    """
+        for index, text in enumerate(resume_texts)
+    )
+    return f"""
+    Analyze each of the following {len(resume_texts)} resumes independently for the position: {jd.position}
+
+    {jd.requirements}
+    {resumes}
+    Provide a JSON array with exactly {len(resume_texts)} objects, in the same order as the resumes.
+    Each object must include "resume_index" and use this JSON format:
+    {ANALYSIS_JSON_FORMAT}
+
+    Respond only with valid JSON.
+    """
+
+
+def build_multi_jd_prompt(resume_text: str, jds: List[CompiledJD]) -> str:
+    """Prompt for analyzing one (prepared) resume against several JDs in one request"""
+    positions = "\n".join(
+        f"""
+    --- Position {index}: {jd.position} ---
+    {jd.requirements}
+    """
+        for index, jd in enumerate(jds)
+    )
+    return f"""
+    Analyze this resume against each of the following {len(jds)} positions independently.
+    {positions}
+    Provide a JSON array with exactly {len(jds)} objects, in the same order as the positions.
+    Each object must include "jd_index" and use this JSON format:
+    {ANALYSIS_JSON_FORMAT}
+
+    Respond only with valid JSON.
+
+    Resume Text:
+    {resume_text}
+    """
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _by_index(items: List[Optional[Dict[str, Any]]], key: str, count: int) -> List[Optional[Dict[str, Any]]]:
+    """Place array-reply entries at their own index; missing or duplicate ones stay None"""
+    placed: List[Optional[Dict[str, Any]]] = [None] * count
+    for item in items:
+        if item is None:
+            continue
+        index = item.pop(key)
+        if 0 <= index < count and placed[index] is None:
+            placed[index] = item
+    return placed
+
+
+class ModelBackend:
+    """
+    A model that analyzes prepared resume text against compiled JDs.
+
+    analyze() returns a validated AnalysisResult dict and stream() yields
+    the same reply as text while it is generated. analyze_many() and
+    analyze_jds() answer several resumes (or JDs) in one request and
+    return a dict or None per input; None entries are retried one by one.
+    Raise ModelUnavailableError when the model can't be reached and
+    ValueError when its reply doesn't validate.
+    """
+
+    name = "model"
+    model = ""
+
+    @property
+    def available(self) -> bool:
+        return True
+
+    async def analyze(self, resume_text: str, jd: CompiledJD) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    async def stream(self, resume_text: str, jd: CompiledJD) -> AsyncIterator[str]:
+        yield json.dumps(await self.analyze(resume_text, jd))
+
+    async def analyze_many(self, resume_texts: List[str], jd: CompiledJD) -> List[Optional[Dict[str, Any]]]:
+        return [None] * len(resume_texts)
+
+    async def analyze_jds(self, resume_text: str, jds: List[CompiledJD]) -> List[Optional[Dict[str, Any]]]:
+        return [None] * len(jds)
+
+    def jd_changed(self, event: str, entry: CompiledJD):
+        """Called after a registered JD is created, updated or deleted"""
+
+    async def warm_up(self):
+        """Create clients and open connections before the first request needs them"""
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+    async def close(self):
+        pass
+
+
+class GeminiBackend(ModelBackend):
+    """
+    Gemini through the rate-limited, retrying GeminiClient. The SDK client
+    (and the context cache of JD prompt prefixes) is built on first use or
+    by warm_up(), so importing the app never loads google-genai or needs an
+    API key. All calls share one pooled httpx client (HTTP/2 when h2 is
+    installed), so they reuse warm connections instead of each opening one.
+    """
+
+    name = "gemini"
+
+    def __init__(
+        self,
+        executor: Any = None,
+        model: Optional[str] = None,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        context_cache: Optional[bool] = None,
+    ):
+        self.executor = executor
+        self.model = model or GEMINI_MODEL
+        self.api_key = os.getenv("GEMINI_API_KEY") if api_key is None else api_key
+        # GEMINI_BASE_URL points the client at a local fake server for testing
+        self.base_url = os.getenv("GEMINI_BASE_URL") if base_url is None else base_url
+        if context_cache is None:
+            context_cache = os.getenv("GEMINI_CONTEXT_CACHE", "1") != "0"
+        self.use_context_cache = context_cache
+        self._client: Optional[GeminiClient] = None
+        self._http: Any = None
+        self.http2 = False
+        self._context_cache: Optional[PromptContextCache] = None
+        # In-flight context cache prunes, kept so they are not collected mid-run
+        self._prune_tasks: Set[asyncio.Task] = set()
+        self._init_failed = False
+        self._lock = threading.Lock()
+        if not self.api_key:
+            logger.warning("GEMINI_API_KEY not found. Using local analysis.")
+
+    @property
+    def available(self) -> bool:
+        return bool(self.api_key) and not self._init_failed
+
+    @property
+    def client(self) -> Optional[GeminiClient]:
+        """The shared GeminiClient, created on first access (None without an API key)"""
+        if self._client is None and self.available:
+            with self._lock:
+                if self._client is None and not self._init_failed:
+                    self._connect()
+        return self._client
+
+    def _connect(self):
+        try:
+            import httpx
+            from google import genai
+            from google.genai import types
+
+            http2 = GEMINI_HTTP2 and _http2_available()
+            http = httpx.AsyncClient(
+                http2=http2,
+                limits=httpx.Limits(
+                    max_connections=GEMINI_MAX_CONNECTIONS,
+                    max_keepalive_connections=GEMINI_MAX_CONNECTIONS,
+                ),
+            )
+            http_options = types.HttpOptions(base_url=self.base_url, httpx_async_client=http)
+            sdk = genai.Client(api_key=self.api_key, http_options=http_options)
+        except Exception as e:
+            logger.error(f"Failed to initialize Gemini: {e}")
+            self._init_failed = True
+            return
+        if self.use_context_cache:
+            # Gemini-side caches of each JD's static prompt prefix, so
+            # single-resume calls only send the resume
+            self._context_cache = PromptContextCache(sdk, self.model, PROMPT_VERSION)
+        self._http = http
+        self.http2 = http2
+        self._client = GeminiClient(sdk, executor=self.executor, model=self.model)
+
+    def _require(self) -> GeminiClient:
+        client = self.client
+        if client is None:
+            raise ModelUnavailableError("Gemini client is not configured")
+        return client
+
+    async def _cache_name(self, jd: CompiledJD) -> Optional[str]:
+        return await self._context_cache.handle(jd) if self._context_cache else None
+
+    def _cache_lost(self, error: GeminiUnavailableError, jd: CompiledJD, cache_name: Optional[str]) -> bool:
+        """Whether a failed cached request should be resent with the full prompt"""
+        if not cache_name or not self._context_cache.is_cache_miss(error):
+            return False
+        logger.info(f"Gemini context cache {cache_name} is gone; resending the full prompt")
+        self._context_cache.invalidate(jd, cache_name)
+        return True
+
+    async def _generate(self, resume_text: str, jd: CompiledJD) -> Any:
+        """
+        One single-resume call. When the JD's prompt prefix is held in a
+        context cache only the resume is sent; if Gemini has dropped the
+        cache, it is forgotten and the call is repeated with the full prompt.
+        """
+        client = self._require()
+        with stage("prompt_build"):
+            cache_name = await self._cache_name(jd)
+            if cache_name:
+                contents = jd.resume_part(resume_text)
+                config = generation_config(AnalysisResult, cached_content=cache_name)
+            else:
+                contents, config = jd.prompt(resume_text), generation_config(AnalysisResult)
+
+        try:
+            try:
+                with stage("model_call"):
+                    return await client.generate(contents, config=config)
+            except GeminiUnavailableError as e:
+                if not self._cache_lost(e, jd, cache_name):
+                    raise
+            with stage("model_call"):
+                return await client.generate(jd.prompt(resume_text), config=generation_config(AnalysisResult))
+        except GeminiUnavailableError as e:
+            raise ModelUnavailableError(str(e)) from e
+
+    async def analyze(self, resume_text: str, jd: CompiledJD) -> Dict[str, Any]:
+        response = await self._generate(resume_text, jd)
+        with stage("json_parse"):
+            return parse_model_output(response.text or "")
+
+    async def stream(self, resume_text: str, jd: CompiledJD) -> AsyncIterator[str]:
+        client = self._require()
+        with stage("prompt_build"):
+            cache_name = await self._cache_name(jd)
+
+        try:
+            if cache_name:
+                yielded = False
+                try:
+                    async for chunk in client.generate_stream(
+                        jd.resume_part(resume_text),
+                        config=generation_config(AnalysisResult, cached_content=cache_name),
+                    ):
+                        yielded = True
+                        yield chunk.text or ""
+                    return
+                except GeminiUnavailableError as e:
+                    if yielded or not self._cache_lost(e, jd, cache_name):
+                        raise
+
+            async for chunk in client.generate_stream(jd.prompt(resume_text), config=generation_config(AnalysisResult)):
+                yield chunk.text or ""
+        except GeminiUnavailableError as e:
+            raise ModelUnavailableError(str(e)) from e
+
+    async def _generate_items(self, prompt: str, item_model: Any, key: str, count: int) -> List[Optional[Dict[str, Any]]]:
+        client = self._require()
+        try:
+            with stage("model_call"):
+                response = await client.generate(prompt, config=generation_config(list[item_model]))
+        except GeminiUnavailableError as e:
+            raise ModelUnavailableError(str(e)) from e
+        with stage("json_parse"):
+            return _by_index(parse_model_items(response.text or "", item_model), key, count)
+
+    async def analyze_many(self, resume_texts: List[str], jd: CompiledJD) -> List[Optional[Dict[str, Any]]]:
+        with stage("prompt_build"):
+            prompt = build_batch_prompt(resume_texts, jd)
+        return await self._generate_items(prompt, BatchAnalysisItem, "resume_index", len(resume_texts))
+
+    async def analyze_jds(self, resume_text: str, jds: List[CompiledJD]) -> List[Optional[Dict[str, Any]]]:
+        with stage("prompt_build"):
+            prompt = build_multi_jd_prompt(resume_text, jds)
+        return await self._generate_items(prompt, JDAnalysisItem, "jd_index", len(jds))
+
+    def jd_changed(self, event: str, entry: CompiledJD):
+        """Delete context caches of JD versions that were replaced or removed"""
+        if not self._context_cache:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self._context_cache.prune(entry, deleted=event == "deleted"))
+        self._prune_tasks.add(task)
+        task.add_done_callback(self._prune_tasks.discard)
+
+    async def warm_up(self):
+        """
+        Build the client and open a connection to the endpoint with a cheap
+        model lookup. Failing to connect is logged, not raised: calls fall
+        back to local scoring until the model is reachable.
+        """
+        client = self.client
+        if client is None:
+            return
+        try:
+            await asyncio.wait_for(client.client.aio.models.get(model=self.model), WARM_UP_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Gemini warm-up request failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "gemini": {**self._client.stats(), "http2": self.http2} if self._client else None,
+            "context_cache": self._context_cache.stats() if self._context_cache else None,
+        }
+
+    async def close(self):
+        if self._prune_tasks:
+            await asyncio.gather(*self._prune_tasks, return_exceptions=True)
+        if self._context_cache:
+            await self._context_cache.close()
+        if self._http is not None:
+            await self._http.aclose()
+
+
+class FakeBackend(ModelBackend):
+    """
+    Deterministic analyses without any network call, for load tests and
+    demos: scores come from a hash of the resume and JD version, skills
+    from the local matcher, after FAKE_BACKEND_LATENCY_MS per request
+    """
+
+    name = "fake"
+    model = "fake"
+
+    def __init__(self, latency_ms: Optional[float] = None):
+        if latency_ms is None:
+            latency_ms = float(os.getenv("FAKE_BACKEND_LATENCY_MS", "0"))
+        self.latency = latency_ms / 1000
+        self.requests = 0
+
+    async def _call(self):
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    @staticmethod
+    def _analysis(resume_text: str, jd: CompiledJD) -> Dict[str, Any]:
+        digest = hashlib.sha256(f"{jd.version}:{resume_text}".encode("utf-8")).digest()
+        scores = {name: 40 + digest[i] % 61 for i, name in enumerate(CATEGORY_WEIGHTS)}
+        match = jd.scorer.match(resume_text)
+        return AnalysisResult.model_validate({
+            "scores": scores,
+            "match_percentage": round(sum(scores[name] * weight for name, weight in jd.weights.items())),
+            "strengths": ["Relevant coursework"],
+            "weaknesses": ["Limited production experience"],
+            "recommendations": ["Add measurable project outcomes"],
+            "matched_skills": match.matched_skills,
+            "missing_skills": match.missing_skills,
+        }).model_dump()
+
+    async def analyze(self, resume_text: str, jd: CompiledJD) -> Dict[str, Any]:
+        await self._call()
+        return self._analysis(resume_text, jd)
+
+    async def stream(self, resume_text: str, jd: CompiledJD) -> AsyncIterator[str]:
+        self.requests += 1
+        text = json.dumps(self._analysis(resume_text, jd))
+        size = max(1, -(-len(text) // 6))
+        for start in range(0, len(text), size):
+            if self.latency:
+                await asyncio.sleep(self.latency / 6)
+            yield text[start:start + size]
+
+    async def analyze_many(self, resume_texts: List[str], jd: CompiledJD) -> List[Optional[Dict[str, Any]]]:
+        await self._call()
+        return [self._analysis(text, jd) for text in resume_texts]
+
+    async def analyze_jds(self, resume_text: str, jds: List[CompiledJD]) -> List[Optional[Dict[str, Any]]]:
+        await self._call()
+        return [self._analysis(resume_text, jd) for jd in jds]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"fake": {"requests": self.requests, "latency_ms": self.latency * 1000}}
+
+
+def make_backend(name: Optional[str] = None, executor: Any = None) -> Optional[ModelBackend]:
+    """The configured model backend (ANALYSIS_BACKEND); None for local-only scoring"""
+    name = name or ANALYSIS_BACKEND
+    if name not in ANALYSIS_BACKENDS:
+        raise ValueError(f"ANALYSIS_BACKEND must be one of: {', '.join(ANALYSIS_BACKENDS)}")
+    if name == "local":
+        return None
+    if name == "fake":
+        return FakeBackend()
+    return GeminiBackend(executor=executor)
@@ -0,0 +1,267 @@
+# backend/app/services/batch_service.py
+import asyncio
+import io
+import os
+import time
+import zipfile
+import zlib
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+import logging
+
+from .cache import hash_bytes
+from .uploads import is_pdf
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_ITEMS = int(os.getenv("MAX_BATCH_ITEMS", "500"))
+MAX_ZIP_ENTRY_BYTES = int(os.getenv("MAX_ZIP_ENTRY_BYTES", str(20 * 1024 * 1024)))
+# Decompressed bytes allowed across every ZIP in one batch
+MAX_ZIP_TOTAL_BYTES = int(os.getenv("MAX_ZIP_TOTAL_BYTES", str(100 * 1024 * 1024)))
+_ZIP_CHUNK_BYTES = 1024 * 1024
+
+# What reading a damaged, encrypted or unsupported entry raises
+_ZIP_ENTRY_ERRORS = (zipfile.BadZipFile, zlib.error, RuntimeError, NotImplementedError, EOFError)
+
+
+@dataclass
+class BatchItem:
+    index: int
+    filename: str
+    content: bytes = b""
+    error: Optional[str] = None
+    pdf_hash: str = ""
+    text: str = ""
+    tier: Optional[Dict[str, Any]] = None
+
+    def __post_init__(self):
+        if self.content and not self.pdf_hash:
+            self.pdf_hash = hash_bytes(self.content)
+
+
+def _read_entry(archive: zipfile.ZipFile, info: zipfile.ZipInfo, limit: int) -> Optional[bytes]:
+    """
+    An entry's decompressed bytes, or None once it passes `limit`: the
+    declared file_size can lie, so the data itself is counted
+    """
+    chunks = []
+    size = 0
+    with archive.open(info) as f:
+        while True:
+            chunk = f.read(_ZIP_CHUNK_BYTES)
+            if not chunk:
+                return b"".join(chunks)
+            size += len(chunk)
+            if size > limit:
+                return None
+            chunks.append(chunk)
+
+
+def expand_uploads(uploads: List[Tuple[str, bytes]]) -> List[BatchItem]:
+    """
+    Turn uploaded (filename, bytes) pairs into batch items.
+    ZIP archives are expanded to the PDFs they contain; anything else that
+    is not a PDF, and entries that are corrupt, encrypted or too large,
+    become error items instead of failing the batch. Raises ValueError when
+    the batch has too many items or its ZIPs decompress to more than
+    MAX_ZIP_TOTAL_BYTES. Decompresses synchronously: call it in a thread.
+    """
+    items: List[BatchItem] = []
+    unzipped = 0
+
+    def add(filename: str, content: bytes = b"", error: Optional[str] = None):
+        if len(items) >= MAX_BATCH_ITEMS:
+            raise ValueError(f"Batch exceeds {MAX_BATCH_ITEMS} resumes")
+        if not error and len(content) == 0:
+            error = "Empty file"
+        elif not error and not is_pdf(content):
+            error = "File is not a valid PDF"
+        items.append(BatchItem(index=len(items), filename=filename, content=content, error=error))
+
+    for filename, content in uploads:
+        name = (filename or "").lower()
+        if name.endswith(".pdf"):
+            add(filename, content)
+        elif name.endswith(".zip"):
+            try:
+                archive = zipfile.ZipFile(io.BytesIO(content))
+            except zipfile.BadZipFile:
+                add(filename, error="Invalid ZIP archive")
+                continue
+            with archive:
+                for info in archive.infolist():
+                    entry = info.filename
+                    if info.is_dir() or entry.startswith("__MACOSX/") or entry.rsplit("/", 1)[-1].startswith("."):
+                        continue
+                    if not entry.lower().endswith(".pdf"):
+                        add(entry, error="Only PDF files are accepted")
+                    elif info.file_size > MAX_ZIP_ENTRY_BYTES:
+                        add(entry, error="File too large")
+                    else:
+                        budget = MAX_ZIP_TOTAL_BYTES - unzipped
+                        try:
+                            data = _read_entry(archive, info, min(MAX_ZIP_ENTRY_BYTES, budget))
+                        except _ZIP_ENTRY_ERRORS as e:
+                            logger.warning(f"Unreadable ZIP entry {entry}: {e}")
+                            add(entry, error="Corrupt ZIP entry")
+                            continue
+                        if data is None:
+                            if budget < MAX_ZIP_ENTRY_BYTES:
+                                raise ValueError(
+                                    f"ZIP contents exceed {MAX_ZIP_TOTAL_BYTES // (1024 * 1024)} MB uncompressed"
+                                )
+                            add(entry, error="File too large")
+                            continue
+                        unzipped += len(data)
+                        add(entry, data)
+        else:
+            add(filename, error="Only PDF or ZIP files are accepted")
+
+    return items
+
+
+class BatchAnalyzer:
+    """
+    Analyze many resumes against one JD and yield results as they complete.
+
+    Cached analyses are returned straight away, text extraction runs for all
+    items in parallel, and extracted resumes are grouped into packs of
+    `pack_size` so several of them share one model request; `analyze_pack`
+    returns (analysis, tier) per item, the tier saying whether the model
+    answered or a local fallback did. An optional
+    `screen(text, pdf_hash) -> (analysis or None, tier)` resolves items before
+    packing (local pre-screen, near-duplicates);
+    `on_analyzed(item, analysis)` sees every fresh (non-cached) result.
+    """
+
+    def __init__(
+        self,
+        extract: Callable[[bytes, str], Awaitable[str]],
+        analyze_pack: Callable[[List[str], List[str]], Awaitable[List[Tuple[Dict[str, Any], str]]]],
+        lookup: Optional[Callable[[str], Awaitable[Optional[Dict[str, Any]]]]] = None,
+        pack_size: Optional[int] = None,
+        on_analyzed: Optional[Callable[[BatchItem, Dict[str, Any]], None]] = None,
+    ):
+        if pack_size is None:
+            pack_size = int(os.getenv("BATCH_PACK_SIZE", "4"))
+        self.extract = extract
+        self.analyze_pack = analyze_pack
+        self.lookup = lookup
+        self.on_analyzed = on_analyzed
+        self.pack_size = max(1, pack_size)
+
+    @staticmethod
+    def _result(item: BatchItem, **fields: Any) -> Dict[str, Any]:
+        return {"event": "result", "index": item.index, "filename": item.filename, **fields}
+
+    def _success(self, item: BatchItem, analysis: Dict[str, Any], text_length: int, cached: bool) -> Dict[str, Any]:
+        if not cached and self.on_analyzed is not None:
+            self.on_analyzed(item, analysis)
+        data = {
+            "resume_id": item.pdf_hash,
+            "file_size": len(item.content),
+            "extracted_text_length": text_length,
+            "analysis": analysis,
+            "cached": cached,
+        }
+        if item.tier is not None:
+            data["tier"] = item.tier
+        return self._result(item, success=True, data=data)
+
+    async def stream(
+        self,
+        items: List[BatchItem],
+        screen: Optional[Callable[[str, str], Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        start_time = time.time()
+        results: asyncio.Queue = asyncio.Queue()
+
+        async def prepare(item: BatchItem) -> Optional[BatchItem]:
+            if item.error:
+                await results.put(self._result(item, success=False, error=item.error))
+                return None
+
+            if self.lookup is not None:
+                cached = await self.lookup(item.pdf_hash)
+                if cached is not None:
+                    await results.put(
+                        self._success(item, cached["analysis"], cached["extracted_text_length"], True)
+                    )
+                    return None
+
+            try:
+                item.text = await self.extract(item.content, item.pdf_hash)
+            except Exception as e:
+                error = getattr(e, "detail", None) or str(e)
+                await results.put(self._result(item, success=False, error=error))
+                return None
+
+            if not item.text:
+                await results.put(self._result(item, success=False, error="No text found in PDF"))
+                return None
+
+            if screen is not None:
+                analysis, item.tier = screen(item.text, item.pdf_hash)
+                if analysis is not None:
+                    await results.put(self._success(item, analysis, len(item.text), False))
+                    return None
+            return item
+
+        async def run_pack(pack: List[BatchItem]):
+            try:
+                analyses = await self.analyze_pack(
+                    [item.text for item in pack], [item.pdf_hash for item in pack]
+                )
+            except Exception as e:
+                logger.error(f"Batch pack analysis error: {e}")
+                for item in pack:
+                    await results.put(self._result(item, success=False, error=str(e)))
+                return
+            for item, (analysis, tier) in zip(pack, analyses):
+                # Who answered (model, or a local fallback) decides how the result is kept
+                item.tier = {**(item.tier or {}), "tier": tier}
+                await results.put(self._success(item, analysis, len(item.text), False))
+
+        async def produce():
+            pack: List[BatchItem] = []
+            pack_tasks = []
+            prepare_tasks = [asyncio.create_task(prepare(item)) for item in items]
+            try:
+                for prepared in asyncio.as_completed(prepare_tasks):
+                    item = await prepared
+                    if item is not None:
+                        pack.append(item)
+                    if len(pack) >= self.pack_size:
+                        pack_tasks.append(asyncio.create_task(run_pack(pack)))
+                        pack = []
+                if pack:
+                    pack_tasks.append(asyncio.create_task(run_pack(pack)))
+                await asyncio.gather(*pack_tasks)
+            finally:
+                for task in prepare_tasks + pack_tasks:
+                    task.cancel()
+                await results.put(None)
+
+        producer = asyncio.create_task(produce())
+        succeeded = failed = 0
+        try:
+            while True:
+                result = await results.get()
+                if result is None:
+                    break
+                if result["success"]:
+                    succeeded += 1
+                else:
+                    failed += 1
+                yield result
+        finally:
+            # Client went away or the batch finished: stop outstanding work
+            producer.cancel()
+
+        yield {
+            "event": "summary",
+            "total": len(items),
+            "succeeded": succeeded,
+            "failed": failed,
+            "processing_time": round(time.time() - start_time, 2),
+        }
@@ -0,0 +1,291 @@
+# backend/app/services/cache.py
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def hash_bytes(data: bytes) -> str:
+    """SHA-256 hex digest of raw bytes (e.g. an uploaded PDF)"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def make_key(*parts: Any) -> str:
+    """
+    Build a stable cache key from JSON-serializable parts.
+    Dicts are serialized with sorted keys so equal JDs hash the same.
+    """
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# Cache hits move a row to the front of the SQLite LRU in batches of this
+# many rather than with a write per hit
+RESULT_CACHE_TOUCH_BATCH = int(os.getenv("RESULT_CACHE_TOUCH_BATCH", "64"))
+# The SQLite file is trimmed back to max_entries once every this many writes
+RESULT_CACHE_EVICT_EVERY = int(os.getenv("RESULT_CACHE_EVICT_EVERY", "64"))
+
+
+class ResultCache:
+    """
+    Content-addressed cache for extracted text and analysis results.
+
+    An in-memory LRU with TTL sits in front of an optional SQLite file so
+    cached analyses survive restarts. Entries are namespaced ("text",
+    "analysis", ...) and hit/miss counters are kept per namespace.
+
+    SQLite writes (new entries, batched access times, eviction) run on a
+    single writer thread, so set() never waits on the disk. Async callers
+    use aget(), which reads the file in a worker thread on a memory miss.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        db_path: Optional[str] = None,
+    ):
+        if max_entries is None:
+            max_entries = int(os.getenv("RESULT_CACHE_SIZE", "1024"))
+        if ttl_seconds is None:
+            ttl_seconds = float(os.getenv("RESULT_CACHE_TTL", str(24 * 3600)))
+        if db_path is None:
+            db_path = os.getenv("RESULT_CACHE_DB") or None
+
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+
+        self._memory: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._db: Optional[sqlite3.Connection] = None
+        # Guards the connection; _lock is never held while waiting on it
+        self._db_lock = threading.Lock()
+        self._writer: Optional[ThreadPoolExecutor] = None
+        # Access times not yet written to SQLite, by (namespace, key)
+        self._touched: Dict[Tuple[str, str], float] = {}
+        self._writes = 0
+
+        if db_path:
+            self._open_db(db_path)
+
+    def _open_db(self, db_path: str):
+        try:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS result_cache (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+                """
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS result_cache_accessed ON result_cache (accessed_at)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS result_cache_expires ON result_cache (expires_at)")
+            self._db.commit()
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="result-cache")
+            logger.info(f"Result cache persisted to {db_path}")
+        except sqlite3.Error as e:
+            logger.error(f"Failed to open result cache DB {db_path}: {e}")
+            self._db = None
+
+    def _counter(self, namespace: str) -> Dict[str, int]:
+        return self._stats.setdefault(namespace, {"hits": 0, "misses": 0})
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        """Cached value or None; a memory miss reads SQLite on the calling thread"""
+        now = time.time()
+        found, value = self._memory_get(namespace, key, now)
+        if found:
+            return value
+        return self._finish_get(namespace, key, self._db_get(namespace, key, now), now)
+
+    async def aget(self, namespace: str, key: str) -> Optional[Any]:
+        """get() for the event loop: a memory miss reads SQLite in a worker thread"""
+        now = time.time()
+        found, value = self._memory_get(namespace, key, now)
+        if found:
+            return value
+        stored = await asyncio.to_thread(self._db_get, namespace, key, now) if self._db is not None else None
+        return self._finish_get(namespace, key, stored, now)
+
+    def _memory_get(self, namespace: str, key: str, now: float) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._memory.get((namespace, key))
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._memory.move_to_end((namespace, key))
+                    self._counter(namespace)["hits"] += 1
+                    self._touch(namespace, key, now)
+                    return True, copy.deepcopy(value)
+                del self._memory[(namespace, key)]
+        return False, None
+
+    def _finish_get(self, namespace: str, key: str, value: Optional[Any], now: float) -> Optional[Any]:
+        with self._lock:
+            counter = self._counter(namespace)
+            if value is None:
+                counter["misses"] += 1
+                return None
+            self._memory_set(namespace, key, value, now)
+            counter["hits"] += 1
+            self._touch(namespace, key, now)
+            return copy.deepcopy(value)
+
+    def set(self, namespace: str, key: str, value: Any):
+        """Stores the value in memory now and queues the SQLite write"""
+        now = time.time()
+        with self._lock:
+            self._memory_set(namespace, key, copy.deepcopy(value), now)
+            self._touched.pop((namespace, key), None)
+        if self._writer is None:
+            return
+        try:
+            payload = json.dumps(value, ensure_ascii=False)
+        except (TypeError, ValueError) as e:
+            logger.error(f"Result cache write error: {e}")
+            return
+        self._submit(self._db_set, namespace, key, payload, now)
+
+    def _memory_set(self, namespace: str, key: str, value: Any, now: float):
+        self._memory[(namespace, key)] = (now + self.ttl_seconds, value)
+        self._memory.move_to_end((namespace, key))
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _touch(self, namespace: str, key: str, now: float):
+        # Called with _lock held
+        if self._writer is None:
+            return
+        self._touched[(namespace, key)] = now
+        if len(self._touched) >= RESULT_CACHE_TOUCH_BATCH:
+            self._submit(self._db_flush)
+
+    def _submit(self, fn, *args):
+        try:
+            self._writer.submit(fn, *args)
+        except RuntimeError:
+            # Writer already shut down by close()
+            pass
+
+    def _take_touched(self) -> Dict[Tuple[str, str], float]:
+        with self._lock:
+            touched, self._touched = self._touched, {}
+        return touched
+
+    def _db_get(self, namespace: str, key: str, now: float) -> Optional[Any]:
+        with self._db_lock:
+            if self._db is None:
+                return None
+            try:
+                row = self._db.execute(
+                    "SELECT value, expires_at FROM result_cache WHERE namespace = ? AND key = ?",
+                    (namespace, key),
+                ).fetchone()
+                # Expired rows are left for the periodic eviction
+                if row is None or row[1] <= now:
+                    return None
+                return json.loads(row[0])
+            except (sqlite3.Error, ValueError) as e:
+                logger.error(f"Result cache read error: {e}")
+                return None
+
+    def _db_write_touched(self):
+        # Called with _db_lock held
+        touched = self._take_touched()
+        if touched:
+            self._db.executemany(
+                "UPDATE result_cache SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                [(accessed_at, namespace, key) for (namespace, key), accessed_at in touched.items()],
+            )
+
+    def _db_flush(self):
+        with self._db_lock:
+            if self._db is None:
+                return
+            try:
+                self._db_write_touched()
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Result cache write error: {e}")
+
+    def _db_set(self, namespace: str, key: str, payload: str, now: float):
+        with self._db_lock:
+            if self._db is None:
+                return
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO result_cache VALUES (?, ?, ?, ?, ?)",
+                    (namespace, key, payload, now + self.ttl_seconds, now),
+                )
+                self._db_write_touched()
+                self._writes += 1
+                if self._writes % RESULT_CACHE_EVICT_EVERY == 0:
+                    # Keep the file bounded: drop expired rows, then least recently used
+                    self._db.execute("DELETE FROM result_cache WHERE expires_at <= ?", (now,))
+                    self._db.execute(
+                        """
+                        DELETE FROM result_cache WHERE rowid IN (
+                            SELECT rowid FROM result_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                        )
+                        """,
+                        (self.max_entries,),
+                    )
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Result cache write error: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._stats.clear()
+            self._touched.clear()
+        with self._db_lock:
+            if self._db is not None:
+                self._db.execute("DELETE FROM result_cache")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            namespaces = {}
+            for namespace, counter in self._stats.items():
+                lookups = counter["hits"] + counter["misses"]
+                namespaces[namespace] = {
+                    **counter,
+                    "hit_ratio": round(counter["hits"] / lookups, 4) if lookups else 0.0,
+                }
+            return {
+                "backend": "sqlite" if self._db is not None else "memory",
+                "entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "namespaces": namespaces,
+            }
+
+    def close(self):
+        # Let queued writes land, then record the last access times
+        if self._writer is not None:
+            self._writer.shutdown(wait=True)
+            self._writer = None
+            self._db_flush()
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
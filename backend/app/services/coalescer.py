@@ -0,0 +1,188 @@
+# backend/app/services/coalescer.py
+import asyncio
+import contextvars
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+import logging
+
+from .backends import ModelBackend, ModelUnavailableError
+from .jd_registry import CompiledJD
+from .metrics import COALESCED_BATCH_SIZE, COALESCED_FALLBACKS, record_stage
+
+logger = logging.getLogger(__name__)
+
+# How long the first call of a window waits for others (0 disables
+# coalescing) and how many resumes one combined request may carry
+MODEL_COALESCE_WINDOW_MS = float(os.getenv("MODEL_COALESCE_WINDOW_MS", "50"))
+MODEL_COALESCE_MAX_ITEMS = int(os.getenv("MODEL_COALESCE_MAX_ITEMS", "8"))
+
+
+@dataclass
+class _Pending:
+    resume_text: str
+    future: asyncio.Future
+    enqueued: float = field(default_factory=time.perf_counter)
+    flushed: float = 0.0
+    finished: float = 0.0
+
+
+@dataclass
+class _Window:
+    jd: CompiledJD
+    items: List[_Pending] = field(default_factory=list)
+    timer: Optional[asyncio.TimerHandle] = None
+
+
+class RequestCoalescer:
+    """
+    Collect single-resume model calls that arrive within `window_ms` of
+    each other for the same JD version (up to `max_items`) and send them as
+    one multi-resume request. Each caller gets its own analysis back; items
+    missing or malformed in the combined reply are re-requested alone, and
+    a window holding one resume uses the normal single-resume call. While
+    no model call is in flight there is nothing to wait for, so a call is
+    sent straight away and idle traffic pays no window latency.
+
+    Combined calls run outside any request's context, so their time is
+    split back per caller as coalesce_wait + model_call timings.
+    """
+
+    def __init__(self, backend: ModelBackend, window_ms: Optional[float] = None, max_items: Optional[int] = None):
+        if window_ms is None:
+            window_ms = MODEL_COALESCE_WINDOW_MS
+        if max_items is None:
+            max_items = MODEL_COALESCE_MAX_ITEMS
+        self.backend = backend
+        self.window = max(0.0, window_ms) / 1000
+        self.max_items = max(1, max_items)
+        self._windows: Dict[str, _Window] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._in_flight = 0
+        self.direct = 0
+        self.batches = 0
+        self.items = 0
+        self.fallback_items = 0
+
+    async def analyze(self, resume_text: str, jd: CompiledJD) -> Dict[str, Any]:
+        """The backend's analysis of one (prepared) resume, possibly answered in a shared request"""
+        window = self._windows.get(jd.version)
+        if window is None and not self._in_flight:
+            self.direct += 1
+            self._in_flight += 1
+            try:
+                return await self.backend.analyze(resume_text, jd)
+            finally:
+                self._in_flight -= 1
+
+        loop = asyncio.get_running_loop()
+        pending = _Pending(resume_text, loop.create_future())
+        if window is None:
+            window = self._windows[jd.version] = _Window(jd)
+            # Flushes must not charge their model time to whoever opened the window
+            window.timer = loop.call_later(self.window, self._flush, jd.version, context=contextvars.Context())
+        window.items.append(pending)
+        if len(window.items) >= self.max_items:
+            contextvars.Context().run(self._flush, jd.version)
+
+        try:
+            return await pending.future
+        finally:
+            if pending.flushed:
+                record_stage("coalesce_wait", pending.flushed - pending.enqueued)
+            if pending.finished:
+                record_stage("model_call", pending.finished - pending.flushed, observe=False)
+
+    def _flush(self, version: str):
+        window = self._windows.pop(version, None)
+        if window is None:
+            return
+        if window.timer is not None:
+            window.timer.cancel()
+        task = asyncio.get_running_loop().create_task(self._run(window))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, window: _Window):
+        flushed = time.perf_counter()
+        items = [pending for pending in window.items if not pending.future.done()]
+        for pending in items:
+            pending.flushed = flushed
+        if not items:
+            return
+        COALESCED_BATCH_SIZE.observe(len(items))
+        self.batches += 1
+        self.items += len(items)
+        self._in_flight += 1
+        try:
+            await self._send(window.jd, items)
+        finally:
+            self._in_flight -= 1
+
+    async def _send(self, jd: CompiledJD, items: List[_Pending]):
+        if len(items) == 1:
+            await self._run_one(items[0], jd)
+            return
+
+        try:
+            analyses = await self.backend.analyze_many([pending.resume_text for pending in items], jd)
+        except ModelUnavailableError as e:
+            # Nothing would get through alone either
+            self._finish(items, error=e)
+            return
+        except Exception as e:
+            logger.error(f"Coalesced model request failed: {e}")
+            analyses = [None] * len(items)
+
+        missing = []
+        for pending, analysis in zip(items, analyses):
+            if analysis is None:
+                missing.append(pending)
+            else:
+                self._finish([pending], analysis)
+        if missing:
+            logger.info(f"Re-requesting {len(missing)} of {len(items)} coalesced analyses individually")
+            COALESCED_FALLBACKS.inc(len(missing))
+            self.fallback_items += len(missing)
+            await asyncio.gather(*[self._run_one(pending, jd) for pending in missing])
+
+    async def _run_one(self, pending: _Pending, jd: CompiledJD):
+        try:
+            analysis = await self.backend.analyze(pending.resume_text, jd)
+        except Exception as e:
+            self._finish([pending], error=e)
+            return
+        self._finish([pending], analysis)
+
+    @staticmethod
+    def _finish(items: List[_Pending], analysis: Optional[Dict[str, Any]] = None, error: Optional[BaseException] = None):
+        finished = time.perf_counter()
+        for pending in items:
+            # The caller may have gone away (client disconnect, timeout)
+            if pending.future.done():
+                continue
+            pending.finished = finished
+            if error is not None:
+                pending.future.set_exception(error)
+            else:
+                pending.future.set_result(analysis)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "window_ms": self.window * 1000,
+            "max_items": self.max_items,
+            "direct": self.direct,
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 3) if self.batches else 0.0,
+            "fallback_items": self.fallback_items,
+            "open_windows": len(self._windows),
+        }
+
+    async def close(self):
+        """Send whatever is still waiting and let in-flight requests finish"""
+        for version in list(self._windows):
+            self._flush(version)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
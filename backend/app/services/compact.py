@@ -0,0 +1,204 @@
+# backend/app/services/compact.py
+import gzip
+import json
+import os
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple, Union
+import logging
+
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+if TYPE_CHECKING:
+    from .jd_registry import CompiledJD
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+RESPONSE_VIEWS = ("full", "compact")
+# Bodies smaller than this aren't worth compressing
+RESPONSE_COMPRESS_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESS_MIN_BYTES", "1024"))
+# From this size compression would hold the event loop for a noticeable
+# time, so it runs in the thread pool instead
+RESPONSE_COMPRESS_THREAD_BYTES = int(os.getenv("RESPONSE_COMPRESS_THREAD_BYTES", "65536"))
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack")
+
+# Order of the compact `scores` array
+SCORE_FIELDS = ("education", "skills", "experience", "tools", "overall")
+
+
+@dataclass(slots=True)
+class CompactResult:
+    """
+    One analysis with fixed fields: scores as a SCORE_FIELDS-ordered array
+    and skills as ids into the JD's vocabulary (CompiledJD.vocabulary;
+    skills the JD doesn't list stay names). No job description, extraction
+    stats or timings, so a result is a few hundred bytes.
+    """
+
+    resume_id: str
+    filename: str
+    jd_id: str
+    jd_version: str
+    match: float
+    scores: Tuple[Optional[float], ...]
+    matched: List[Union[int, str]]
+    missing: List[Union[int, str]]
+    strengths: List[str]
+    weaknesses: List[str]
+    recommendations: List[str]
+    tier: Optional[str]
+
+    @classmethod
+    def from_analysis(
+        cls,
+        analysis: Dict[str, Any],
+        jd: "CompiledJD",
+        resume_id: str,
+        filename: str,
+        tier: Optional[str] = None,
+    ) -> "CompactResult":
+        scores = analysis.get("scores") or {}
+        return cls(
+            resume_id=resume_id,
+            filename=filename,
+            jd_id=jd.jd_id,
+            jd_version=jd.version,
+            match=analysis.get("match_percentage", 0),
+            scores=tuple(scores.get(name) for name in SCORE_FIELDS),
+            matched=[jd.skill_id(skill) for skill in analysis.get("matched_skills", [])],
+            missing=[jd.skill_id(skill) for skill in analysis.get("missing_skills", [])],
+            strengths=analysis.get("strengths", []),
+            weaknesses=analysis.get("weaknesses", []),
+            recommendations=analysis.get("recommendations", []),
+            tier=tier,
+        )
+
+    @classmethod
+    def from_data(cls, data: Dict[str, Any], jd: "CompiledJD") -> "CompactResult":
+        """From an AnalysisService.analyze payload"""
+        tier = data.get("tier")
+        return cls.from_analysis(data["analysis"], jd, data["resume_id"], data["filename"], tier and tier["tier"])
+
+    def to_dict(self, fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """resume_id plus the selected fields (all of them by default)"""
+        result = {"resume_id": self.resume_id}
+        for name in fields or COMPACT_FIELDS:
+            result[name] = getattr(self, name)
+        return result
+
+
+COMPACT_FIELDS = tuple(name for name in CompactResult.__dataclass_fields__ if name != "resume_id")
+
+
+def parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Comma-separated `fields=` selector; raises ValueError on unknown names"""
+    if not fields:
+        return None
+    names = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in names if name not in COMPACT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)} (choose from: {', '.join(COMPACT_FIELDS)})")
+    return names
+
+
+def dumps(payload: Any) -> bytes:
+    """Compact UTF-8 JSON, with orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _accepted(header: str) -> Dict[str, float]:
+    """Accept/Accept-Encoding values with their q weights"""
+    accepted = {}
+    for item in header.split(","):
+        value, _, params = item.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, number = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(number)
+                except ValueError:
+                    quality = 0.0
+        if value:
+            accepted[value.strip().lower()] = quality
+    return accepted
+
+
+def choose_media_type(request: Request) -> Optional[str]:
+    """
+    application/msgpack when Accept prefers it (and msgpack is installed),
+    else application/json; None if the client takes neither
+    """
+    accept = request.headers.get("accept")
+    if not accept:
+        return "application/json"
+    accepted = _accepted(accept)
+    msgpack_q = max(accepted.get(media_type, 0.0) for media_type in MSGPACK_TYPES)
+    json_q = max(accepted.get("application/json", 0.0), accepted.get("application/*", 0.0), accepted.get("*/*", 0.0))
+    if msgpack is not None and msgpack_q > 0 and msgpack_q >= json_q:
+        return "application/msgpack"
+    return "application/json" if json_q > 0 else None
+
+
+def choose_encoding(request: Request) -> Optional[str]:
+    """
+    Whichever of br (when brotli is installed) and gzip the client weights
+    higher, br on a tie; None if it takes neither
+    """
+    accepted = _accepted(request.headers.get("accept-encoding", ""))
+    wildcard = accepted.get("*", 0.0)
+    br_q = accepted.get("br", wildcard) if brotli is not None else 0.0
+    gzip_q = accepted.get("gzip", wildcard)
+    if br_q > 0 and br_q >= gzip_q:
+        return "br"
+    if gzip_q > 0:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=4)
+    return gzip.compress(body, compresslevel=5)
+
+
+async def negotiated_response(request: Request, payload: Any, status_code: int = 200) -> Response:
+    """
+    `payload` as JSON (orjson when installed) or, when the Accept header
+    prefers it, MessagePack; compressed with br or gzip per
+    Accept-Encoding once it is RESPONSE_COMPRESS_MIN_BYTES or larger
+    (off the event loop from RESPONSE_COMPRESS_THREAD_BYTES)
+    """
+    media_type = choose_media_type(request)
+    if media_type is None:
+        error = "Responses are application/json" + (" or application/msgpack" if msgpack is not None else "")
+        return JSONResponse(status_code=406, content={"success": False, "error": error})
+    body = msgpack.packb(payload, use_bin_type=True) if media_type == "application/msgpack" else dumps(payload)
+
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    encoding = choose_encoding(request) if len(body) >= RESPONSE_COMPRESS_MIN_BYTES else None
+    if encoding:
+        if len(body) >= RESPONSE_COMPRESS_THREAD_BYTES:
+            body = await run_in_threadpool(compress, body, encoding)
+        else:
+            body = compress(body, encoding)
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, status_code=status_code, headers=headers, media_type=media_type)
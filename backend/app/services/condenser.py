@@ -0,0 +1,194 @@
+# backend/app/services/condenser.py
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+import logging
+
+from .gemini_client import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Token budget for the resume part of a prompt (~4 characters per token;
+# the old 3000-character cut was ~750)
+PROMPT_RESUME_TOKENS = int(os.getenv("PROMPT_RESUME_TOKENS", "700"))
+# A section that doesn't fit whole is cut at line boundaries, unless less
+# than this many tokens are left for it
+MIN_PARTIAL_TOKENS = 40
+
+# Canonical section -> headings it appears under (lowercase, no trailing colon)
+SECTION_HEADINGS: Dict[str, List[str]] = {
+    "summary": [
+        "summary", "profile", "objective", "about me", "career objective", "professional summary",
+        "สรุป", "เกี่ยวกับฉัน",
+    ],
+    "skills": [
+        "skills", "technical skills", "skills & tools", "skills and tools", "tools", "technologies",
+        "tech stack", "competencies", "core competencies", "ทักษะ", "ความสามารถ",
+    ],
+    "experience": [
+        "experience", "work experience", "professional experience", "employment", "employment history",
+        "work history", "internship", "internships", "ประสบการณ์", "ประสบการณ์การทำงาน", "ฝึกงาน",
+    ],
+    "projects": ["projects", "project", "personal projects", "academic projects", "โครงการ", "โปรเจกต์", "ผลงาน"],
+    "education": ["education", "academic background", "qualifications", "การศึกษา", "ประวัติการศึกษา"],
+    "certifications": ["certifications", "certificates", "courses", "training", "licenses", "ใบรับรอง", "การอบรม"],
+    "publications": ["publications", "research", "ผลงานวิจัย"],
+    "awards": ["awards", "achievements", "honors", "honours", "รางวัล"],
+    "activities": ["activities", "extracurricular activities", "leadership", "volunteer", "volunteering", "กิจกรรม"],
+    "languages": ["languages", "ภาษา"],
+    "personal": [
+        "personal information", "personal details", "contact", "contact information", "interests", "hobbies",
+        "ข้อมูลส่วนตัว", "งานอดิเรก",
+    ],
+    "references": ["references", "referees", "บุคคลอ้างอิง"],
+}
+
+# How much a section is worth before JD relevance is counted
+SECTION_PRIORITY = {
+    "skills": 1.0,
+    "experience": 0.9,
+    "projects": 0.85,
+    "education": 0.8,
+    "summary": 0.6,
+    "certifications": 0.55,
+    "publications": 0.5,
+    "header": 0.45,
+    "awards": 0.4,
+    "activities": 0.35,
+    "other": 0.3,
+    "languages": 0.3,
+    "personal": 0.05,
+    "references": 0.0,
+}
+# Added per distinct JD term found in a section
+RELEVANCE_WEIGHT = 0.15
+
+_HEADINGS = {heading: name for name, headings in SECTION_HEADINGS.items() for heading in headings}
+_INLINE_HEADING = re.compile(
+    r"^(" + "|".join(sorted(map(re.escape, _HEADINGS), key=len, reverse=True)) + r")\s*[:\-–]\s*(.+)$",
+    re.IGNORECASE,
+)
+_HEADING_STRIP = " \t:-–|•*#"
+_SPACES = re.compile(r"[ \t\u00a0\u200b]+")
+_BULLET = re.compile(r"^[•▪●◦■□➢►\-*·]\s*")
+_PAGE_MARKER = re.compile(r"^(?:page\s*)?\d{1,3}(?:\s*(?:/|of)\s*\d{1,3})?$", re.IGNORECASE)
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+_URL = re.compile(r"(?:https?://|www\.)\S+|\b(?:linkedin|github|gitlab)\.com/\S*", re.IGNORECASE)
+_PHONE = re.compile(r"\+?\(?\d[\d\s().-]{7,}\d")
+_YEAR = re.compile(r"(?:19|20)\d\d")
+_CONTACT_LABEL = re.compile(r"^(?:e-?mail|phone|tel|mobile|address|linkedin|github|website|line id|โทร|อีเมล)\s*[:.]?\s*$", re.IGNORECASE)
+
+
+@dataclass
+class Section:
+    name: str
+    lines: List[str] = field(default_factory=list)
+    index: int = 0
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+
+def _is_phone(candidate: str) -> bool:
+    # 9+ digits, and not a date range like "2019 - 2021" or "01.2019 - 12.2021"
+    return sum(c.isdigit() for c in candidate) >= 9 and len(_YEAR.findall(candidate)) < 2
+
+
+def _strip_contact(line: str) -> str:
+    line = _EMAIL.sub("", line)
+    line = _URL.sub("", line)
+    return _PHONE.sub(lambda m: "" if _is_phone(m.group(0)) else m.group(0), line)
+
+
+def clean_lines(text: str) -> List[str]:
+    """
+    Normalized lines: collapsed whitespace, uniform bullets, no contact
+    details, page numbers, empty lines or repeats (page headers/footers)
+    """
+    lines: List[str] = []
+    seen = set()
+    for raw in text.splitlines():
+        line = _SPACES.sub(" ", _strip_contact(raw)).strip(" \t|,;")
+        if not line or _PAGE_MARKER.match(line) or _CONTACT_LABEL.match(line):
+            continue
+        line = _BULLET.sub("- ", line)
+        key = line.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        lines.append(line)
+    return lines
+
+
+def split_sections(lines: List[str]) -> List[Section]:
+    """Group lines under detected headings; lines before the first one are the header"""
+    sections = [Section("header")]
+    for line in lines:
+        heading = line.lower().strip(_HEADING_STRIP)
+        if len(heading) <= 40 and heading in _HEADINGS:
+            sections.append(Section(_HEADINGS[heading], [line.strip(_HEADING_STRIP)], len(sections)))
+            continue
+        inline = _INLINE_HEADING.match(line)
+        if inline and len(inline.group(1)) <= 40:
+            # "Skills: Python, SQL" opens a section with its content
+            sections.append(Section(_HEADINGS[inline.group(1).lower()], [line], len(sections)))
+            continue
+        sections[-1].lines.append(line)
+    return [section for section in sections if section.lines]
+
+
+def _priority(section: Section) -> float:
+    return SECTION_PRIORITY.get(section.name, SECTION_PRIORITY["other"])
+
+
+def _fit(section: Section, budget: int) -> List[str]:
+    """Leading lines of a section within `budget` tokens (a long line is cut)"""
+    kept: List[str] = []
+    used = 0
+    for line in section.lines:
+        cost = estimate_tokens(line + "\n")
+        if used + cost > budget:
+            room = (budget - used) * 4
+            if room >= MIN_PARTIAL_TOKENS * 4:
+                kept.append(line[:room].rsplit(" ", 1)[0])
+            break
+        kept.append(line)
+        used += cost
+    return kept
+
+
+def condense_resume(
+    text: str,
+    budget_tokens: Optional[int] = None,
+    relevance: Optional[Callable[[str], int]] = None,
+) -> str:
+    """
+    Resume text for a prompt, within `budget_tokens`: cleaned (see
+    clean_lines), split into sections and packed best-first. Sections are
+    ranked by SECTION_PRIORITY plus `relevance(section text)`, e.g. the
+    number of JD terms in it; kept sections stay in document order.
+    """
+    budget_tokens = PROMPT_RESUME_TOKENS if budget_tokens is None else budget_tokens
+    # References and the like are never worth prompt tokens
+    sections = [section for section in split_sections(clean_lines(text or "")) if _priority(section) > 0]
+    if estimate_tokens("\n".join(line for section in sections for line in section.lines)) <= budget_tokens:
+        return "\n".join(section.text for section in sections)
+
+    def score(section: Section) -> float:
+        hits = relevance(section.text) if relevance else 0
+        return _priority(section) + RELEVANCE_WEIGHT * hits
+
+    kept: Dict[int, List[str]] = {}
+    remaining = budget_tokens
+    for section in sorted(sections, key=score, reverse=True):
+        if remaining < MIN_PARTIAL_TOKENS:
+            break
+        lines = _fit(section, remaining)
+        # A heading alone says nothing
+        if len(lines) > 1 or (lines and len(section.lines) == 1):
+            kept[section.index] = lines
+            remaining -= estimate_tokens("\n".join(lines) + "\n")
+
+    return "\n".join("\n".join(kept[index]) for index in sorted(kept))
@@ -0,0 +1,206 @@
+# backend/app/services/context_cache.py
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+import logging
+
+from .gemini_client import GeminiUnavailableError, error_status_code, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# A 400/403 only counts as a cache miss when its message names the cached
+# content; a NOT_FOUND means the cache name is unknown or has expired
+CACHE_MISS_STATUS_CODES = {404}
+CACHE_MISS_STATUSES = {"NOT_FOUND"}
+CACHE_MISS_MARKERS = ("cachedcontent", "cached content")
+
+
+@dataclass
+class _CachedPrefix:
+    jd_id: str
+    name: str
+    expires_at: float
+    tokens: int
+
+
+class PromptContextCache:
+    """
+    Server-side Gemini context caches for the static prompt prefix of each
+    registered JD (instructions, JSON format and JD text).
+
+    `handle(jd)` returns a cachedContent name, creating it on first use and
+    extending its TTL shortly before it expires. Requests then send only
+    the resume part with `cached_content=<name>`; when Gemini no longer
+    knows the cache the caller invalidates it and resends the full prompt.
+    Prefixes shorter than the model's caching minimum are never cached.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        model: str,
+        prompt_version: str,
+        ttl_seconds: Optional[float] = None,
+        refresh_margin: Optional[float] = None,
+        min_tokens: Optional[int] = None,
+        retry_after: float = 300,
+    ):
+        if ttl_seconds is None:
+            ttl_seconds = float(os.getenv("CONTEXT_CACHE_TTL", "3600"))
+        if refresh_margin is None:
+            refresh_margin = float(os.getenv("CONTEXT_CACHE_REFRESH_MARGIN", "300"))
+        if min_tokens is None:
+            # Gemini rejects caches below a per-model minimum (1024+ tokens)
+            min_tokens = int(os.getenv("CONTEXT_CACHE_MIN_TOKENS", "1024"))
+
+        self.client = client
+        self.model = model
+        self.prompt_version = prompt_version
+        self.ttl_seconds = ttl_seconds
+        self.refresh_margin = min(refresh_margin, ttl_seconds / 2)
+        self.min_tokens = min_tokens
+        self.retry_after = retry_after
+        self._entries: Dict[str, _CachedPrefix] = {}
+        # Keys whose creation failed, with the time to try again
+        self._unavailable: Dict[str, float] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.metrics: Dict[str, int] = {
+            "hits": 0,
+            "created": 0,
+            "refreshed": 0,
+            "expired_fallbacks": 0,
+            "create_failures": 0,
+            "ineligible": 0,
+        }
+
+    def _key(self, jd: Any) -> str:
+        return f"{jd.jd_id}:{jd.version}:{self.prompt_version}:{self.model}"
+
+    def _ttl(self) -> str:
+        return f"{int(self.ttl_seconds)}s"
+
+    async def handle(self, jd: Any) -> Optional[str]:
+        """cachedContent name for the JD's prompt prefix, or None to send the full prompt"""
+        key = self._key(jd)
+        now = time.time()
+
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at - now > self.refresh_margin:
+            self.metrics["hits"] += 1
+            return entry.name
+        if self._unavailable.get(key, 0) > now:
+            return None
+        if estimate_tokens(jd.prompt_prefix) < self.min_tokens:
+            self.metrics["ineligible"] += 1
+            self._unavailable[key] = float("inf")
+            return None
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            # Someone else may have created or refreshed it while we waited
+            entry = self._entries.get(key)
+            now = time.time()
+            if entry is not None and entry.expires_at - now > self.refresh_margin:
+                self.metrics["hits"] += 1
+                return entry.name
+            if entry is not None and entry.expires_at > now:
+                return await self._refresh(key, entry)
+            return await self._create(key, jd)
+
+    async def _create(self, key: str, jd: Any) -> Optional[str]:
+        from google.genai import types
+
+        try:
+            cached = await self.client.aio.caches.create(
+                model=self.model,
+                config=types.CreateCachedContentConfig(
+                    display_name=f"resume-analysis-{jd.jd_id}"[:128],
+                    contents=[types.Content(role="user", parts=[types.Part(text=jd.prompt_prefix)])],
+                    ttl=self._ttl(),
+                ),
+            )
+        except Exception as e:
+            self.metrics["create_failures"] += 1
+            self._unavailable[key] = time.time() + self.retry_after
+            logger.warning(f"Could not create Gemini context cache for JD {jd.jd_id}: {e}")
+            return None
+
+        usage = getattr(cached, "usage_metadata", None)
+        tokens = getattr(usage, "total_token_count", None) or estimate_tokens(jd.prompt_prefix)
+        self._entries[key] = _CachedPrefix(jd.jd_id, cached.name, time.time() + self.ttl_seconds, tokens)
+        self.metrics["created"] += 1
+        logger.info(f"Created Gemini context cache {cached.name} for JD {jd.jd_id} ({tokens} tokens)")
+        return cached.name
+
+    async def _refresh(self, key: str, entry: _CachedPrefix) -> Optional[str]:
+        from google.genai import types
+
+        try:
+            await self.client.aio.caches.update(
+                name=entry.name, config=types.UpdateCachedContentConfig(ttl=self._ttl())
+            )
+        except Exception as e:
+            # Still valid until it expires; try again on a later request
+            logger.warning(f"Could not extend Gemini context cache {entry.name}: {e}")
+            return entry.name
+        entry.expires_at = time.time() + self.ttl_seconds
+        self.metrics["refreshed"] += 1
+        return entry.name
+
+    @staticmethod
+    def is_cache_miss(error: Exception) -> bool:
+        """Whether a failed request should be resent without the cache"""
+        cause = error.__cause__ if isinstance(error, GeminiUnavailableError) else error
+        if cause is None:
+            return False
+        text = str(cause)
+        if any(marker in text.lower() for marker in CACHE_MISS_MARKERS):
+            return True
+        status = getattr(cause, "status", None)
+        return (
+            error_status_code(cause) in CACHE_MISS_STATUS_CODES
+            or status in CACHE_MISS_STATUSES
+            or any(name in text for name in CACHE_MISS_STATUSES)
+        )
+
+    def invalidate(self, jd: Any, name: Optional[str] = None):
+        """Forget the cache for a JD (expired or deleted server-side)"""
+        key = self._key(jd)
+        entry = self._entries.get(key)
+        if entry is not None and (name is None or entry.name == name):
+            del self._entries[key]
+            self.metrics["expired_fallbacks"] += 1
+
+    async def _delete(self, keys: List[str]):
+        for key in keys:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                continue
+            try:
+                await self.client.aio.caches.delete(name=entry.name)
+            except Exception as e:
+                logger.debug(f"Could not delete Gemini context cache {entry.name}: {e}")
+
+    async def prune(self, jd: Any, deleted: bool = False):
+        """Delete caches of older versions of a JD (all of them once it is deleted)"""
+        current = None if deleted else self._key(jd)
+        await self._delete([
+            key for key, entry in self._entries.items() if entry.jd_id == jd.jd_id and key != current
+        ])
+
+    async def close(self):
+        """Delete every cache we created so unused storage isn't billed until TTL"""
+        await self._delete(list(self._entries))
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            **self.metrics,
+            "entries": len(self._entries),
+            "cached_tokens": sum(entry.tokens for entry in self._entries.values()),
+            "ttl_seconds": self.ttl_seconds,
+            "min_tokens": self.min_tokens,
+            "next_expiry_seconds": round(min((e.expires_at - now for e in self._entries.values()), default=0), 1),
+        }
@@ -0,0 +1,247 @@
+# backend/app/services/dedup.py
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Estimated Jaccard similarity of word shingles from which a resume counts
+# as a near-duplicate of an earlier one (a lightly edited or re-exported CV)
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.9"))
+# Resumes kept in the index (0 disables deduplication) and an optional
+# SQLite file so signatures survive restarts
+DEDUP_INDEX_SIZE = int(os.getenv("DEDUP_INDEX_SIZE", "20000"))
+DEDUP_INDEX_DB = os.getenv("DEDUP_INDEX_DB") or None
+# MinHash permutations, LSH bands (rows per band = permutations / bands)
+# and words per shingle
+DEDUP_NUM_PERM = int(os.getenv("DEDUP_NUM_PERM", "128"))
+DEDUP_BANDS = int(os.getenv("DEDUP_BANDS", "16"))
+DEDUP_SHINGLE_WORDS = int(os.getenv("DEDUP_SHINGLE_WORDS", "3"))
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_MERSENNE_PRIME = (1 << 61) - 1
+
+
+def shingles(text: str, size: int = DEDUP_SHINGLE_WORDS) -> Set[int]:
+    """crc32 hashes of every run of `size` consecutive words (case-folded)"""
+    words = _WORD.findall(text.lower())
+    if len(words) <= size:
+        return {zlib.crc32(" ".join(words).encode("utf-8"))} if words else set()
+    return {zlib.crc32(" ".join(words[i:i + size]).encode("utf-8")) for i in range(len(words) - size + 1)}
+
+
+class DuplicateIndex:
+    """
+    Near-duplicate detection over extracted resume text: MinHash
+    signatures of word shingles, banded into an LSH table so a lookup only
+    compares against resumes sharing a band (constant time per resume, not
+    a scan of the index). Candidates are confirmed by the signature
+    agreement, an estimate of their Jaccard similarity. Bounded LRU in
+    memory, optionally persisted to SQLite (DEDUP_INDEX_DB).
+
+    numpy is imported on first use (warm_up), so importing the app doesn't
+    pay for it; the SQLite file is loaded then as well.
+    """
+
+    def __init__(
+        self,
+        threshold: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        db_path: Optional[str] = None,
+        num_perm: Optional[int] = None,
+        bands: Optional[int] = None,
+    ):
+        self.threshold = DEDUP_THRESHOLD if threshold is None else threshold
+        self.max_entries = max(1, DEDUP_INDEX_SIZE if max_entries is None else max_entries)
+        self.db_path = DEDUP_INDEX_DB if db_path is None else db_path
+        num_perm = DEDUP_NUM_PERM if num_perm is None else num_perm
+        bands = DEDUP_BANDS if bands is None else bands
+        self.bands = max(1, min(bands, num_perm))
+        self.rows = max(1, num_perm // self.bands)
+        self.num_perm = self.bands * self.rows
+
+        self._np = None
+        self._permutations = None
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._db: Optional[sqlite3.Connection] = None
+        # resume_id -> (signature, filename); band key -> resume ids
+        self._items: "OrderedDict[str, Tuple[Any, str]]" = OrderedDict()
+        self._buckets: Dict[Tuple[int, bytes], Set[str]] = {}
+        self.checked = 0
+        self.duplicates_found = 0
+        self.reused = 0
+
+    def _numpy(self):
+        if self._np is None:
+            import numpy as np
+
+            # Fixed seed: signatures stay comparable across restarts and workers
+            rng = np.random.RandomState(1)
+            a = rng.randint(1, 1 << 32, size=(self.num_perm, 1), dtype=np.uint64)
+            b = rng.randint(0, 1 << 32, size=(self.num_perm, 1), dtype=np.uint64)
+            self._permutations = (a, b)
+            self._np = np
+        return self._np
+
+    def warm_up(self):
+        """Import numpy and load the SQLite file ahead of traffic"""
+        self._numpy()
+        self._ensure_loaded()
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            if self.db_path:
+                self._open_db(self.db_path)
+
+    def _open_db(self, db_path: str):
+        np = self._numpy()
+        try:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS resume_signatures (
+                    resume_id TEXT PRIMARY KEY,
+                    filename TEXT NOT NULL,
+                    signature BLOB NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            self._db.commit()
+            rows = self._db.execute(
+                "SELECT resume_id, filename, signature FROM resume_signatures ORDER BY updated_at DESC LIMIT ?",
+                (self.max_entries,),
+            ).fetchall()
+            loaded = 0
+            for resume_id, filename, blob in reversed(rows):
+                signature = np.frombuffer(blob, dtype=np.uint64)
+                # Written with other DEDUP_NUM_PERM/DEDUP_BANDS settings
+                if len(signature) != self.num_perm:
+                    continue
+                self._insert(resume_id, filename, signature)
+                loaded += 1
+            logger.info(f"Loaded {loaded} resume signatures from {db_path}")
+        except sqlite3.Error as e:
+            logger.error(f"Failed to open dedup index DB {db_path}: {e}")
+            self._db = None
+
+    def _db_write(self, added: Sequence[Tuple[str, str, Any]], evicted: Sequence[str] = ()):
+        if self._db is None:
+            return
+        try:
+            now = time.time()
+            self._db.executemany(
+                "INSERT OR REPLACE INTO resume_signatures VALUES (?, ?, ?, ?)",
+                [(resume_id, filename, signature.tobytes(), now) for resume_id, filename, signature in added],
+            )
+            self._db.executemany("DELETE FROM resume_signatures WHERE resume_id = ?", [(key,) for key in evicted])
+            self._db.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Dedup index write error: {e}")
+
+    def signature(self, text: str):
+        """MinHash signature (num_perm uint64) of the text's word shingles"""
+        np = self._numpy()
+        hashes = np.fromiter(shingles(text), dtype=np.uint64)
+        if not len(hashes):
+            return np.full(self.num_perm, _MERSENNE_PRIME, dtype=np.uint64)
+        a, b = self._permutations
+        # a, b and the hashes are < 2**32, so a * h + b can't overflow uint64
+        return ((a * hashes + b) % np.uint64(_MERSENNE_PRIME)).min(axis=1)
+
+    def _band_keys(self, signature) -> List[Tuple[int, bytes]]:
+        return [
+            (band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    def _insert(self, resume_id: str, filename: str, signature):
+        self._remove(resume_id)
+        self._items[resume_id] = (signature, filename)
+        for key in self._band_keys(signature):
+            self._buckets.setdefault(key, set()).add(resume_id)
+
+    def _remove(self, resume_id: str):
+        entry = self._items.pop(resume_id, None)
+        if entry is None:
+            return
+        for key in self._band_keys(entry[0]):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(resume_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def query(self, signature, exclude: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Indexed resumes at or above the threshold, most similar first"""
+        self._ensure_loaded()
+        np = self._numpy()
+        with self._lock:
+            candidates: Set[str] = set()
+            for key in self._band_keys(signature):
+                candidates.update(self._buckets.get(key, ()))
+            candidates.discard(exclude)
+            found = []
+            for resume_id in candidates:
+                other, filename = self._items[resume_id]
+                similarity = float(np.count_nonzero(other == signature)) / self.num_perm
+                if similarity >= self.threshold:
+                    found.append({"resume_id": resume_id, "filename": filename, "similarity": round(similarity, 4)})
+            self.checked += 1
+            self.duplicates_found += bool(found)
+        found.sort(key=lambda item: -item["similarity"])
+        return found
+
+    def find(self, resume_text: str, exclude: Optional[str] = None) -> List[Dict[str, Any]]:
+        return self.query(self.signature(resume_text), exclude)
+
+    def add(self, resume_id: str, filename: str, resume_text: str):
+        """Index a resume (again) under its id, evicting the least recent beyond max_entries"""
+        self._ensure_loaded()
+        signature = self.signature(resume_text)
+        with self._lock:
+            self._insert(resume_id, filename, signature)
+            evicted = []
+            while len(self._items) > self.max_entries:
+                oldest = next(iter(self._items))
+                self._remove(oldest)
+                evicted.append(oldest)
+            self._db_write([(resume_id, filename, signature)], evicted)
+
+    def count_reused(self):
+        """A duplicate's analysis was adapted instead of calling the model"""
+        with self._lock:
+            self.reused += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": "sqlite" if self._db is not None else "memory",
+                "resumes": len(self._items),
+                "max_entries": self.max_entries,
+                "threshold": self.threshold,
+                "num_perm": self.num_perm,
+                "bands": self.bands,
+                "checked": self.checked,
+                "duplicates_found": self.duplicates_found,
+                "reused": self.reused,
+            }
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
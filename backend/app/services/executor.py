@@ -0,0 +1,193 @@
+# backend/app/services/executor.py
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class _Lane:
+    """
+    Concurrency-limited lane that tracks how many jobs are running and queued
+    """
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = max(1, limit)
+        self.running = 0
+        self.queued = 0
+        self.completed = 0
+        self.failed = 0
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one of the lane's slots for the duration of the block"""
+        # Created on first use so the semaphore binds to the serving loop
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.limit)
+
+        self.queued += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.queued -= 1
+
+        self.running += 1
+        try:
+            yield
+            self.completed += 1
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.running -= 1
+            self._slots.release()
+
+    async def run(self, job: Callable[[], Any]) -> Any:
+        async with self.slot():
+            return await job()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "limit": self.limit,
+            "running": self.running,
+            "queued": self.queued,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+
+class AnalysisExecutor:
+    """
+    Runs the blocking parts of the analysis pipeline off the event loop.
+
+    PDF parsing is CPU-bound and goes to a bounded process pool; OCR of
+    scanned pages is much slower still and gets its own small pool so it
+    cannot starve text-layer parsing. Model calls are awaited (async client)
+    or pushed to a bounded thread pool. Each side has its own concurrency
+    limit so a burst of uploads queues instead of stalling the worker.
+    """
+
+    def __init__(
+        self,
+        pdf_workers: Optional[int] = None,
+        pdf_concurrency: Optional[int] = None,
+        llm_concurrency: Optional[int] = None,
+        ocr_workers: Optional[int] = None,
+    ):
+        if pdf_workers is None:
+            pdf_workers = int(os.getenv("PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+        if pdf_concurrency is None:
+            pdf_concurrency = int(os.getenv("PDF_CONCURRENCY", str(max(1, pdf_workers) * 2)))
+        if llm_concurrency is None:
+            llm_concurrency = int(os.getenv("LLM_CONCURRENCY", "16"))
+        if ocr_workers is None:
+            ocr_workers = int(os.getenv("OCR_WORKERS", "2"))
+
+        # PDF_WORKERS=0 keeps parsing in threads (useful where fork is unavailable)
+        self.pdf_workers = max(0, pdf_workers)
+        self.pdf_lane = _Lane("pdf", pdf_concurrency)
+        self.llm_lane = _Lane("llm", llm_concurrency)
+        # One page per OCR worker at a time; extra pages queue in the lane
+        self.ocr_workers = max(1, ocr_workers)
+        self.ocr_lane = _Lane("ocr", self.ocr_workers)
+        self._pdf_pool: Optional[ProcessPoolExecutor] = None
+        self._ocr_pool: Optional[ProcessPoolExecutor] = None
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+
+    def _get_pdf_pool(self):
+        if self.pdf_workers == 0:
+            return self._get_thread_pool()
+        if self._pdf_pool is None:
+            self._pdf_pool = ProcessPoolExecutor(max_workers=self.pdf_workers)
+        return self._pdf_pool
+
+    def _get_ocr_pool(self):
+        if self.pdf_workers == 0:
+            return self._get_thread_pool()
+        if self._ocr_pool is None:
+            self._ocr_pool = ProcessPoolExecutor(max_workers=self.ocr_workers)
+        return self._ocr_pool
+
+    def _get_thread_pool(self) -> ThreadPoolExecutor:
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(
+                max_workers=max(self.llm_lane.limit, self.pdf_lane.limit + self.ocr_lane.limit),
+                thread_name_prefix="analysis",
+            )
+        return self._thread_pool
+
+    async def run_pdf(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a CPU-bound function in the PDF process pool.
+        `fn` and its arguments must be picklable (module-level function).
+        """
+        loop = asyncio.get_running_loop()
+        pool = self._get_pdf_pool()
+        return await self.pdf_lane.run(lambda: loop.run_in_executor(pool, fn, *args))
+
+    async def run_ocr(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run an OCR job in the OCR process pool (same pickling rules as run_pdf)
+        """
+        loop = asyncio.get_running_loop()
+        pool = self._get_ocr_pool()
+        return await self.ocr_lane.run(lambda: loop.run_in_executor(pool, fn, *args))
+
+    async def run_llm(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a model call under the LLM concurrency limit.
+        Coroutine functions are awaited directly; blocking callables run in
+        the thread pool.
+        """
+        if asyncio.iscoroutinefunction(fn):
+            return await self.llm_lane.run(lambda: fn(*args, **kwargs))
+
+        loop = asyncio.get_running_loop()
+        pool = self._get_thread_pool()
+        return await self.llm_lane.run(
+            lambda: loop.run_in_executor(pool, lambda: fn(*args, **kwargs))
+        )
+
+    async def warm_up(self, fn: Callable[[], Any]) -> List[Any]:
+        """
+        Start the process pools' workers ahead of traffic by running `fn`
+        (picklable, e.g. one that imports heavy modules) once per worker.
+        Returns the results; nothing runs when parsing stays in threads.
+        """
+        if self.pdf_workers == 0:
+            return []
+        loop = asyncio.get_running_loop()
+        pdf_pool, ocr_pool = self._get_pdf_pool(), self._get_ocr_pool()
+        jobs = [loop.run_in_executor(pdf_pool, fn) for _ in range(self.pdf_workers)]
+        jobs += [loop.run_in_executor(ocr_pool, fn) for _ in range(self.ocr_workers)]
+        return list(await asyncio.gather(*jobs))
+
+    def llm_slot(self):
+        """Async context manager holding an LLM slot, for streamed calls"""
+        return self.llm_lane.slot()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pdf": {"workers": self.pdf_workers, **self.pdf_lane.stats()},
+            "ocr": {"workers": self.ocr_workers, **self.ocr_lane.stats()},
+            "llm": self.llm_lane.stats(),
+            "queue_depth": self.pdf_lane.queued + self.ocr_lane.queued + self.llm_lane.queued,
+            "in_flight": self.pdf_lane.running + self.ocr_lane.running + self.llm_lane.running,
+        }
+
+    def shutdown(self):
+        if self._pdf_pool is not None:
+            self._pdf_pool.shutdown(wait=False, cancel_futures=True)
+            self._pdf_pool = None
+        if self._ocr_pool is not None:
+            self._ocr_pool.shutdown(wait=False, cancel_futures=True)
+            self._ocr_pool = None
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown(wait=False, cancel_futures=True)
+            self._thread_pool = None
+        logger.info("Analysis executor shut down")
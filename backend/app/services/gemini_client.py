@@ -0,0 +1,421 @@
+# backend/app/services/gemini_client.py
+import asyncio
+import contextlib
+import os
+import random
+import re
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+import logging
+
+from .metrics import record_token_usage
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+_RETRY_IN = re.compile(r"retry in ([\d.]+)\s*s", re.IGNORECASE)
+_RETRY_DELAY = re.compile(r"retryDelay['\"]?\s*[:=]\s*['\"]?([\d.]+)s")
+
+
+class GeminiUnavailableError(Exception):
+    """The model could not be reached within the retry budget"""
+
+
+class CircuitOpenError(GeminiUnavailableError):
+    """Calls are short-circuited after repeated failures"""
+
+
+class TokenBucket:
+    """
+    Async token bucket refilled continuously at `per_minute` tokens per
+    minute. Callers wait in FIFO order until enough tokens are available.
+    A rate of 0 disables the limit.
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.per_minute = per_minute
+        self.capacity = capacity if capacity is not None else per_minute
+        self.tokens = self.capacity
+        self._rate = per_minute / 60.0
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self.waiting = 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1) -> float:
+        """Take `amount` tokens, waiting if needed; returns seconds waited"""
+        if self.per_minute <= 0:
+            return 0.0
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        amount = min(amount, self.capacity)
+        started = time.monotonic()
+        self.waiting += 1
+        try:
+            async with self._lock:
+                while True:
+                    self._refill()
+                    pause = self._blocked_until - time.monotonic()
+                    if pause > 0:
+                        await asyncio.sleep(pause)
+                        continue
+                    if self.tokens >= amount:
+                        self.tokens -= amount
+                        break
+                    await asyncio.sleep((amount - self.tokens) / self._rate)
+        finally:
+            self.waiting -= 1
+        return time.monotonic() - started
+
+    def adjust(self, amount: float):
+        """Charge (positive) or refund (negative) tokens after the fact"""
+        if self.per_minute > 0:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens - amount)
+
+    def pause(self, seconds: float):
+        """Hold every caller for `seconds` (server asked us to back off)"""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures, rejects calls for
+    `reset_timeout` seconds, then lets a single trial call through
+    (half-open) to decide whether to close again. A trial that ends
+    without a verdict (cancelled, or an error that says nothing about
+    Gemini's health) is released so the next call can try instead.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_count = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._trial_in_flight or self.failures >= self.failure_threshold:
+            if self._opened_at is None or self._trial_in_flight:
+                self.opened_count += 1
+                logger.warning(f"Gemini circuit opened after {self.failures} consecutive failures")
+            self._opened_at = time.monotonic()
+        self._trial_in_flight = False
+
+    def release(self):
+        """The half-open trial ended with neither success nor failure"""
+        self._trial_in_flight = False
+
+
+def error_status_code(error: Exception) -> Optional[int]:
+    code = getattr(error, "code", None)
+    if isinstance(code, int):
+        return code
+    text = str(error)
+    if "RESOURCE_EXHAUSTED" in text or text.startswith("429"):
+        return 429
+    return None
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    # httpx transport errors (connect/read timeouts, resets) without importing httpx here
+    if type(error).__module__.startswith(("httpx", "httpcore")):
+        return True
+    return error_status_code(error) in RETRYABLE_STATUS_CODES
+
+
+def retry_hint(error: Exception) -> Optional[float]:
+    """Seconds the server asked us to wait (RetryInfo.retryDelay / "retry in Ns")"""
+    details = getattr(error, "details", None)
+    for text in (str(details) if details else "", str(error)):
+        match = _RETRY_DELAY.search(text) or _RETRY_IN.search(text)
+        if match:
+            return float(match.group(1))
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers is not None:
+        value = headers.get("retry-after")
+        if value and value.replace(".", "", 1).isdigit():
+            return float(value)
+    return None
+
+
+def estimate_tokens(text: str) -> int:
+    # Rough: ~4 characters per token for latin text
+    return max(1, len(text) // 4)
+
+
+class GeminiClient:
+    """
+    Shared wrapper around the google-genai async client.
+
+    Every call passes through requests-per-minute and tokens-per-minute
+    token buckets (callers queue when near quota), runs under the executor's
+    LLM concurrency limit, retries transient errors with jittered
+    exponential backoff that honours server retry hints, and is rejected
+    fast while the circuit breaker is open.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        executor: Any = None,
+        model: str = "gemini-2.0-flash",
+        rpm: Optional[float] = None,
+        tpm: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        base_delay: Optional[float] = None,
+        max_delay: Optional[float] = None,
+        timeout: Optional[float] = None,
+        expected_output_tokens: int = 1024,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        if rpm is None:
+            rpm = float(os.getenv("GEMINI_RPM", "60"))
+        if tpm is None:
+            tpm = float(os.getenv("GEMINI_TPM", "1000000"))
+        if max_retries is None:
+            max_retries = int(os.getenv("GEMINI_MAX_RETRIES", "3"))
+        if base_delay is None:
+            base_delay = float(os.getenv("GEMINI_BACKOFF_BASE", "1.0"))
+        if max_delay is None:
+            max_delay = float(os.getenv("GEMINI_BACKOFF_MAX", "30"))
+        if timeout is None:
+            timeout = float(os.getenv("GEMINI_TIMEOUT", "60"))
+        if breaker is None:
+            breaker = CircuitBreaker(
+                failure_threshold=int(os.getenv("GEMINI_BREAKER_THRESHOLD", "5")),
+                reset_timeout=float(os.getenv("GEMINI_BREAKER_RESET", "30")),
+            )
+
+        self.client = client
+        self.executor = executor
+        self.model = model
+        self.max_retries = max(0, max_retries)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.expected_output_tokens = expected_output_tokens
+        self.requests_bucket = TokenBucket(rpm)
+        self.tokens_bucket = TokenBucket(tpm)
+        self.breaker = breaker
+        self.metrics: Dict[str, float] = {
+            "requests": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "short_circuited": 0,
+            "throttle_wait_seconds": 0.0,
+            "backoff_seconds": 0.0,
+            "tokens_used": 0,
+            "cached_tokens": 0,
+        }
+
+    def _backoff(self, attempt: int, hint: Optional[float]) -> float:
+        # Full jitter on the exponential delay, never shorter than the server hint
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        if hint is not None:
+            delay = max(delay, min(hint, self.max_delay * 4))
+        return delay
+
+    def _record_error(self, error: Exception, retryable: bool, trial: bool):
+        if retryable:
+            self.breaker.record_failure()
+        elif error_status_code(error) is not None:
+            # Gemini answered (e.g. 400 for this request's content): it is reachable
+            self.breaker.record_success()
+        elif trial:
+            self.breaker.release()
+
+    def _record_usage(self, usage: Any, estimated: int):
+        used = getattr(usage, "total_token_count", None)
+        if isinstance(used, int):
+            self.metrics["tokens_used"] += used
+            self.tokens_bucket.adjust(used - estimated)
+        cached = getattr(usage, "cached_content_token_count", None)
+        if isinstance(cached, int):
+            self.metrics["cached_tokens"] += cached
+        record_token_usage(usage)
+
+    async def _call(self, **kwargs: Any) -> Any:
+        call = self.client.aio.models.generate_content
+        if self.executor is not None:
+            return await asyncio.wait_for(self.executor.run_llm(call, **kwargs), self.timeout)
+        return await asyncio.wait_for(call(**kwargs), self.timeout)
+
+    async def generate(self, contents: Any, model: Optional[str] = None, **kwargs: Any) -> Any:
+        """generate_content with rate limiting, retries and circuit breaking"""
+        model = model or self.model
+        estimated = estimate_tokens(str(contents)) + self.expected_output_tokens
+
+        for attempt in range(self.max_retries + 1):
+            if not self.breaker.allow():
+                self.metrics["short_circuited"] += 1
+                raise CircuitOpenError("Gemini circuit breaker is open")
+            # Let through while half-open: this call is the trial
+            trial = self.breaker.state == CircuitBreaker.HALF_OPEN
+            settled = False
+
+            try:
+                waited = await self.requests_bucket.acquire(1)
+                waited += await self.tokens_bucket.acquire(estimated)
+                self.metrics["throttle_wait_seconds"] += waited
+                self.metrics["requests"] += 1
+                response = await self._call(model=model, contents=contents, **kwargs)
+                settled = True
+            except Exception as e:
+                settled = True
+                status = error_status_code(e)
+                retryable = is_retryable(e)
+                hint = retry_hint(e)
+                if status == 429:
+                    self.metrics["rate_limited"] += 1
+                    # Everyone else should hold off too, not just this caller
+                    self.requests_bucket.pause(hint if hint is not None else self._backoff(attempt, None))
+                self._record_error(e, retryable, trial)
+
+                if not retryable or attempt >= self.max_retries:
+                    self.metrics["failed"] += 1
+                    raise GeminiUnavailableError(f"Gemini request failed: {e}") from e
+
+                delay = self._backoff(attempt, hint)
+                self.metrics["retries"] += 1
+                self.metrics["backoff_seconds"] += delay
+                logger.warning(
+                    f"Gemini error (attempt {attempt + 1}/{self.max_retries + 1}), retrying in {delay:.1f}s: {e}"
+                )
+                await asyncio.sleep(delay)
+                continue
+            finally:
+                # Cancelled (client gone, caller's timeout): no verdict either way
+                if trial and not settled:
+                    self.breaker.release()
+
+            self.breaker.record_success()
+            self.metrics["succeeded"] += 1
+            self._record_usage(getattr(response, "usage_metadata", None), estimated)
+            return response
+
+        raise GeminiUnavailableError("Gemini retry budget exhausted")
+
+    async def generate_stream(self, contents: Any, model: Optional[str] = None, **kwargs: Any) -> AsyncIterator[Any]:
+        """
+        generate_content_stream under the same rate limits and circuit
+        breaker. Opening the stream is retried like `generate`; once the
+        first chunk has been yielded errors are raised as
+        GeminiUnavailableError, since a partial answer can't be replayed.
+        `timeout` applies to the wait for each chunk.
+        """
+        model = model or self.model
+        estimated = estimate_tokens(str(contents)) + self.expected_output_tokens
+
+        for attempt in range(self.max_retries + 1):
+            if not self.breaker.allow():
+                self.metrics["short_circuited"] += 1
+                raise CircuitOpenError("Gemini circuit breaker is open")
+            trial = self.breaker.state == CircuitBreaker.HALF_OPEN
+            settled = False
+
+            yielded = False
+            usage = None
+            slot = self.executor.llm_slot() if self.executor is not None else contextlib.nullcontext()
+            try:
+                waited = await self.requests_bucket.acquire(1)
+                waited += await self.tokens_bucket.acquire(estimated)
+                self.metrics["throttle_wait_seconds"] += waited
+                self.metrics["requests"] += 1
+                async with slot:
+                    stream = await asyncio.wait_for(
+                        self.client.aio.models.generate_content_stream(model=model, contents=contents, **kwargs),
+                        self.timeout,
+                    )
+                    iterator = stream.__aiter__()
+                    while True:
+                        try:
+                            chunk = await asyncio.wait_for(iterator.__anext__(), self.timeout)
+                        except StopAsyncIteration:
+                            break
+                        usage = getattr(chunk, "usage_metadata", None) or usage
+                        yielded = True
+                        yield chunk
+                settled = True
+            except Exception as e:
+                settled = True
+                status = error_status_code(e)
+                retryable = is_retryable(e)
+                hint = retry_hint(e)
+                if status == 429:
+                    self.metrics["rate_limited"] += 1
+                    self.requests_bucket.pause(hint if hint is not None else self._backoff(attempt, None))
+                self._record_error(e, retryable, trial)
+
+                if yielded or not retryable or attempt >= self.max_retries:
+                    self.metrics["failed"] += 1
+                    raise GeminiUnavailableError(f"Gemini stream failed: {e}") from e
+
+                delay = self._backoff(attempt, hint)
+                self.metrics["retries"] += 1
+                self.metrics["backoff_seconds"] += delay
+                logger.warning(
+                    f"Gemini stream error (attempt {attempt + 1}/{self.max_retries + 1}), retrying in {delay:.1f}s: {e}"
+                )
+                await asyncio.sleep(delay)
+                continue
+            finally:
+                # Cancelled or closed early (GeneratorExit): no verdict either way
+                if trial and not settled:
+                    self.breaker.release()
+
+            self.breaker.record_success()
+            self.metrics["succeeded"] += 1
+            self._record_usage(usage, estimated)
+            return
+
+        raise GeminiUnavailableError("Gemini retry budget exhausted")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **{key: round(value, 3) if isinstance(value, float) else value for key, value in self.metrics.items()},
+            "circuit": self.breaker.state,
+            "circuit_opened": self.breaker.opened_count,
+            "rpm_limit": self.requests_bucket.per_minute,
+            "tpm_limit": self.tokens_bucket.per_minute,
+            "waiting_for_quota": self.requests_bucket.waiting + self.tokens_bucket.waiting,
+        }
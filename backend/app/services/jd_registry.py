@@ -0,0 +1,310 @@
+# backend/app/services/jd_registry.py
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple, Union
+import logging
+
+from ..models import JD_AI_DATA_INTERN
+from .cache import make_key
+from .condenser import condense_resume
+from .local_scorer import CATEGORY_WEIGHTS, LocalScorer, normalize_weights
+from .tiering import ScreeningBand, validate_screening
+
+if TYPE_CHECKING:
+    from .ranking_service import CandidateRanker
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JD_ID = "default"
+MAX_JDS = int(os.getenv("MAX_JDS", "200"))
+_JD_ID = re.compile(r"^[a-z0-9][a-z0-9_-]{0,63}$")
+
+ANALYSIS_JSON_FORMAT = """{
+        "scores": {
+            "education": 0-100,
+            "skills": 0-100,
+            "experience": 0-100,
+            "tools": 0-100
+        },
+        "match_percentage": 0-100,
+        "strengths": ["list strengths"],
+        "weaknesses": ["list weaknesses"],
+        "recommendations": ["list recommendations"],
+        "matched_skills": ["list matched skills"],
+        "missing_skills": ["list missing skills"]
+    }"""
+
+def requirements_block(jd: Dict[str, Any]) -> str:
+    return f"""Required Skills: {', '.join(jd.get('required_skills', []))}
+    Preferred Skills: {', '.join(jd.get('preferred_skills', []))}
+    Required Tools: {', '.join(jd.get('required_tools', []))}"""
+
+
+def analysis_prompt_prefix(jd: Dict[str, Any]) -> str:
+    """
+    Everything in the single-resume prompt that depends only on the JD.
+    The resume comes last so this prefix is identical across calls.
+    """
+    return f"""
+    Analyze this resume for the position: {jd['position']}
+
+    {requirements_block(jd)}
+
+    Provide analysis in this JSON format:
+    {ANALYSIS_JSON_FORMAT}
+
+    Respond only with valid JSON.
+
+    Resume Text:
+    """
+
+
+def validate_jd(jd: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalized copy of a JD definition; raises ValueError when unusable"""
+    position = str(jd.get("position") or "").strip()
+    if not position:
+        raise ValueError("Job description needs a position")
+
+    cleaned: Dict[str, Any] = {"position": position}
+    for name in LocalScorer.JD_FIELDS + ("responsibilities",):
+        values = [str(value).strip() for value in jd.get(name) or [] if str(value).strip()]
+        if values:
+            cleaned[name] = values
+    if not any(name in cleaned for name in LocalScorer.JD_FIELDS):
+        raise ValueError("Job description needs at least one skill, tool or education list")
+
+    weights = jd.get("weights")
+    if weights:
+        unknown = set(weights) - set(CATEGORY_WEIGHTS)
+        if unknown:
+            raise ValueError(f"Unknown weight categories: {', '.join(sorted(unknown))}")
+        if normalize_weights(weights) is None:
+            raise ValueError("Weights must include a positive value")
+        cleaned["weights"] = {key: float(weights[key]) for key in CATEGORY_WEIGHTS if key in weights}
+
+    screening = jd.get("screening")
+    if screening:
+        cleaned["screening"] = validate_screening(screening)
+    return cleaned
+
+
+def skill_vocabulary(jd: Dict[str, Any]) -> Tuple[str, ...]:
+    """The JD's skills and tools in order, each once (case-insensitive): the ids compact results use"""
+    seen = set()
+    vocabulary = []
+    for name in ("required_skills", "preferred_skills", "required_tools", "preferred_tools"):
+        for term in jd.get(name, []):
+            if term.lower() not in seen:
+                seen.add(term.lower())
+                vocabulary.append(term)
+    return tuple(vocabulary)
+
+
+@dataclass
+class CompiledJD:
+    """
+    A registered JD plus everything derived from it, built once at
+    registration: prompt prefix, local scorer (term matcher and weights),
+    screening band and, lazily, the vectorized ranker.
+    """
+
+    jd_id: str
+    jd: Dict[str, Any]
+    version: str
+    scorer: LocalScorer
+    requirements: str
+    prompt_prefix: str
+    band: ScreeningBand
+    created_at: float
+    updated_at: float
+    _ranker: Optional["CandidateRanker"] = field(default=None, repr=False)
+    _skill_ids: Optional[Dict[str, int]] = field(default=None, repr=False)
+
+    @classmethod
+    def compile(cls, jd_id: str, jd: Dict[str, Any], created_at: Optional[float] = None) -> "CompiledJD":
+        now = time.time()
+        return cls(
+            jd_id=jd_id,
+            jd=jd,
+            version=make_key(jd),
+            scorer=LocalScorer.for_jd(jd),
+            requirements=requirements_block(jd),
+            prompt_prefix=analysis_prompt_prefix(jd),
+            band=ScreeningBand.for_jd(jd),
+            created_at=created_at or now,
+            updated_at=now,
+        )
+
+    @property
+    def position(self) -> str:
+        return self.jd["position"]
+
+    @property
+    def weights(self) -> Dict[str, float]:
+        return self.scorer.weights
+
+    @property
+    def ranker(self) -> "CandidateRanker":
+        if self._ranker is None:
+            # numpy is only needed once something is ranked
+            from .ranking_service import CandidateRanker
+
+            self._ranker = CandidateRanker(self.jd)
+        return self._ranker
+
+    @property
+    def vocabulary(self) -> Tuple[str, ...]:
+        return skill_vocabulary(self.jd)
+
+    def skill_id(self, skill: str) -> Union[int, str]:
+        """A skill's index in the vocabulary, or the name itself when the JD doesn't list it"""
+        if self._skill_ids is None:
+            self._skill_ids = {term.lower(): index for index, term in enumerate(self.vocabulary)}
+        return self._skill_ids.get(skill.lower(), skill)
+
+    def relevance(self, text: str) -> int:
+        """Number of distinct JD terms in a piece of resume text"""
+        return len(self.scorer.signals(text).terms)
+
+    def condense(self, resume_text: str) -> str:
+        """Resume text packed into the prompt budget, JD-relevant sections first"""
+        return condense_resume(resume_text, relevance=self.relevance)
+
+    def prompt(self, resume_text: str) -> str:
+        """Full single-resume prompt: cached prefix + the (condensed) resume part"""
+        return f"{self.prompt_prefix}{self.resume_part(resume_text)}"
+
+    def resume_part(self, resume_text: str) -> str:
+        """What a request sends when the prefix is held in a Gemini context cache"""
+        return f"{resume_text}\n"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.jd_id,
+            "version": self.version,
+            "job_description": self.jd,
+            "weights": {key: round(value, 4) for key, value in self.weights.items()},
+            "screening": self.band.to_dict(),
+            # Skill ids in compact results index into this list
+            "vocabulary": list(self.vocabulary),
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+
+class JDRegistry:
+    """
+    Job descriptions by id, compiled at registration.
+
+    Always holds the built-in default JD (app.models.JD_AI_DATA_INTERN
+    unless `defaults` is given), which can be updated but not deleted.
+    With `path` (JD_REGISTRY_PATH) definitions are persisted as JSON and
+    reloaded at startup. Listeners are called with
+    (event, CompiledJD) after every create/update/delete.
+    """
+
+    def __init__(self, defaults: Optional[Dict[str, Dict[str, Any]]] = None, path: Optional[str] = None):
+        if defaults is None:
+            defaults = {DEFAULT_JD_ID: JD_AI_DATA_INTERN}
+        if path is None:
+            path = os.getenv("JD_REGISTRY_PATH") or None
+        self.path = path
+        self._entries: Dict[str, CompiledJD] = {}
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[str, CompiledJD], None]] = []
+
+        for jd_id, jd in defaults.items():
+            self._entries[jd_id] = CompiledJD.compile(jd_id, validate_jd(jd))
+        if self.path and os.path.exists(self.path):
+            self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                stored = json.load(f)
+            for item in stored:
+                jd_id = item["id"]
+                self._entries[jd_id] = CompiledJD.compile(jd_id, validate_jd(item["job_description"]), item.get("created_at"))
+            logger.info(f"Loaded {len(stored)} job descriptions from {self.path}")
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"Could not load JD registry from {self.path}: {e}")
+
+    def _save(self):
+        if not self.path:
+            return
+        stored = [
+            {"id": entry.jd_id, "job_description": entry.jd, "created_at": entry.created_at}
+            for entry in self._entries.values()
+        ]
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(stored, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def add_listener(self, listener: Callable[[str, CompiledJD], None]):
+        self._listeners.append(listener)
+
+    def _notify(self, event: str, entry: CompiledJD):
+        for listener in self._listeners:
+            try:
+                listener(event, entry)
+            except Exception as e:
+                logger.warning(f"JD registry listener failed on {event} {entry.jd_id}: {e}")
+
+    @property
+    def default(self) -> CompiledJD:
+        return self._entries[DEFAULT_JD_ID]
+
+    def get(self, jd_id: Optional[str] = None) -> CompiledJD:
+        """Compiled JD by id (the default when None); KeyError if unknown"""
+        entry = self._entries.get(jd_id or DEFAULT_JD_ID)
+        if entry is None:
+            raise KeyError(jd_id)
+        return entry
+
+    def list(self) -> List[CompiledJD]:
+        return list(self._entries.values())
+
+    def create(self, jd: Dict[str, Any], jd_id: Optional[str] = None) -> CompiledJD:
+        jd = validate_jd(jd)
+        if jd_id is None:
+            slug = re.sub(r"[^a-z0-9]+", "-", jd["position"].lower()).strip("-")[:48] or "jd"
+            jd_id = f"{slug}-{uuid.uuid4().hex[:6]}"
+        elif not _JD_ID.match(jd_id):
+            raise ValueError("JD id must be 1-64 lowercase letters, digits, '-' or '_'")
+
+        entry = CompiledJD.compile(jd_id, jd)
+        with self._lock:
+            if jd_id in self._entries:
+                raise ValueError(f"Job description '{jd_id}' already exists")
+            if len(self._entries) >= MAX_JDS:
+                raise ValueError(f"Registry is full ({MAX_JDS} job descriptions)")
+            self._entries[jd_id] = entry
+            self._save()
+        self._notify("created", entry)
+        return entry
+
+    def update(self, jd_id: str, jd: Dict[str, Any]) -> CompiledJD:
+        jd = validate_jd(jd)
+        with self._lock:
+            previous = self.get(jd_id)
+            entry = CompiledJD.compile(jd_id, jd, previous.created_at)
+            self._entries[jd_id] = entry
+            self._save()
+        self._notify("updated", entry)
+        return entry
+
+    def delete(self, jd_id: str) -> CompiledJD:
+        if jd_id == DEFAULT_JD_ID:
+            raise ValueError("The default job description cannot be deleted")
+        with self._lock:
+            entry = self.get(jd_id)
+            del self._entries[jd_id]
+            self._save()
+        self._notify("deleted", entry)
+        return entry
@@ -0,0 +1,361 @@
+# backend/app/services/job_queue.py
+import asyncio
+import ipaddress
+import json
+import os
+import socket
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+import logging
+
+import httpx
+
+from .uploads import SpooledPDF
+
+logger = logging.getLogger(__name__)
+
+# A queued upload: bytes, or a received PDF that may be spooled to disk
+JobPayload = Union[bytes, SpooledPDF]
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+# Hosts a callback_url may point at (comma-separated; empty allows any host
+# with a public address). Private, loopback and link-local addresses are
+# refused unless their host is listed here.
+JOB_CALLBACK_ALLOWED_HOSTS = {
+    host.strip().lower() for host in os.getenv("JOB_CALLBACK_ALLOWED_HOSTS", "").split(",") if host.strip()
+}
+
+
+class QueueFullError(Exception):
+    """Raised when the queue already holds its maximum number of pending jobs"""
+
+
+class CallbackRejected(ValueError):
+    """Raised when a callback URL points somewhere the server won't POST to"""
+
+
+def _public_address(address: str) -> bool:
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if ip.version == 6 and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+async def resolve_callback(url: str) -> Tuple[httpx.URL, str]:
+    """
+    Check a callback URL and resolve its host: returns the URL and the
+    address to connect to. Raises CallbackRejected for non-http(s) URLs,
+    hosts missing from JOB_CALLBACK_ALLOWED_HOSTS when that is set, and
+    hosts resolving to a private, loopback, link-local or otherwise
+    non-public address (169.254.169.254, the cloud metadata endpoint, among
+    them).
+    """
+    try:
+        parsed = httpx.URL(url)
+    except httpx.InvalidURL as e:
+        raise CallbackRejected(f"Invalid callback_url: {e}") from None
+    if parsed.scheme not in ("http", "https") or not parsed.host:
+        raise CallbackRejected("callback_url must be an http(s) URL")
+
+    host = parsed.host.lower()
+    listed = host in JOB_CALLBACK_ALLOWED_HOSTS
+    if JOB_CALLBACK_ALLOWED_HOSTS and not listed:
+        raise CallbackRejected(f"callback_url host {host} is not allowed")
+    port = parsed.port or (443 if parsed.scheme == "https" else 80)
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except socket.gaierror as e:
+        raise CallbackRejected(f"callback_url host {host} does not resolve: {e}") from None
+
+    addresses = list(dict.fromkeys(info[4][0] for info in infos))
+    if not listed:
+        blocked = [address for address in addresses if not _public_address(address)]
+        if blocked:
+            raise CallbackRejected(f"callback_url host {host} resolves to a non-public address ({blocked[0]})")
+    return parsed, addresses[0]
+
+
+@dataclass
+class Job:
+    job_id: str
+    filename: str
+    status: str = JOB_QUEUED
+    callback_url: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JOB_COMPLETED, JOB_FAILED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _release(payload: JobPayload):
+    if isinstance(payload, SpooledPDF):
+        payload.close()
+
+
+class MemoryJobBackend:
+    """
+    In-process queue and job table. Jobs are lost on restart. Payloads are
+    kept as given, so a spooled upload waits on disk rather than in memory.
+    """
+
+    name = "memory"
+
+    def __init__(self):
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._jobs: Dict[str, Job] = {}
+        self._payloads: Dict[str, JobPayload] = {}
+
+    async def enqueue(self, job: Job, payload: JobPayload):
+        self._jobs[job.job_id] = job
+        self._payloads[job.job_id] = payload
+        await self._queue.put(job.job_id)
+
+    async def dequeue(self) -> Tuple[Job, JobPayload]:
+        while True:
+            job_id = await self._queue.get()
+            job = self._jobs.get(job_id)
+            payload = self._payloads.pop(job_id, None)
+            if job is not None and payload is not None:
+                return job, payload
+
+    async def save(self, job: Job):
+        self._jobs[job.job_id] = job
+
+    async def load(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    async def pending(self) -> int:
+        return self._queue.qsize()
+
+    async def purge(self, older_than: float):
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished and (job.finished_at or 0) < older_than
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    async def close(self):
+        for payload in self._payloads.values():
+            _release(payload)
+        self._payloads.clear()
+
+
+class RedisJobBackend:
+    """
+    Queue and job table in a Redis-compatible server (Redis, Valkey, KeyDB...)
+    so several workers or processes can share one queue.
+    Requires the optional `redis` package.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = "resume-jobs", retention_seconds: float = 3600):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("JOB_QUEUE_URL is set but the 'redis' package is not installed") from e
+
+        self._redis = redis.from_url(url)
+        self._prefix = prefix
+        self._retention = int(retention_seconds)
+
+    def _key(self, *parts: str) -> str:
+        return ":".join((self._prefix,) + parts)
+
+    async def enqueue(self, job: Job, payload: JobPayload):
+        if isinstance(payload, SpooledPDF):
+            # Stored in Redis so any worker can run the job
+            with payload:
+                payload = payload.read_bytes()
+        pipe = self._redis.pipeline()
+        pipe.set(self._key("job", job.job_id), json.dumps(job.to_dict()))
+        pipe.set(self._key("payload", job.job_id), payload)
+        pipe.rpush(self._key("queue"), job.job_id)
+        await pipe.execute()
+
+    async def dequeue(self) -> Tuple[Job, bytes]:
+        while True:
+            _, job_id = await self._redis.blpop(self._key("queue"))
+            job_id = job_id.decode()
+            payload = await self._redis.getdel(self._key("payload", job_id))
+            job = await self.load(job_id)
+            if job is not None and payload is not None:
+                return job, payload
+
+    async def save(self, job: Job):
+        ttl = self._retention if job.finished else None
+        await self._redis.set(self._key("job", job.job_id), json.dumps(job.to_dict()), ex=ttl)
+
+    async def load(self, job_id: str) -> Optional[Job]:
+        raw = await self._redis.get(self._key("job", job_id))
+        return Job(**json.loads(raw)) if raw else None
+
+    async def pending(self) -> int:
+        return await self._redis.llen(self._key("queue"))
+
+    async def purge(self, older_than: float):
+        # Finished jobs expire through their Redis TTL
+        pass
+
+    async def close(self):
+        await self._redis.aclose()
+
+
+class JobQueue:
+    """
+    Submit/poll execution of analyses.
+
+    `submit` stores the upload and returns a job immediately; a pool of
+    worker tasks drains the queue through `handler`, records the result or
+    error on the job and, if the job has a callback URL, POSTs the final
+    job document to it (checked again with resolve_callback and sent to
+    the address that was checked; redirects are not followed).
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[JobPayload, str], Awaitable[Dict[str, Any]]],
+        workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        retention_seconds: Optional[float] = None,
+        backend: Any = None,
+    ):
+        if workers is None:
+            workers = int(os.getenv("JOB_WORKERS", "8"))
+        if max_pending is None:
+            max_pending = int(os.getenv("JOB_MAX_PENDING", "1000"))
+        if retention_seconds is None:
+            retention_seconds = float(os.getenv("JOB_RETENTION", "3600"))
+
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.max_pending = max_pending
+        self.retention_seconds = retention_seconds
+        self._backend = backend
+        self._tasks: List[asyncio.Task] = []
+        self._http: Optional[httpx.AsyncClient] = None
+        self.completed = 0
+        self.failed = 0
+        self.callbacks_failed = 0
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            url = os.getenv("JOB_QUEUE_URL")
+            if url:
+                self._backend = RedisJobBackend(url, retention_seconds=self.retention_seconds)
+            else:
+                self._backend = MemoryJobBackend()
+        return self._backend
+
+    async def start(self):
+        if self._tasks:
+            return
+        # A redirect could point the callback at an internal address
+        self._http = httpx.AsyncClient(timeout=10, follow_redirects=False)
+        self._tasks = [
+            asyncio.create_task(self._worker(i), name=f"job-worker-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(f"Job queue started with {self.workers} workers ({self.backend.name} backend)")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+        await self.backend.close()
+
+    async def submit(self, payload: JobPayload, filename: str, callback_url: Optional[str] = None) -> Job:
+        """Queue a job; a SpooledPDF payload is the queue's to close from here on"""
+        try:
+            if await self.backend.pending() >= self.max_pending:
+                raise QueueFullError(f"Job queue is full ({self.max_pending} pending)")
+
+            await self.backend.purge(time.time() - self.retention_seconds)
+            job = Job(job_id=str(uuid.uuid4()), filename=filename, callback_url=callback_url)
+            await self.backend.enqueue(job, payload)
+        except BaseException:
+            _release(payload)
+            raise
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        return await self.backend.load(job_id)
+
+    async def _worker(self, worker_id: int):
+        while True:
+            job, payload = await self.backend.dequeue()
+            job.status = JOB_RUNNING
+            job.started_at = time.time()
+            await self.backend.save(job)
+
+            try:
+                job.result = await self.handler(payload, job.filename)
+                job.status = JOB_COMPLETED
+                self.completed += 1
+            except asyncio.CancelledError:
+                job.status = JOB_FAILED
+                job.error = "Server shutting down"
+                job.finished_at = time.time()
+                await self.backend.save(job)
+                raise
+            except Exception as e:
+                logger.error(f"Job {job.job_id} failed: {e}")
+                job.error = getattr(e, "detail", None) or str(e)
+                job.status = JOB_FAILED
+                self.failed += 1
+            finally:
+                _release(payload)
+
+            job.finished_at = time.time()
+            await self.backend.save(job)
+
+            if job.callback_url:
+                await self._notify(job)
+
+    async def _notify(self, job: Job):
+        try:
+            url, address = await resolve_callback(job.callback_url)
+            # Connect to the address just checked rather than looking the
+            # host up again, which a DNS rebinding attack could answer differently
+            response = await self._http.post(
+                url.copy_with(host=address),
+                json=job.to_dict(),
+                headers={"Host": url.netloc.decode("ascii")},
+                extensions={"sni_hostname": url.host} if url.scheme == "https" else {},
+            )
+            # 3xx included: redirects are refused, not followed
+            response.raise_for_status()
+        except Exception as e:
+            self.callbacks_failed += 1
+            logger.warning(f"Callback for job {job.job_id} to {job.callback_url} failed: {e}")
+
+    async def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend.name,
+            "workers": self.workers,
+            "pending": await self.backend.pending(),
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "failed": self.failed,
+            "callbacks_failed": self.callbacks_failed,
+        }
@@ -0,0 +1,86 @@
+# backend/app/services/json_stream.py
+import json
+from typing import Any, List, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class JsonSectionParser:
+    """
+    Incremental parser for a streamed top-level JSON object.
+
+    Feed it text chunks as the model produces them; every time a top-level
+    "key": value pair is complete it is returned, so callers can push
+    sections (scores, strengths, ...) before the object is closed.
+    Anything before the first "{" (e.g. a ```json fence) is skipped.
+    """
+
+    def __init__(self):
+        self._buffer: List[str] = []
+        self._started = False
+        self._finished = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._member: List[str] = []
+
+    @property
+    def finished(self) -> bool:
+        return self._finished
+
+    def text(self) -> str:
+        """Everything received so far (for a final full parse)"""
+        return "".join(self._buffer)
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        self._buffer.append(chunk)
+        sections: List[Tuple[str, Any]] = []
+        if self._finished:
+            return sections
+
+        for char in chunk:
+            if not self._started:
+                if char == "{":
+                    self._started = True
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                self._member.append(char)
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._emit(sections)
+                    self._finished = True
+                    break
+            elif char == "," and self._depth == 1:
+                self._emit(sections)
+                continue
+            self._member.append(char)
+        return sections
+
+    def _emit(self, sections: List[Tuple[str, Any]]):
+        member = "".join(self._member).strip()
+        self._member = []
+        if not member:
+            return
+        try:
+            # A single "key": value member is itself a valid one-key object
+            parsed = json.loads("{" + member + "}")
+        except json.JSONDecodeError as e:
+            logger.debug(f"Skipping unparseable streamed member: {e}")
+            return
+        sections.extend(parsed.items())
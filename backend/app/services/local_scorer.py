@@ -0,0 +1,419 @@
+# backend/app/services/local_scorer.py
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Compiled scorers kept for reuse (least recently used evicted); registry
+# JDs hold their own, so this mostly serves ad-hoc JDs sent with a request
+SCORER_CACHE_SIZE = int(os.getenv("SCORER_CACHE_SIZE", os.getenv("MAX_JDS", "200")))
+
+# Canonical term (lowercase) -> other ways it shows up in resumes.
+# The canonical term itself always matches; aliases only need the variants.
+SKILL_ALIASES: Dict[str, List[str]] = {
+    # Skills
+    "python": ["python3"],
+    "machine learning": ["ml", "machine-learning", "การเรียนรู้ของเครื่อง"],
+    "data analysis": ["data analytics", "data analyst", "analyzing data", "analysing data", "การวิเคราะห์ข้อมูล"],
+    "statistics": ["statistical", "statistic", "สถิติ"],
+    "problem solving": ["problem-solving", "solving problems", "analytical thinking"],
+    "deep learning": ["deep-learning", "neural network", "neural networks", "cnn", "rnn", "lstm", "transformers"],
+    "natural language processing": ["nlp", "text mining", "language models", "llm", "llms"],
+    "computer vision": ["image processing", "opencv", "object detection", "image classification"],
+    "big data": ["hadoop", "spark", "pyspark", "apache spark", "hive"],
+    "cloud computing": ["cloud", "aws", "amazon web services", "gcp", "google cloud", "azure"],
+    "sql": ["mysql", "postgresql", "postgres", "sqlite", "t-sql", "pl/sql", "sql server"],
+    "git": ["github", "gitlab", "bitbucket", "version control"],
+    "docker": ["dockerfile", "docker-compose", "docker compose", "containerization"],
+    # Tools
+    "pandas": ["pd.dataframe"],
+    "numpy": ["np.array"],
+    "jupyter": ["jupyter notebook", "jupyterlab", "jupyter lab", "ipython", "google colab", "colab"],
+    "jupyter notebook": ["jupyter", "jupyterlab", "jupyter lab", "ipython", "google colab", "colab"],
+    "tensorflow": ["tensor flow", "keras", "tf.keras"],
+    "pytorch": ["torch", "py torch"],
+    "scikit-learn": ["sklearn", "scikit learn", "scikit"],
+    # Education
+    "computer science": ["comp sci", "computer sciences", "วิทยาการคอมพิวเตอร์"],
+    "data science": ["data scientist", "วิทยาการข้อมูล"],
+    "artificial intelligence": ["ปัญญาประดิษฐ์"],
+    "computer engineering": ["computer engineer", "วิศวกรรมคอมพิวเตอร์"],
+    "information technology": ["information technologies", "เทคโนโลยีสารสนเทศ"],
+}
+
+DEGREE_TERMS = [
+    "bachelor", "bachelor's", "master", "master's", "phd", "ph.d", "doctorate",
+    "b.sc", "bsc", "b.s.", "b.eng", "m.sc", "msc", "m.s.", "m.eng", "degree",
+    "university", "gpa", "gpax", "ปริญญาตรี", "ปริญญาโท", "มหาวิทยาลัย",
+]
+
+EXPERIENCE_TERMS = [
+    "experience", "internship", "intern", "work experience", "project", "projects",
+    "developed", "implemented", "built", "designed", "deployed", "analyzed",
+    "research", "competition", "hackathon", "freelance", "ประสบการณ์", "ฝึกงาน", "โปรเจกต์", "โครงการ",
+]
+
+# Category weights of the match percentage (per-JD overrides: CompiledJD.weights)
+CATEGORY_WEIGHTS = {"education": 0.25, "skills": 0.30, "experience": 0.25, "tools": 0.20}
+
+# Share of the skills/tools score from required vs preferred coverage
+REQUIRED_SHARE = 0.7
+PREFERRED_SHARE = 0.3
+# Education points: related field of study + any degree mention
+EDUCATION_FIELD_POINTS = 60
+EDUCATION_DEGREE_POINTS = 40
+# Experience points per signal, capped per signal / in years
+EXPERIENCE_SIGNAL_CAP = 3
+EXPERIENCE_SIGNAL_POINTS = 8
+EXPERIENCE_YEARS_CAP = 5
+EXPERIENCE_YEAR_POINTS = 6
+RESPONSIBILITY_POINTS = 5
+
+_WORD_CHARS = "a-z0-9"
+_WHITESPACE = re.compile(r"\s+")
+_YEARS = re.compile(r"(\d{1,2})\+?\s*(?:years?|yrs?|ปี)")
+
+
+def _normalize(text: str) -> str:
+    return _WHITESPACE.sub(" ", text.lower())
+
+
+def _trie_regex(patterns: Iterable[str]) -> str:
+    """
+    Compile literal patterns into one regex whose alternation follows a
+    character trie, so shared prefixes are only tested once per position.
+    """
+    trie: Dict[str, Any] = {}
+    for pattern in patterns:
+        node = trie
+        for char in pattern:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def emit(node: Dict[str, Any]) -> str:
+        terminal = "" in node
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if terminal:
+            return "(?:" + body + ")?"
+        return body
+
+    return emit(trie)
+
+
+class _TermMatcher:
+    """
+    Single-pass multi-pattern matcher: all aliases of all terms are folded
+    into one trie-shaped regex and every hit is mapped back to the terms
+    it stands for.
+    """
+
+    def __init__(self, terms: Dict[Hashable, Iterable[str]]):
+        self._lookup: Dict[str, Set[Hashable]] = {}
+        for term, aliases in terms.items():
+            for alias in aliases:
+                alias = _normalize(alias).strip()
+                if alias:
+                    self._lookup.setdefault(alias, set()).add(term)
+
+        if self._lookup:
+            body = _trie_regex(self._lookup)
+            # Word boundaries for latin text; Thai has no spaces, so only
+            # latin letters/digits next to a hit rule it out.
+            self._regex = re.compile(f"(?<![{_WORD_CHARS}])(?:{body})(?![{_WORD_CHARS}])")
+        else:
+            self._regex = None
+
+    def find(self, normalized_text: str) -> Dict[Hashable, int]:
+        """Return {term: occurrence count} for every term found"""
+        found: Dict[str, int] = {}
+        if self._regex is None:
+            return found
+        for match in self._regex.finditer(normalized_text):
+            for term in self._lookup.get(match.group(0), ()):
+                found[term] = found.get(term, 0) + 1
+        return found
+
+
+@dataclass
+class LocalMatch:
+    """Result of matching one resume against one JD"""
+
+    scores: Dict[str, float]
+    match_percentage: float
+    matched: Dict[str, List[str]] = field(default_factory=dict)
+    missing: Dict[str, List[str]] = field(default_factory=dict)
+    experience_signals: int = 0
+    years_of_experience: int = 0
+    degree_found: bool = False
+
+    @property
+    def matched_skills(self) -> List[str]:
+        return self.matched.get("required_skills", []) + self.matched.get("preferred_skills", [])
+
+    @property
+    def missing_skills(self) -> List[str]:
+        return self.missing.get("required_skills", []) + self.missing.get("preferred_skills", [])
+
+    @property
+    def matched_tools(self) -> List[str]:
+        return _dedupe(self.matched.get("required_tools", []) + self.matched.get("preferred_tools", []))
+
+    @property
+    def missing_tools(self) -> List[str]:
+        return _dedupe(self.missing.get("required_tools", []) + self.missing.get("preferred_tools", []))
+
+    def _strengths(self) -> List[str]:
+        strengths = []
+        if self.matched.get("required_skills"):
+            strengths.append(f"Has required skills: {', '.join(self.matched['required_skills'])}")
+        if self.matched.get("preferred_skills"):
+            strengths.append(f"Has preferred skills: {', '.join(self.matched['preferred_skills'])}")
+        if self.matched_tools:
+            strengths.append(f"Familiar with tools: {', '.join(self.matched_tools)}")
+        if self.matched.get("required_education"):
+            strengths.append(f"Relevant education: {', '.join(self.matched['required_education'])}")
+        if self.experience_signals >= 3:
+            strengths.append("Shows hands-on project or work experience")
+        return strengths
+
+    def _weaknesses(self) -> List[str]:
+        weaknesses = []
+        if self.missing.get("required_skills"):
+            weaknesses.append(f"Missing required skills: {', '.join(self.missing['required_skills'])}")
+        if self.missing.get("required_tools"):
+            weaknesses.append(f"Missing required tools: {', '.join(self.missing['required_tools'])}")
+        if "required_education" in self.missing and not self.matched.get("required_education"):
+            weaknesses.append("Education field not clearly related to the position")
+        if self.experience_signals < 2:
+            weaknesses.append("Limited evidence of practical experience")
+        return weaknesses
+
+    def _recommendations(self) -> List[str]:
+        recommendations = []
+        for skill in self.missing.get("required_skills", [])[:3]:
+            recommendations.append(f"Build and showcase projects using {skill}")
+        for tool in self.missing.get("required_tools", [])[:2]:
+            recommendations.append(f"Gain hands-on experience with {tool}")
+        for skill in self.missing.get("preferred_skills", [])[:2]:
+            recommendations.append(f"Consider learning {skill}")
+        if self.experience_signals < 2:
+            recommendations.append("Describe internships, projects or competitions in more detail")
+        return recommendations
+
+    def as_analysis(self) -> Dict[str, Any]:
+        """Same shape as the Gemini analysis returned by /api/v1/analyze"""
+        return {
+            "scores": {key: self.scores[key] for key in CATEGORY_WEIGHTS},
+            "match_percentage": self.match_percentage,
+            "strengths": self._strengths(),
+            "weaknesses": self._weaknesses(),
+            "recommendations": self._recommendations(),
+            "matched_skills": self.matched_skills,
+            "missing_skills": self.missing_skills,
+        }
+
+
+def _dedupe(items: List[str]) -> List[str]:
+    return list(dict.fromkeys(items))
+
+
+def _coverage(matched: List[str], total: List[str]) -> Optional[float]:
+    return len(matched) / len(total) if total else None
+
+
+def normalize_weights(weights: Optional[Dict[str, float]]) -> Optional[Dict[str, float]]:
+    """Category weights scaled to sum to 1, or None when none are usable"""
+    if not weights:
+        return None
+    usable = {key: float(weights.get(key, 0) or 0) for key in CATEGORY_WEIGHTS}
+    total = sum(value for value in usable.values() if value > 0)
+    if total <= 0:
+        return None
+    return {key: max(0.0, value) / total for key, value in usable.items()}
+
+
+def blend_shares(has_required: bool, has_preferred: bool) -> Tuple[float, float]:
+    """Weights of required/preferred coverage, given which lists the JD has"""
+    if has_required and has_preferred:
+        return REQUIRED_SHARE, PREFERRED_SHARE
+    return (1.0 if has_required else 0.0), (1.0 if has_preferred else 0.0)
+
+
+def _blend(required: Optional[float], preferred: Optional[float]) -> float:
+    required_share, preferred_share = blend_shares(required is not None, preferred is not None)
+    return ((required or 0.0) * required_share + (preferred or 0.0) * preferred_share) * 100
+
+
+@dataclass
+class ResumeSignals:
+    """Everything the local scorer reads from one resume"""
+
+    terms: Set[str]
+    degree_found: bool
+    experience_signals: int
+    years_of_experience: int
+    responsibility_hits: int
+    responsibilities: Set[str] = field(default_factory=set)
+
+
+def responsibility_words(jd: Dict[str, Any]) -> List[str]:
+    """Responsibility words ("models", "datasets", "visualizations") that hint at relevant experience"""
+    words = (word for line in jd.get("responsibilities", []) for word in re.findall(r"[a-z]{5,}", line.lower()))
+    return list(dict.fromkeys(words))
+
+
+class TermScanner:
+    """
+    Finds which of a set of lowercase JD terms (with their aliases) occur
+    in a text, for checking a stored resume against terms added to a JD
+    without rescanning the ones already known
+    """
+
+    def __init__(self, terms: Iterable[str], aliases: Optional[Dict[str, List[str]]] = None):
+        aliases = SKILL_ALIASES if aliases is None else aliases
+        lookup = {term: [term] + aliases.get(term, []) for term in terms}
+        self._matcher = _TermMatcher(lookup)
+        needles = (_normalize(alias).strip() for values in lookup.values() for alias in values)
+        self._needles = [needle for needle in needles if needle]
+
+    @staticmethod
+    def normalize(resume_text: str) -> str:
+        """The form find() expects; store it to skip normalizing on every scan"""
+        return _normalize(resume_text or "")
+
+    def find(self, normalized_text: str) -> Set[str]:
+        # A few substring tests rule most texts out without running the regex
+        if not any(needle in normalized_text for needle in self._needles):
+            return set()
+        return set(self._matcher.find(normalized_text))
+
+
+class LocalScorer:
+    """
+    Deterministic resume scorer that matches extracted text against the JD
+    term lists (required/preferred skills and tools, required education)
+    without calling a model. Everything derived from the JD is compiled once
+    in __init__; scoring is one regex pass over the resume.
+    """
+
+    JD_FIELDS = ("required_skills", "preferred_skills", "required_tools", "preferred_tools", "required_education")
+
+    _instances: "OrderedDict[str, LocalScorer]" = OrderedDict()
+    _instances_lock = threading.Lock()
+
+    def __init__(self, jd: Dict[str, Any], aliases: Optional[Dict[str, List[str]]] = None):
+        aliases = SKILL_ALIASES if aliases is None else aliases
+        self.jd = jd
+        # A JD may override the category blend; unknown keys are ignored
+        self.weights = normalize_weights(jd.get("weights")) or dict(CATEGORY_WEIGHTS)
+        self.fields = {name: list(jd.get(name) or []) for name in self.JD_FIELDS if jd.get(name)}
+
+        # One matcher for everything: keys are (kind, name) so a single pass
+        # over the resume finds JD terms, degree and experience signals alike
+        terms: Dict[Tuple[str, str], List[str]] = {}
+        for values in self.fields.values():
+            for term in values:
+                key = term.lower()
+                terms[("term", term)] = [key] + aliases.get(key, [])
+        terms[("degree", "degree")] = DEGREE_TERMS
+        for term in EXPERIENCE_TERMS:
+            terms[("experience", term)] = [term]
+
+        self.responsibility_words = responsibility_words(jd)
+        for word in self.responsibility_words:
+            terms.setdefault(("responsibility", word), [word])
+
+        self._matcher = _TermMatcher(terms)
+
+    @classmethod
+    def for_jd(cls, jd: Dict[str, Any]) -> "LocalScorer":
+        """Shared, precompiled scorer for a JD (the last SCORER_CACHE_SIZE are kept)"""
+        key = json.dumps(jd, sort_keys=True, ensure_ascii=False)
+        with cls._instances_lock:
+            scorer = cls._instances.get(key)
+            if scorer is not None:
+                cls._instances.move_to_end(key)
+                return scorer
+        # Compiled outside the lock; if two threads race, both scorers are equivalent
+        scorer = cls(jd)
+        with cls._instances_lock:
+            cls._instances[key] = scorer
+            while len(cls._instances) > max(1, SCORER_CACHE_SIZE):
+                cls._instances.popitem(last=False)
+        return scorer
+
+    def signals(self, resume_text: str) -> ResumeSignals:
+        """Single pass over the resume collecting JD terms and experience signals"""
+        text = _normalize(resume_text or "")
+        hits = self._matcher.find(text)
+        responsibilities = {name for kind, name in hits if kind == "responsibility"}
+        return ResumeSignals(
+            terms={name for kind, name in hits if kind == "term"},
+            degree_found=("degree", "degree") in hits,
+            experience_signals=sum(
+                min(count, EXPERIENCE_SIGNAL_CAP) for (kind, _), count in hits.items() if kind == "experience"
+            ),
+            years_of_experience=max((int(value) for value in _YEARS.findall(text)), default=0),
+            responsibility_hits=len(responsibilities),
+            responsibilities=responsibilities,
+        )
+
+    def match(self, resume_text: str) -> LocalMatch:
+        return self.score_signals(self.signals(resume_text))
+
+    def score_signals(self, signals: ResumeSignals) -> LocalMatch:
+        found = signals.terms
+        matched = {name: [term for term in values if term in found] for name, values in self.fields.items()}
+        missing = {name: [term for term in values if term not in found] for name, values in self.fields.items()}
+
+        skills = _blend(
+            _coverage(matched.get("required_skills", []), self.fields.get("required_skills", [])),
+            _coverage(matched.get("preferred_skills", []), self.fields.get("preferred_skills", [])),
+        )
+        tools = _blend(
+            _coverage(matched.get("required_tools", []), self.fields.get("required_tools", [])),
+            _coverage(matched.get("preferred_tools", []), self.fields.get("preferred_tools", [])),
+        )
+
+        if "required_education" in self.fields:
+            education = (
+                (EDUCATION_FIELD_POINTS if matched["required_education"] else 0)
+                + (EDUCATION_DEGREE_POINTS if signals.degree_found else 0)
+            )
+        else:
+            education = 100 if signals.degree_found else 0
+
+        experience = min(
+            100,
+            signals.experience_signals * EXPERIENCE_SIGNAL_POINTS
+            + min(signals.years_of_experience, EXPERIENCE_YEARS_CAP) * EXPERIENCE_YEAR_POINTS
+            + signals.responsibility_hits * RESPONSIBILITY_POINTS,
+        )
+
+        scores = {
+            "education": round(float(education), 2),
+            "skills": round(skills, 2),
+            "experience": round(float(experience), 2),
+            "tools": round(tools, 2),
+        }
+        match_percentage = round(sum(scores[key] * weight for key, weight in self.weights.items()), 2)
+        scores["overall"] = match_percentage
+
+        return LocalMatch(
+            scores=scores,
+            match_percentage=match_percentage,
+            matched=matched,
+            missing=missing,
+            experience_signals=signals.experience_signals,
+            years_of_experience=signals.years_of_experience,
+            degree_found=signals.degree_found,
+        )
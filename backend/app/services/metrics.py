@@ -0,0 +1,322 @@
+# backend/app/services/metrics.py
+import asyncio
+import math
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    from opentelemetry import trace as _otel_trace
+except ImportError:
+    _otel_trace = None
+
+# Seconds; covers cache hits (sub-ms) up to slow model calls with retries
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+Sample = Tuple[Dict[str, Any], float]
+# (name, type, help, samples) produced at scrape time by collectors
+Family = Tuple[str, str, str, List[Sample]]
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values: Dict[LabelValues, Any] = {}
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def _labels(self, key: LabelValues) -> Dict[str, str]:
+        return dict(zip(self.label_names, key))
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        return [(self.name, self._labels(key), value) for key, value in self._values.items()]
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels: Any):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def set(self, value: float, **labels: Any):
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels: Any):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: Any):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any):
+        key = self._key(labels)
+        state = self._values.get(key)
+        if state is None:
+            state = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                state["counts"][i] += 1
+        state["sum"] += value
+        state["count"] += 1
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        samples = []
+        for key, state in self._values.items():
+            labels = self._labels(key)
+            for bound, count in zip(self.buckets, state["counts"]):
+                samples.append((f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, count))
+            samples.append((f"{self.name}_bucket", {**labels, "le": "+Inf"}, state["count"]))
+            samples.append((f"{self.name}_sum", labels, state["sum"]))
+            samples.append((f"{self.name}_count", labels, state["count"]))
+        return samples
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Count and mean seconds per label set, for JSON stats"""
+        return {
+            ",".join(key) or "all": {
+                "count": state["count"],
+                "mean_ms": round(state["sum"] / state["count"] * 1000, 3) if state["count"] else 0.0,
+            }
+            for key, state in self._values.items()
+        }
+
+
+Collector = Callable[[], Union[List[Family], Awaitable[List[Family]]]]
+
+
+class MetricsRegistry:
+    """
+    Process-local metrics rendered in the Prometheus text format.
+
+    Instrumented code updates counters, gauges and histograms directly;
+    numbers that other components already keep (cache hit counters, Gemini
+    client metrics, queue depth) are read by collectors at scrape time.
+    """
+
+    def __init__(self, namespace: str = "resume"):
+        self.namespace = namespace
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Collector] = []
+
+    def _register(self, metric: _Metric) -> Any:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def _name(self, name: str) -> str:
+        return f"{self.namespace}_{name}" if self.namespace else name
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(self._name(name), help, labels))
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(self._name(name), help, labels))
+
+    def histogram(
+        self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(self._name(name), help, labels, buckets))
+
+    def add_collector(self, collector: Collector):
+        self._collectors.append(collector)
+
+    async def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+
+        for collector in self._collectors:
+            try:
+                families = collector()
+                if asyncio.iscoroutine(families):
+                    families = await families
+            except Exception as e:
+                logger.warning(f"Metrics collector failed: {e}")
+                continue
+            for name, kind, help, samples in families:
+                name = self._name(name)
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(float(value))}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+STAGE_SECONDS = registry.histogram(
+    "stage_duration_seconds", "Time spent in each analysis pipeline stage", ["stage"]
+)
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route", "status"]
+)
+HTTP_IN_FLIGHT = registry.gauge("http_requests_in_flight", "HTTP requests currently being served")
+ANALYSIS_FALLBACKS = registry.counter(
+    "analysis_fallbacks_total", "Analyses answered by the local scorer instead of the model", ["reason"]
+)
+SCREENING_DECISIONS = registry.counter(
+    "screening_decisions_total", "Tiered-mode local pre-screen outcomes (borderline = sent to the model)", ["decision"]
+)
+COALESCED_BATCH_SIZE = registry.histogram(
+    "model_coalesced_batch_size", "Single-resume analyses sent per coalesced model request",
+    buckets=(1, 2, 3, 4, 6, 8, 12, 16, 32)
+)
+COALESCED_FALLBACKS = registry.counter(
+    "model_coalesced_fallbacks_total", "Coalesced analyses re-requested alone after a malformed combined reply"
+)
+GEMINI_TOKENS = registry.counter(
+    "gemini_usage_tokens_total", "Gemini tokens by kind (cached = prompt tokens served from a context cache)", ["kind"]
+)
+
+# Stage durations (ms) of the request being served; shared by tasks it spawns
+_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("stage_timings", default=None)
+# Gemini token counts of the request being served
+_token_usage: ContextVar[Optional[Dict[str, int]]] = ContextVar("token_usage", default=None)
+_tracer = _otel_trace.get_tracer("resume-analyzer") if _otel_trace is not None else None
+
+
+@contextmanager
+def request_timings() -> Iterator[Dict[str, float]]:
+    """
+    Collect stage timings for the enclosed work. Nested uses share the
+    outer dict, so an endpoint and the pipeline it calls report together.
+    """
+    timings = _timings.get()
+    if timings is not None:
+        yield timings
+        return
+    timings = {}
+    token = _timings.set(timings)
+    usage_token = _token_usage.set({})
+    try:
+        yield timings
+    finally:
+        _token_usage.reset(usage_token)
+        _timings.reset(token)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Time a pipeline stage: observed in the stage histogram, added to the
+    current request's timings and, when OpenTelemetry is installed,
+    recorded as a span
+    """
+    span = _tracer.start_as_current_span(f"analysis.{name}") if _tracer is not None else None
+    if span is not None:
+        span.__enter__()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        if span is not None:
+            span.__exit__(None, None, None)
+        record_stage(name, elapsed)
+
+
+def record_stage(name: str, seconds: float, observe: bool = True):
+    """
+    Add a stage duration measured elsewhere (e.g. in a shared coalesced
+    call) to the current request's timings, and to the stage histogram
+    unless it was already observed there
+    """
+    if observe:
+        STAGE_SECONDS.observe(seconds, stage=name)
+    timings = _timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds * 1000
+
+
+def record_token_usage(usage: Any):
+    """
+    Count a Gemini response's usage metadata, globally and for the current
+    request. Cached prompt tokens are part of prompt_token_count.
+    """
+    if usage is None:
+        return
+    counts = {
+        "prompt": getattr(usage, "prompt_token_count", None) or 0,
+        "cached": getattr(usage, "cached_content_token_count", None) or 0,
+        "output": getattr(usage, "candidates_token_count", None) or 0,
+    }
+    current = _token_usage.get()
+    for kind, count in counts.items():
+        if count:
+            GEMINI_TOKENS.inc(count, kind=kind)
+            if current is not None:
+                current[kind] = current.get(kind, 0) + count
+
+
+def token_usage_report() -> Optional[Dict[str, Any]]:
+    """Token counts of the current request and the share of the prompt served from cache"""
+    current = _token_usage.get()
+    if not current:
+        return None
+    prompt = current.get("prompt", 0)
+    cached = current.get("cached", 0)
+    return {
+        "prompt_tokens": prompt,
+        "cached_tokens": cached,
+        "uncached_prompt_tokens": prompt - cached,
+        "output_tokens": current.get("output", 0),
+        "cached_ratio": round(cached / prompt, 4) if prompt else 0.0,
+    }
+
+
+def format_timings(timings: Dict[str, float]) -> Dict[str, float]:
+    return {name: round(ms, 3) for name, ms in timings.items()}
+
+
+def server_timing_header(timings: Dict[str, float]) -> str:
+    """Server-Timing header value so browsers' devtools show the breakdown"""
+    return ", ".join(f"{name};dur={ms:.3f}" for name, ms in timings.items())
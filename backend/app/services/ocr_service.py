@@ -1,37 +1,341 @@
 # backend/app/services/ocr_service.py
+import asyncio
+import hashlib
 import io
-import fitz  # PyMuPDF
-from typing import Optional
+import os
+import time
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple, Union
 import logging
 
+if TYPE_CHECKING:
+    import fitz  # PyMuPDF
+
 logger = logging.getLogger(__name__)
 
+# Stop reading pages once this many characters are extracted (0 = no limit).
+# The prompt only uses the first few thousand characters; the local scorer
+# benefits from a little more.
+PDF_TEXT_BUDGET = int(os.getenv("PDF_TEXT_BUDGET", "12000"))
+# Documents longer than this are split by page range across PDF workers
+PDF_PAGES_PER_WORKER = int(os.getenv("PDF_PAGES_PER_WORKER", "8"))
+
+
+# Pages with less text than this that carry images are treated as scanned
+OCR_MIN_CHARS = int(os.getenv("OCR_MIN_CHARS", "20"))
+OCR_DPI = int(os.getenv("OCR_DPI", "200"))
+OCR_LANG = os.getenv("OCR_LANG", "eng")
+# Wall-clock seconds of OCR allowed per document; unfinished pages are skipped
+OCR_TIME_BUDGET = float(os.getenv("OCR_TIME_BUDGET", "20"))
+OCR_ENABLED = os.getenv("OCR_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Raw PDF bytes, or the path of an upload spooled to disk. Workers open a
+# path themselves, so large PDFs are never pickled into the pools.
+PdfSource = Union[bytes, str]
+
+
+def load_pymupdf():
+    """
+    PyMuPDF, imported on first use: it takes ~100 ms to load, so importing
+    the app doesn't pay for it (warm_up_worker loads it ahead of traffic)
+    """
+    import fitz  # PyMuPDF
+
+    return fitz
+
+
+def warm_up_worker() -> int:
+    """Load PyMuPDF in a pool worker; returns the worker's pid"""
+    load_pymupdf()
+    return os.getpid()
+
+
+def open_pdf(source: PdfSource) -> "fitz.Document":
+    fitz = load_pymupdf()
+    if isinstance(source, str):
+        return fitz.open(source, filetype="pdf")
+    return fitz.open(stream=source, filetype="pdf")
+
+
+def iter_pdf_pages(doc: "fitz.Document", start: int = 0, stop: Optional[int] = None) -> Iterator[Tuple[int, str, float]]:
+    """
+    Yield (page number, page text, seconds spent) for pages [start, stop)
+    """
+    stop = doc.page_count if stop is None else min(stop, doc.page_count)
+    for page_num in range(start, stop):
+        started = time.perf_counter()
+        text = doc[page_num].get_text()
+        yield page_num, text, time.perf_counter() - started
+
+
+def _scanned_page_hash(doc: "fitz.Document", page: "fitz.Page") -> Optional[str]:
+    """
+    Hash of the raw image streams on a page with no usable text layer, or
+    None when the page has no images (a genuinely blank page)
+    """
+    images = page.get_images(full=True)
+    if not images:
+        return None
+    digest = hashlib.sha256()
+    for image in images:
+        digest.update(doc.xref_stream_raw(image[0]) or b"")
+    return digest.hexdigest()
+
+
+def extract_pdf_pages(
+    pdf_content: PdfSource,
+    max_chars: Optional[int] = None,
+    start: int = 0,
+    stop: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Extract text from a page range of PDF bytes, stopping early once
+    `max_chars` characters have been collected. Pages without a text layer
+    but with images are listed in "scanned" for the OCR stage.
+    Module-level and returns plain data so it can run inside a worker process.
+    """
+    try:
+        doc = open_pdf(pdf_content)
+    except Exception as e:
+        # Re-raise as a plain exception so it pickles back from the pool
+        raise ValueError(f"Failed to extract text from PDF: {e}") from None
+
+    try:
+        parts: List[str] = []
+        pages: List[Dict[str, Any]] = []
+        scanned: List[Dict[str, Any]] = []
+        total = 0
+        for page_num, text, seconds in iter_pdf_pages(doc, start, stop):
+            if len(text.strip()) < OCR_MIN_CHARS:
+                page_hash = _scanned_page_hash(doc, doc[page_num])
+                if page_hash:
+                    scanned.append({"page": page_num + 1, "index": len(parts), "hash": page_hash})
+            parts.append(text)
+            total += len(text)
+            pages.append({"page": page_num + 1, "chars": len(text), "ms": round(seconds * 1000, 3)})
+            if max_chars and total >= max_chars:
+                break
+        return {
+            "parts": parts,
+            "page_count": doc.page_count,
+            "pages": pages,
+            "scanned": scanned,
+        }
+    except Exception as e:
+        raise ValueError(f"Failed to extract text from PDF: {e}") from None
+    finally:
+        doc.close()
+
+
+def extract_pdf_text(pdf_content: PdfSource, max_chars: Optional[int] = None) -> str:
+    """
+    Extract text from PDF bytes (text layer only).
+    Module-level so it can run inside a worker process.
+    """
+    text = "".join(extract_pdf_pages(pdf_content, max_chars)["parts"])
+    return (text[:max_chars] if max_chars else text).strip()
+
+
+def ocr_pdf_page(
+    pdf_content: PdfSource,
+    page_num: int,
+    dpi: int = OCR_DPI,
+    lang: str = OCR_LANG,
+    deadline: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Render one page (1-based) to a grayscale image and OCR it with Tesseract.
+    Uses pytesseract when installed, otherwise PyMuPDF's own Tesseract
+    bridge. Returns {"text", "ms"} or {"error"}; runs in the OCR process pool.
+
+    `deadline` (time.time()) bounds the work in the worker itself: a page
+    that starts after it is skipped, and pytesseract's Tesseract process is
+    killed when it runs past it. PyMuPDF's in-process bridge can't be
+    interrupted, so there only the start is checked.
+    """
+    started = time.perf_counter()
+    if deadline is not None and time.time() >= deadline:
+        return {"error": "OCR time budget exhausted before the page started"}
+    try:
+        doc = open_pdf(pdf_content)
+        try:
+            page = doc[page_num - 1]
+            try:
+                import pytesseract
+                from PIL import Image
+            except ImportError:
+                textpage = page.get_textpage_ocr(dpi=dpi, language=lang, full=True)
+                text = page.get_text(textpage=textpage)
+            else:
+                pixmap = page.get_pixmap(dpi=dpi, colorspace=load_pymupdf().csGRAY, alpha=False)
+                image = Image.frombytes("L", (pixmap.width, pixmap.height), pixmap.samples)
+                timeout = max(0.1, deadline - time.time()) if deadline is not None else 0
+                text = pytesseract.image_to_string(image, lang=lang, timeout=timeout)
+        finally:
+            doc.close()
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+    return {"text": text, "ms": round((time.perf_counter() - started) * 1000, 3)}
+
+
+async def ocr_scanned_pages(
+    executor: Any,
+    pdf_content: PdfSource,
+    scanned: List[Dict[str, Any]],
+    cache: Any = None,
+    time_budget: Optional[float] = None,
+) -> Dict[int, str]:
+    """
+    OCR the scanned pages of one document in the executor's OCR pool.
+    Results are cached by page image hash (+ DPI and language); pages still
+    running when the time budget runs out are skipped. The budget is also
+    passed to the workers as a deadline, so a skipped page stops Tesseract
+    (or never starts) instead of holding its worker after we stop waiting.
+    Returns {page number: text}.
+    """
+    time_budget = OCR_TIME_BUDGET if time_budget is None else time_budget
+    deadline = time.time() + time_budget
+    results: Dict[int, str] = {}
+    pending: Dict[asyncio.Task, Dict[str, Any]] = {}
+
+    for item in scanned:
+        cache_key = f"{item['hash']}:{OCR_DPI}:{OCR_LANG}"
+        cached = await cache.aget("ocr", cache_key) if cache is not None else None
+        if cached is not None:
+            results[item["page"]] = cached
+            continue
+        task = asyncio.create_task(
+            executor.run_ocr(ocr_pdf_page, pdf_content, item["page"], OCR_DPI, OCR_LANG, deadline)
+        )
+        pending[task] = {**item, "cache_key": cache_key}
+
+    if not pending:
+        return results
+
+    done, not_done = await asyncio.wait(pending, timeout=time_budget)
+    for task in not_done:
+        task.cancel()
+    if not_done:
+        logger.warning(f"OCR time budget of {time_budget}s exhausted, skipped {len(not_done)} pages")
+
+    for task in done:
+        item = pending[task]
+        try:
+            result = task.result()
+        except Exception as e:
+            result = {"error": str(e)}
+        if "error" in result:
+            logger.warning(f"OCR failed for page {item['page']}: {result['error']}")
+            continue
+        results[item["page"]] = result["text"]
+        if cache is not None:
+            cache.set("ocr", item["cache_key"], result["text"])
+    return results
+
+
+def page_ranges(first: int, page_count: int, pages_per_chunk: int) -> List[Tuple[int, int]]:
+    pages_per_chunk = max(1, pages_per_chunk)
+    return [(start, min(start + pages_per_chunk, page_count)) for start in range(first, page_count, pages_per_chunk)]
+
+
+async def extract_pdf_parallel(
+    executor: Any,
+    pdf_content: PdfSource,
+    max_chars: Optional[int] = None,
+    pages_per_worker: Optional[int] = None,
+    cache: Any = None,
+) -> Dict[str, Any]:
+    """
+    Extract text through the executor's PDF pool.
+
+    The first `pages_per_worker` pages are read in one worker; most resumes
+    end (or hit the character budget) there. Longer documents are split
+    into page ranges that are parsed in parallel and stitched back in order.
+    Pages without a text layer are OCR'd (see ocr_scanned_pages) and spliced
+    in at their position; text-layer pages never touch the OCR pool.
+    Returns the text plus page count, per-page timings, OCR'd pages and
+    whether the budget cut the document short.
+    """
+    max_chars = PDF_TEXT_BUDGET if max_chars is None else max_chars
+    pages_per_worker = pages_per_worker or PDF_PAGES_PER_WORKER
+
+    first = await executor.run_pdf(extract_pdf_pages, pdf_content, max_chars, 0, pages_per_worker)
+    chunks = [first]
+    page_count = first["page_count"]
+    total = sum(len(part) for part in first["parts"])
+
+    remaining = max_chars - total if max_chars else None
+    if page_count > pages_per_worker and (remaining is None or remaining > 0):
+        chunks += await asyncio.gather(*[
+            executor.run_pdf(extract_pdf_pages, pdf_content, remaining, start, stop)
+            for start, stop in page_ranges(pages_per_worker, page_count, pages_per_worker)
+        ])
+
+    parts: List[str] = []
+    pages: List[Dict[str, Any]] = []
+    scanned: List[Dict[str, Any]] = []
+    for chunk in chunks:
+        if max_chars and sum(len(part) for part in parts) >= max_chars:
+            break
+        scanned.extend({**item, "index": item["index"] + len(parts)} for item in chunk["scanned"])
+        parts.extend(chunk["parts"])
+        pages.extend(chunk["pages"])
+
+    ocr_pages: List[int] = []
+    if scanned and OCR_ENABLED:
+        ocr_text = await ocr_scanned_pages(executor, pdf_content, scanned, cache)
+        for item in scanned:
+            if item["page"] in ocr_text:
+                parts[item["index"]] = ocr_text[item["page"]].strip() + "\n"
+                ocr_pages.append(item["page"])
+
+    text = "".join(parts)
+    truncated = bool(max_chars) and (len(text) > max_chars or len(pages) < page_count)
+    if max_chars:
+        text = text[:max_chars]
+
+    return {
+        "text": text.strip(),
+        "page_count": page_count,
+        "pages_read": len(pages),
+        "truncated": truncated,
+        "scanned_pages": [item["page"] for item in scanned],
+        "ocr_pages": sorted(ocr_pages),
+        "pages": pages,
+    }
+
 
 class OCRService:
     def __init__(self):
         pass
-        
-    def extract_text_from_pdf(self, pdf_content: bytes) -> Optional[str]:
+
+    def extract_text_from_pdf(self, pdf_content: PdfSource, max_chars: Optional[int] = None) -> Optional[str]:
         """
-        Extract text from PDF using PyMuPDF
+        Extract text from PDF using PyMuPDF, stopping once `max_chars`
+        characters have been read
         """
+        max_chars = PDF_TEXT_BUDGET if max_chars is None else max_chars
         try:
-            # Open PDF from bytes
-            doc = fitz.open(stream=pdf_content, filetype="pdf")
-            
-            extracted_text = ""
-            
-            # Process each page
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                text = page.get_text()
+            # Open PDF from bytes or a spooled upload
+            doc = open_pdf(pdf_content)
+
+            parts = []
+            total = 0
+
+            # Process pages until the character budget is reached
+            for _, text, _ in iter_pdf_pages(doc):
                 if text:
-                    extracted_text += text + "\n"
-            
+                    parts.append(text)
+                    total += len(text) + 1
+                if max_chars and total >= max_chars:
+                    break
+
             doc.close()
-            
+
+            extracted_text = "\n".join(parts)
+            if max_chars:
+                extracted_text = extracted_text[:max_chars]
             return extracted_text.strip()
-            
+
         except Exception as e:
             logger.error(f"Error extracting text from PDF: {e}")
-            return None
\ No newline at end of file
+            return None
@@ -0,0 +1,161 @@
+# backend/app/services/ranking_service.py
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import logging
+
+import numpy as np
+
+from .local_scorer import (
+    EDUCATION_DEGREE_POINTS,
+    EDUCATION_FIELD_POINTS,
+    EXPERIENCE_SIGNAL_POINTS,
+    EXPERIENCE_YEAR_POINTS,
+    EXPERIENCE_YEARS_CAP,
+    RESPONSIBILITY_POINTS,
+    LocalScorer,
+    ResumeSignals,
+    blend_shares,
+)
+
+logger = logging.getLogger(__name__)
+
+SCORE_COLUMNS = ("education", "skills", "experience", "tools")
+
+
+class CandidateRanker:
+    """
+    Rank large candidate pools against one JD with matrix operations.
+
+    Each resume becomes a dense feature row: one 0/1 column per JD term
+    (the JD vocabulary) followed by the numeric signals the local scorer
+    uses (degree found, experience signals, years, responsibility hits).
+    Category scores for the whole pool are then a handful of matrix
+    products, blended with the JD's category weights (the same ones the
+    local scorer uses).
+    """
+
+    def __init__(self, jd: Dict[str, Any], weights: Optional[Dict[str, float]] = None):
+        self.jd = jd
+        self.scorer = LocalScorer.for_jd(jd)
+        self.weights = np.array(
+            [(weights or self.scorer.weights)[name] for name in SCORE_COLUMNS], dtype=np.float32
+        )
+
+        # Vocabulary: every distinct term across the JD lists, in JD order
+        self.vocabulary: List[str] = list(
+            dict.fromkeys(term for values in self.scorer.fields.values() for term in values)
+        )
+        self._term_index = {term: i for i, term in enumerate(self.vocabulary)}
+        vocab_size = len(self.vocabulary)
+        self._degree_col = vocab_size
+        self._experience_col = vocab_size + 1
+        self._years_col = vocab_size + 2
+        self._responsibility_col = vocab_size + 3
+        self.num_features = vocab_size + 4
+
+        # Per-field coverage vectors: column weights sum to 1 over the field's terms
+        def coverage(field: str) -> np.ndarray:
+            vector = np.zeros(vocab_size, dtype=np.float32)
+            terms = self.scorer.fields.get(field, [])
+            for term in terms:
+                vector[self._term_index[term]] = 1.0 / len(terms)
+            return vector
+
+        fields = self.scorer.fields
+        skill_required, skill_preferred = blend_shares("required_skills" in fields, "preferred_skills" in fields)
+        tool_required, tool_preferred = blend_shares("required_tools" in fields, "preferred_tools" in fields)
+
+        # Term columns -> (skills, tools) score, in percent
+        self._term_weights = np.stack(
+            [
+                (coverage("required_skills") * skill_required + coverage("preferred_skills") * skill_preferred) * 100,
+                (coverage("required_tools") * tool_required + coverage("preferred_tools") * tool_preferred) * 100,
+            ],
+            axis=1,
+        )
+        self._education_mask = coverage("required_education") > 0
+        self._has_education_field = "required_education" in fields
+
+    def vectorize_signals(self, signals: Sequence[ResumeSignals]) -> np.ndarray:
+        features = np.zeros((len(signals), self.num_features), dtype=np.float32)
+        term_index = self._term_index
+        for row, item in enumerate(signals):
+            for term in item.terms:
+                column = term_index.get(term)
+                if column is not None:
+                    features[row, column] = 1.0
+            features[row, self._degree_col] = item.degree_found
+            features[row, self._experience_col] = item.experience_signals
+            features[row, self._years_col] = item.years_of_experience
+            features[row, self._responsibility_col] = item.responsibility_hits
+        return features
+
+    def vectorize(self, texts: Iterable[str]) -> np.ndarray:
+        """Feature matrix (n_resumes x num_features) for extracted resume texts"""
+        return self.vectorize_signals([self.scorer.signals(text) for text in texts])
+
+    def score(self, features: np.ndarray) -> np.ndarray:
+        """
+        Category scores for every row: columns are education, skills,
+        experience, tools and the weighted match percentage
+        """
+        vocab_size = len(self.vocabulary)
+        terms = features[:, :vocab_size]
+        degree = features[:, self._degree_col]
+
+        skills_tools = terms @ self._term_weights
+
+        if self._has_education_field:
+            field_match = terms[:, self._education_mask].any(axis=1)
+            education = field_match * EDUCATION_FIELD_POINTS + degree * EDUCATION_DEGREE_POINTS
+        else:
+            education = degree * 100
+
+        experience = np.minimum(
+            100,
+            features[:, self._experience_col] * EXPERIENCE_SIGNAL_POINTS
+            + np.minimum(features[:, self._years_col], EXPERIENCE_YEARS_CAP) * EXPERIENCE_YEAR_POINTS
+            + features[:, self._responsibility_col] * RESPONSIBILITY_POINTS,
+        )
+
+        scores = np.empty((features.shape[0], len(SCORE_COLUMNS) + 1), dtype=np.float32)
+        scores[:, 0] = education
+        scores[:, 1] = skills_tools[:, 0]
+        scores[:, 2] = experience
+        scores[:, 3] = skills_tools[:, 1]
+        scores[:, 4] = scores[:, :4] @ self.weights
+        return scores
+
+    def top_k(self, features: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Row indices of the k best candidates (best first) and the full score matrix
+        """
+        scores = self.score(features)
+        match = scores[:, 4]
+        k = max(0, min(k, len(match)))
+        if k == 0:
+            return np.empty(0, dtype=np.int64), scores
+        if k < len(match):
+            candidates = np.argpartition(-match, k - 1)[:k]
+        else:
+            candidates = np.arange(len(match))
+        # Stable order: highest score first, then original position
+        order = np.lexsort((candidates, -match[candidates]))
+        return candidates[order], scores
+
+    def rank(self, texts: Sequence[str], ids: Optional[Sequence[Any]] = None, k: int = 10) -> List[Dict[str, Any]]:
+        """Shortlist of the top-k resumes with their scores and matched terms"""
+        ids = list(ids) if ids is not None else list(range(len(texts)))
+        signals = [self.scorer.signals(text) for text in texts]
+        indices, scores = self.top_k(self.vectorize_signals(signals), k)
+
+        shortlist = []
+        for rank, index in enumerate(indices, start=1):
+            row = scores[index]
+            shortlist.append({
+                "rank": rank,
+                "id": ids[index],
+                "match_percentage": round(float(row[4]), 2),
+                "scores": {name: round(float(row[i]), 2) for i, name in enumerate(SCORE_COLUMNS)},
+                "matched_terms": [term for term in self.vocabulary if term in signals[index].terms],
+            })
+        return shortlist
@@ -0,0 +1,391 @@
+# backend/app/services/search_index.py
+import json
+import math
+import os
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
+
+SEARCH_DIM = int(os.getenv("SEARCH_DIM", "768"))
+# Characters of resume text embedded and kept for rebuilds
+SEARCH_TEXT_CHARS = int(os.getenv("SEARCH_TEXT_CHARS", "20000"))
+INITIAL_CAPACITY = 1024
+
+_TOKEN = re.compile(r"[^\W_][\w+#.]*[\w+#]|[^\W_]", re.UNICODE)
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or the to with who knows know "
+    "someone candidates candidate similar experience experienced".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    words = [word for word in _TOKEN.findall(text.lower()) if word not in _STOPWORDS]
+    # Bigrams keep multi-word skills ("machine learning") distinguishable
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class HashingTfidfEmbedder:
+    """
+    TF-IDF over a hashed vocabulary: rows are L2-normalized sublinear term
+    frequencies; IDF comes from running document frequencies and is applied
+    to the query, so documents never need re-embedding as the corpus grows.
+    """
+
+    name = "tfidf"
+
+    def __init__(self, dim: int = SEARCH_DIM):
+        self.dim = dim
+        self.df = np.zeros(dim, dtype=np.float64)
+        self.documents = 0
+
+    def _tf(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token, count in Counter(tokenize(text)).items():
+            vector[zlib.crc32(token.encode("utf-8")) % self.dim] += 1 + math.log(count)
+        return vector
+
+    def embed_document(self, text: str) -> np.ndarray:
+        vector = self._tf(text)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def observe(self, row: np.ndarray, sign: int = 1):
+        """Count a stored (or removed) row in the document frequencies"""
+        self.df += sign * (row > 0)
+        self.documents += sign
+
+    def load_rows(self, rows: np.ndarray):
+        self.df = (rows > 0).sum(axis=0).astype(np.float64)
+        # Deleted documents are zeroed rows
+        self.documents = int(rows.any(axis=1).sum())
+
+    def embed_query(self, text: str) -> np.ndarray:
+        idf = np.log((self.documents + 1) / (self.df + 1)) + 1
+        query = self._tf(text) * (idf * idf).astype(np.float32)
+        norm = np.linalg.norm(query)
+        return query / norm if norm else query
+
+    def adapt_row(self, row: np.ndarray) -> np.ndarray:
+        """Query vector for "similar to this stored row" searches"""
+        idf = np.log((self.documents + 1) / (self.df + 1)) + 1
+        query = row * idf.astype(np.float32)
+        norm = np.linalg.norm(query)
+        return query / norm if norm else query
+
+
+class SentenceEmbedder:
+    """CPU sentence-transformers model (SEARCH_EMBEDDING_MODEL); rows and queries are unit vectors"""
+
+    def __init__(self, model_name: str):
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.name = f"st:{model_name}"
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def embed_document(self, text: str) -> np.ndarray:
+        return self.model.encode(text, normalize_embeddings=True).astype(np.float32)
+
+    embed_query = embed_document
+
+    def observe(self, row: np.ndarray, sign: int = 1):
+        pass
+
+    def load_rows(self, rows: np.ndarray):
+        pass
+
+    def adapt_row(self, row: np.ndarray) -> np.ndarray:
+        return row
+
+
+def make_embedder():
+    model_name = os.getenv("SEARCH_EMBEDDING_MODEL")
+    if model_name:
+        if SentenceTransformer is None:
+            logger.warning("SEARCH_EMBEDDING_MODEL is set but sentence-transformers is not installed; using TF-IDF")
+        else:
+            try:
+                return SentenceEmbedder(model_name)
+            except Exception as e:
+                logger.warning(f"Could not load embedding model {model_name}: {e}. Using TF-IDF")
+    return HashingTfidfEmbedder()
+
+
+class SearchIndex:
+    """
+    Opt-in persistent store of analyzed resumes with vector search.
+
+    Files in `directory`:
+      docs.jsonl   append-only records (id, filename, text, per-JD analysis
+                   summaries); the last record per id wins, tombstones delete
+      vectors.f32  memory-mapped float32 matrix, one row per document
+      meta.json    embedder name, dimension, row count and capacity
+
+    Writes go through a single background thread (`submit`), so indexing
+    never delays a response; queries are one matrix-vector product over the
+    mapped rows plus argpartition for the top K.
+    """
+
+    def __init__(self, directory: str, embedder: Any = None):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.embedder = embedder or make_embedder()
+        self._docs_path = os.path.join(directory, "docs.jsonl")
+        self._vectors_path = os.path.join(directory, "vectors.f32")
+        self._meta_path = os.path.join(directory, "meta.json")
+        self._lock = threading.RLock()
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="search-index")
+
+        self._rows: Dict[str, int] = {}  # doc id -> row
+        self._offsets: Dict[str, int] = {}  # doc id -> byte offset of its latest record
+        self._ids: List[Optional[str]] = []  # row -> doc id (None once deleted)
+        self._capacity = 0
+        self._vectors: Optional[np.memmap] = None
+        self._load()
+
+    # Storage
+
+    def _open_vectors(self, capacity: int):
+        dim = self.embedder.dim
+        with open(self._vectors_path, "ab") as f:
+            if f.tell() < capacity * dim * 4:
+                f.truncate(capacity * dim * 4)
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, dim))
+        self._capacity = capacity
+
+    def _read_record(self, offset: int) -> Dict[str, Any]:
+        with open(self._docs_path, "rb") as f:
+            f.seek(offset)
+            return json.loads(f.readline())
+
+    def _load(self):
+        meta = {}
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+
+        # Latest record per id: (byte offset, row); texts stay on disk
+        records: Dict[str, Tuple[int, int]] = {}
+        if os.path.exists(self._docs_path):
+            with open(self._docs_path, "rb") as f:
+                offset = 0
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A torn final write; everything before it is intact
+                        logger.warning(f"Skipping unreadable search index record at byte {offset}")
+                        offset += len(line)
+                        continue
+                    if record.get("deleted"):
+                        records.pop(record["id"], None)
+                    else:
+                        records[record["id"]] = (offset, record.get("row", -1))
+                    offset += len(line)
+
+        rows_used = meta.get("rows", 0)
+        compatible = (
+            meta.get("embedder") == self.embedder.name
+            and meta.get("dim") == self.embedder.dim
+            and os.path.exists(self._vectors_path)
+            and all(0 <= row < rows_used for _, row in records.values())
+        )
+        if compatible:
+            self._open_vectors(max(meta.get("capacity", INITIAL_CAPACITY), INITIAL_CAPACITY))
+            self._ids = [None] * rows_used
+            for doc_id, (offset, row) in records.items():
+                self._rows[doc_id] = row
+                self._offsets[doc_id] = offset
+                self._ids[row] = doc_id
+            self.embedder.load_rows(np.asarray(self._vectors[:rows_used]))
+            logger.info(f"Loaded search index with {len(records)} resumes from {self.directory}")
+            return
+        self._rebuild([offset for offset, _ in records.values()])
+
+    def _rebuild(self, offsets: List[int]):
+        """Re-embed stored texts (new embedder, or an interrupted write) and compact the records"""
+        if os.path.exists(self._vectors_path):
+            os.remove(self._vectors_path)
+        self._open_vectors(max(INITIAL_CAPACITY, 1 << max(0, len(offsets) - 1).bit_length()))
+
+        compacted_path = f"{self._docs_path}.tmp"
+        with open(compacted_path, "wb") as out:
+            for offset in offsets:
+                record = self._read_record(offset)
+                record["row"] = self._append_row(record["id"], self.embedder.embed_document(record.get("text", "")))
+                self._offsets[record["id"]] = out.tell()
+                out.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+        os.replace(compacted_path, self._docs_path)
+        self._flush()
+        if offsets:
+            logger.info(f"Rebuilt search index for {len(offsets)} resumes with {self.embedder.name}")
+
+    def _append_row(self, doc_id: str, vector: np.ndarray) -> int:
+        row = len(self._ids)
+        if row >= self._capacity:
+            self._flush(sync=True)
+            self._vectors = None
+            self._open_vectors(self._capacity * 2)
+        self._vectors[row] = vector
+        self._ids.append(doc_id)
+        self._rows[doc_id] = row
+        self.embedder.observe(vector)
+        return row
+
+    def _append_record(self, record: Dict[str, Any]) -> int:
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        with open(self._docs_path, "ab") as f:
+            offset = f.tell()
+            f.write(line)
+        return offset
+
+    def _flush(self, sync: bool = False):
+        # Mapped rows survive a process crash in the page cache; msync is
+        # only forced when the map is resized or closed
+        if sync and self._vectors is not None:
+            self._vectors.flush()
+        meta = {
+            "embedder": self.embedder.name,
+            "dim": self.embedder.dim,
+            "rows": len(self._ids),
+            "capacity": self._capacity,
+        }
+        tmp_path = f"{self._meta_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self._meta_path)
+
+    # Writes
+
+    def add(
+        self,
+        doc_id: str,
+        text: str,
+        filename: str = "",
+        jd_id: Optional[str] = None,
+        analysis: Optional[Dict[str, Any]] = None,
+    ):
+        """Index a resume, or add a JD's analysis to one already indexed"""
+        summary = None
+        if analysis is not None:
+            summary = {
+                "match_percentage": analysis.get("match_percentage"),
+                "scores": analysis.get("scores"),
+                "matched_skills": analysis.get("matched_skills", []),
+            }
+
+        with self._lock:
+            known = doc_id in self._rows
+            analyses = self._read_record(self._offsets[doc_id]).get("analyses", {}) if known else {}
+            if summary is not None and jd_id:
+                analyses[jd_id] = summary
+            elif known:
+                return
+            text = text[:SEARCH_TEXT_CHARS]
+            # The row is written before the record and meta.json after it, so
+            # a crash in between leaves a record pointing past the stored
+            # rows, which makes the next startup rebuild
+            row = self._rows[doc_id] if known else self._append_row(doc_id, self.embedder.embed_document(text))
+            record = {
+                "id": doc_id,
+                "row": row,
+                "filename": filename,
+                "text": text,
+                "analyses": analyses,
+                "updated_at": time.time(),
+            }
+            self._offsets[doc_id] = self._append_record(record)
+            self._flush()
+
+    def submit(self, *args: Any, **kwargs: Any):
+        """add() on the background writer thread"""
+        future = self._writer.submit(self.add, *args, **kwargs)
+        future.add_done_callback(
+            lambda done: done.exception() and logger.error(f"Search indexing failed: {done.exception()}")
+        )
+
+    def delete(self, doc_id: str) -> bool:
+        with self._lock:
+            row = self._rows.pop(doc_id, None)
+            if row is None:
+                return False
+            self.embedder.observe(np.asarray(self._vectors[row]), sign=-1)
+            self._vectors[row] = 0
+            self._ids[row] = None
+            del self._offsets[doc_id]
+            self._append_record({"id": doc_id, "deleted": True})
+            self._flush()
+            return True
+
+    # Queries
+
+    def _top_k(self, query: np.ndarray, k: int, exclude: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            count = len(self._ids)
+            if count == 0 or k <= 0:
+                return []
+            scores = np.asarray(self._vectors[:count]) @ query
+            if exclude is not None and exclude in self._rows:
+                scores[self._rows[exclude]] = -np.inf
+            k = min(k, count)
+            candidates = np.argpartition(-scores, k - 1)[:k] if k < count else np.arange(count)
+            candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+            results = []
+            for row in candidates:
+                doc_id = self._ids[row]
+                if doc_id is None or not np.isfinite(scores[row]) or scores[row] <= 0:
+                    continue
+                record = self._read_record(self._offsets[doc_id])
+                results.append({
+                    "id": doc_id,
+                    "filename": record.get("filename", ""),
+                    "score": round(float(scores[row]), 4),
+                    "analyses": record.get("analyses", {}),
+                    "snippet": record.get("text", "")[:200],
+                })
+            return results
+
+    def search(self, query: str, k: int = 10) -> List[Dict[str, Any]]:
+        """Resumes best matching a free-text query ("PyTorch Docker")"""
+        return self._top_k(self.embedder.embed_query(query), k)
+
+    def similar(self, doc_id: str, k: int = 10) -> Optional[List[Dict[str, Any]]]:
+        """Resumes most similar to an indexed one; None if it is unknown"""
+        with self._lock:
+            row = self._rows.get(doc_id)
+            if row is None:
+                return None
+            query = self.embedder.adapt_row(np.array(self._vectors[row]))
+        return self._top_k(query, k, exclude=doc_id)
+
+    def get(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            offset = self._offsets.get(doc_id)
+            return self._read_record(offset) if offset is not None else None
+
+    def close(self):
+        self._writer.shutdown(wait=True)
+        with self._lock:
+            self._flush(sync=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "documents": len(self._rows),
+            "embedder": self.embedder.name,
+            "dim": self.embedder.dim,
+            "capacity": self._capacity,
+            "directory": self.directory,
+        }
@@ -0,0 +1,128 @@
+# backend/app/services/structured_output.py
+import re
+from typing import Any, Dict, List, Optional, Type
+import logging
+
+from pydantic import BaseModel, ValidationError
+from pydantic_core import from_json
+
+from app.models import AnalysisResult
+
+logger = logging.getLogger(__name__)
+
+_TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+_FENCE = re.compile(r"^```[a-zA-Z]*\s*|\s*```\s*$")
+
+
+def generation_config(schema: Any, **kwargs: Any):
+    """
+    GenerateContentConfig asking Gemini for JSON matching `schema` (a
+    pydantic model or list[model]); extra kwargs such as cached_content
+    are passed through
+    """
+    from google.genai import types
+
+    return types.GenerateContentConfig(response_mime_type="application/json", response_schema=schema, **kwargs)
+
+
+def _drop_incomplete_tail(text: str) -> str:
+    """
+    Cut a reply that stops mid-value back to its last complete one: after
+    a truncated number or literal ("match_percentage": 6 from 65) or inside
+    a string, everything from the last `,` (or after the last `{`/`[`)
+    outside strings is dropped. Text ending with a closed value is returned
+    as is.
+    """
+    in_string = escaped = False
+    cut = -1
+    for index, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == ",":
+            cut = index
+        elif char in "{[":
+            cut = index + 1
+    tail = text.rstrip()
+    if not in_string and tail.endswith(("}", "]", '"')):
+        return text
+    if cut == -1:
+        raise ValueError("No complete JSON value in model output")
+    return text[:cut]
+
+
+def repair_json(text: str) -> Any:
+    """
+    Best-effort parse of almost-JSON model output: surrounding prose or
+    markdown fences, trailing commas and replies cut off mid-object (the
+    incomplete tail is dropped, including a trailing scalar that may itself
+    be cut short). Raises ValueError when nothing is usable.
+    """
+    text = _FENCE.sub("", text.strip())
+    starts = [index for index in (text.find("{"), text.find("[")) if index != -1]
+    if not starts:
+        raise ValueError("No JSON object in model output")
+    text = _TRAILING_COMMA.sub(r"\1", text[min(starts):])
+
+    try:
+        return from_json(text)
+    except ValueError:
+        pass
+    # Complete JSON followed by prose: cut after the last closing bracket
+    end = max(text.rfind("}"), text.rfind("]"))
+    if end != -1:
+        try:
+            return from_json(text[:end + 1])
+        except ValueError:
+            pass
+    # Cut off mid-object: close what is complete
+    return from_json(_drop_incomplete_tail(text), allow_partial=True)
+
+
+def load_model_json(text: str) -> Any:
+    """Parse model output as JSON, repairing it locally if it is malformed"""
+    try:
+        return from_json(text)
+    except ValueError:
+        logger.debug("Model output is not valid JSON; repairing")
+        return repair_json(text)
+
+
+def parse_model_output(text: str, model: Type[BaseModel] = AnalysisResult) -> Dict[str, Any]:
+    """
+    Validate a single-object reply against `model` in one pass; only when
+    the JSON itself is broken is it repaired and validated again. Raises
+    ValueError if the result still doesn't fit the schema.
+    """
+    try:
+        return model.model_validate_json(text).model_dump()
+    except ValidationError as e:
+        if not any(error["type"] == "json_invalid" for error in e.errors()):
+            raise ValueError(f"Model output does not match the schema: {e}") from e
+    try:
+        return model.model_validate(repair_json(text)).model_dump()
+    except ValidationError as e:
+        raise ValueError(f"Model output does not match the schema: {e}") from e
+
+
+def parse_model_items(text: str, model: Type[BaseModel]) -> List[Optional[Dict[str, Any]]]:
+    """
+    Validate each entry of a JSON-array reply against `model`; entries that
+    don't fit (e.g. the last one of a truncated reply) are None
+    """
+    data = load_model_json(text)
+    if not isinstance(data, list):
+        raise ValueError("Model output is not a JSON array")
+    items: List[Optional[Dict[str, Any]]] = []
+    for item in data:
+        try:
+            items.append(model.model_validate(item).model_dump())
+        except ValidationError:
+            items.append(None)
+    return items
@@ -0,0 +1,118 @@
+# backend/app/services/tiering.py
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+ANALYSIS_MODES = ("full", "tiered")
+# "full" sends every resume to the model; "tiered" only borderline ones
+ANALYSIS_MODE = os.getenv("ANALYSIS_MODE", "full")
+# Default uncertainty band on the local match percentage; a JD may set its own
+SCREEN_LOW = float(os.getenv("SCREEN_LOW", "35"))
+SCREEN_HIGH = float(os.getenv("SCREEN_HIGH", "75"))
+
+# Which step produced an analysis
+TIER_CACHE = "cache"
+TIER_LOCAL = "local"
+TIER_MODEL = "model"
+TIER_FALLBACK = "fallback"
+# A model analysis carried over to a newer JD version without a model call
+TIER_RESCORED = "rescored"
+# A near-duplicate resume's model analysis adapted to this one without a model call
+TIER_DUPLICATE = "duplicate"
+
+DECISION_REJECT = "reject"
+DECISION_ACCEPT = "accept"
+DECISION_BORDERLINE = "borderline"
+
+
+def validate_screening(screening: Dict[str, Any]) -> Dict[str, float]:
+    """Normalized {"low", "high"} band; raises ValueError when unusable"""
+    unknown = set(screening) - {"low", "high"}
+    if unknown:
+        raise ValueError(f"Unknown screening keys: {', '.join(sorted(unknown))}")
+    low = float(screening.get("low", SCREEN_LOW))
+    high = float(screening.get("high", SCREEN_HIGH))
+    if not 0 <= low <= high <= 100:
+        raise ValueError("Screening band needs 0 <= low <= high <= 100")
+    return {"low": low, "high": high}
+
+
+@dataclass(frozen=True)
+class ScreeningBand:
+    """
+    Local match percentages below `low` are clear rejects and above `high`
+    clear fits; only the band in between is worth a model call
+    """
+
+    low: float = SCREEN_LOW
+    high: float = SCREEN_HIGH
+
+    @classmethod
+    def for_jd(cls, jd: Dict[str, Any]) -> "ScreeningBand":
+        screening = jd.get("screening")
+        if not screening:
+            return cls()
+        return cls(**validate_screening(screening))
+
+    def decide(self, match_percentage: float) -> str:
+        if match_percentage < self.low:
+            return DECISION_REJECT
+        if match_percentage > self.high:
+            return DECISION_ACCEPT
+        return DECISION_BORDERLINE
+
+    def to_dict(self) -> Dict[str, float]:
+        return {"low": self.low, "high": self.high}
+
+
+def tier_info(tier: str, local_analysis: Optional[Dict[str, Any]] = None, band: Optional[ScreeningBand] = None) -> Dict[str, Any]:
+    """The `tier` block of a response: who answered and, when screened, why"""
+    info: Dict[str, Any] = {"tier": tier}
+    if local_analysis is not None and band is not None:
+        provisional = local_analysis["match_percentage"]
+        info.update(provisional_match=provisional, decision=band.decide(provisional), band=band.to_dict())
+    return info
+
+
+class ScreeningStats:
+    """Screening outcomes per JD, for the LLM-call reduction report"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_jd: Dict[str, Dict[str, int]] = {}
+
+    def record(self, jd_id: str, decision: str):
+        with self._lock:
+            counts = self._by_jd.setdefault(
+                jd_id, {DECISION_REJECT: 0, DECISION_ACCEPT: 0, DECISION_BORDERLINE: 0}
+            )
+            counts[decision] += 1
+
+    @staticmethod
+    def _summary(counts: Dict[str, int]) -> Dict[str, Any]:
+        screened = sum(counts.values())
+        escalated = counts[DECISION_BORDERLINE]
+        return {
+            "screened": screened,
+            "rejected": counts[DECISION_REJECT],
+            "accepted": counts[DECISION_ACCEPT],
+            "escalated": escalated,
+            # Share of screened resumes that never reached the model
+            "llm_call_reduction": round(1 - escalated / screened, 4) if screened else 0.0,
+        }
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            by_jd = {jd_id: dict(counts) for jd_id, counts in self._by_jd.items()}
+        total = {DECISION_REJECT: 0, DECISION_ACCEPT: 0, DECISION_BORDERLINE: 0}
+        for counts in by_jd.values():
+            for decision, count in counts.items():
+                total[decision] += count
+        return {
+            **self._summary(total),
+            "by_jd": {jd_id: self._summary(counts) for jd_id, counts in by_jd.items()},
+        }
@@ -0,0 +1,235 @@
+# backend/app/services/uploads.py
+import hashlib
+import os
+import tempfile
+from typing import Any, Callable, Optional, Tuple, Union
+import logging
+
+from fastapi import UploadFile
+from starlette.responses import JSONResponse
+
+from .ocr_service import PdfSource
+
+logger = logging.getLogger(__name__)
+
+# Largest single PDF (or ZIP of PDFs) accepted, in bytes
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+# Largest request body; bigger bodies are refused while they stream in
+MAX_REQUEST_BYTES = int(os.getenv("MAX_REQUEST_BYTES", str(100 * 1024 * 1024)))
+# Multipart boundaries, part headers and form fields around a single upload
+UPLOAD_FORM_OVERHEAD_BYTES = 64 * 1024
+# Uploads above this are spooled to a temp file instead of kept in memory
+UPLOAD_SPOOL_BYTES = int(os.getenv("UPLOAD_SPOOL_BYTES", str(1024 * 1024)))
+UPLOAD_CHUNK_BYTES = 64 * 1024
+# Where spooled uploads go (default: the system temp directory)
+UPLOAD_TMP_DIR = os.getenv("UPLOAD_TMP_DIR") or None
+
+PDF_MAGIC = b"%PDF-"
+# Readers accept a PDF header anywhere in the first 1024 bytes
+PDF_HEADER_WINDOW = 1024
+
+
+class UploadRejected(ValueError):
+    """An upload that is refused before analysis (400, or 413 when too large)"""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def is_pdf(head: bytes) -> bool:
+    return PDF_MAGIC in head[:PDF_HEADER_WINDOW]
+
+
+class SpooledPDF:
+    """
+    A received PDF: size and SHA-256 (computed while reading) plus the
+    content, kept in memory when small and in a temp file otherwise.
+    `source` is what the PDF workers open; close() removes the temp file.
+    """
+
+    def __init__(self, filename: str, size: int, sha256: str, content: bytes = b"", path: Optional[str] = None):
+        self.filename = filename
+        self.size = size
+        self.sha256 = sha256
+        self.content = content
+        self.path = path
+
+    @classmethod
+    def from_bytes(cls, content: bytes, filename: str = "") -> "SpooledPDF":
+        return cls(filename, len(content), hashlib.sha256(content).hexdigest(), content)
+
+    @property
+    def source(self) -> PdfSource:
+        return self.path or self.content
+
+    @property
+    def spooled(self) -> bool:
+        return self.path is not None
+
+    def read_bytes(self) -> bytes:
+        if self.path is None:
+            return self.content
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def close(self):
+        if self.path is not None:
+            try:
+                os.unlink(self.path)
+            except OSError as e:
+                logger.debug(f"Could not remove spooled upload {self.path}: {e}")
+            self.path = None
+
+    def __enter__(self) -> "SpooledPDF":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def as_spooled_pdf(content: Union[bytes, SpooledPDF], filename: str = "") -> SpooledPDF:
+    return content if isinstance(content, SpooledPDF) else SpooledPDF.from_bytes(content, filename)
+
+
+async def receive_pdf(
+    file: UploadFile,
+    max_bytes: Optional[int] = None,
+    spool_bytes: Optional[int] = None,
+) -> SpooledPDF:
+    """
+    Read an uploaded PDF in chunks: the extension and magic bytes are
+    checked on the first chunk, reading stops as soon as `max_bytes` is
+    exceeded, and anything above `spool_bytes` is written to a temp file.
+    Raises UploadRejected.
+    """
+    max_bytes = MAX_UPLOAD_BYTES if max_bytes is None else max_bytes
+    spool_bytes = UPLOAD_SPOOL_BYTES if spool_bytes is None else spool_bytes
+    filename = file.filename or ""
+    if not filename.lower().endswith(".pdf"):
+        raise UploadRejected("Only PDF files are accepted")
+
+    digest = hashlib.sha256()
+    buffer = bytearray()
+    spool = None
+    size = 0
+    try:
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            if size == 0 and not is_pdf(chunk):
+                raise UploadRejected("File is not a valid PDF")
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadRejected(f"File exceeds the {max_bytes // (1024 * 1024)} MB upload limit", 413)
+            digest.update(chunk)
+            if spool is None and size > spool_bytes:
+                spool = tempfile.NamedTemporaryFile(prefix="upload-", suffix=".pdf", dir=UPLOAD_TMP_DIR, delete=False)
+                spool.write(buffer)
+                buffer = bytearray()
+            if spool is not None:
+                spool.write(chunk)
+            else:
+                buffer += chunk
+    except BaseException:
+        if spool is not None:
+            spool.close()
+            os.unlink(spool.name)
+        raise
+
+    if size == 0:
+        raise UploadRejected("Empty file")
+    if spool is None:
+        return SpooledPDF(filename, size, digest.hexdigest(), bytes(buffer))
+    spool.close()
+    return SpooledPDF(filename, size, digest.hexdigest(), path=spool.name)
+
+
+async def read_upload(file: UploadFile, max_bytes: Optional[int] = None) -> Tuple[str, bytes]:
+    """
+    (filename, bytes) of a batch upload (PDF or ZIP), read in chunks up to
+    `max_bytes`. Content that is neither is left for expand_uploads to
+    report per item. Raises UploadRejected when the file is too large.
+    """
+    max_bytes = MAX_UPLOAD_BYTES if max_bytes is None else max_bytes
+    chunks = []
+    size = 0
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_BYTES)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_bytes:
+            raise UploadRejected(f"{file.filename} exceeds the {max_bytes // (1024 * 1024)} MB upload limit", 413)
+        chunks.append(chunk)
+    return file.filename or "", b"".join(chunks)
+
+
+def request_too_large(content_length: Optional[str], max_bytes: Optional[int] = None) -> bool:
+    """Whether a declared Content-Length is over `max_bytes` (MAX_REQUEST_BYTES)"""
+    max_bytes = MAX_REQUEST_BYTES if max_bytes is None else max_bytes
+    try:
+        return content_length is not None and int(content_length) > max_bytes
+    except ValueError:
+        return False
+
+
+class _BodyTooLarge(Exception):
+    pass
+
+
+class RequestSizeLimit:
+    """
+    ASGI middleware enforcing a hard request body limit (413): a declared
+    Content-Length over it is refused before anything is read, and any
+    other body (chunked uploads) is counted as it streams in and cut off
+    once it passes the limit, before the multipart parser spools the rest.
+    `limit_for(path)` gives the limit for a route.
+    """
+
+    def __init__(self, app: Any, limit_for: Callable[[str], int]):
+        self.app = app
+        self.limit_for = limit_for
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        limit = self.limit_for(scope["path"])
+        too_large = JSONResponse(status_code=413, content={"success": False, "error": "Request body too large"})
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if request_too_large(content_length.decode("latin-1") if content_length else None, limit):
+            await too_large(scope, receive, send)
+            return
+
+        received = 0
+        exceeded = False
+        started = False
+
+        async def limited_receive():
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    exceeded = True
+                    raise _BodyTooLarge()
+            return message
+
+        async def guarded_send(message):
+            nonlocal started
+            # Whatever the app makes of the aborted read (a 400 for an
+            # unparsable form, a 500) is replaced by the 413 below
+            if exceeded:
+                return
+            started = started or message["type"] == "http.response.start"
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not exceeded:
+                raise
+        if exceeded and not started:
+            await too_large(scope, receive, send)
@@ -0,0 +1,107 @@
+# backend/benchmarks/bench_condense.py
+"""
+Prompt tokens and JD coverage of the resume part of a prompt: the old
+3000-character cut against condense_resume.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_condense [--resumes 200] [--budget 700]
+
+Synthetic resumes have contact details, a page header/footer repeated on
+every page and long experience sections ahead of the skills list, like
+many real multi-page CVs. "JD terms kept" is the share of the JD terms
+present in the full text that are still in what the model is sent.
+"""
+import argparse
+import random
+import statistics
+import time
+
+from app.models import JD_AI_DATA_INTERN
+from app.services.condenser import condense_resume
+from app.services.gemini_client import estimate_tokens
+from app.services.jd_registry import CompiledJD, validate_jd
+from app.services.local_scorer import SKILL_ALIASES
+
+from .harness import summarize
+
+OLD_RESUME_CHARS = 3000
+
+# pages, experience bullets per job, jobs
+PROFILES = {
+    "one-page": (1, 3, 1),
+    "two-page": (2, 5, 3),
+    "long": (4, 8, 6),
+}
+
+_BULLETS = [
+    "Coordinated weekly meetings with stakeholders and prepared status reports for management.",
+    "Maintained internal documentation and onboarding guides for new team members.",
+    "Supported the operations team with data entry and quality checks across departments.",
+    "Presented quarterly results to the department and collected feedback for improvements.",
+    "Organized university events with more than 200 participants and managed the budget.",
+]
+
+
+def synthetic_cv(rng: random.Random, pages: int, bullets: int, jobs: int) -> str:
+    terms = [alias for aliases in SKILL_ALIASES.values() for alias in aliases] + list(SKILL_ALIASES)
+    name = f"Candidate {rng.randint(1000, 9999)}"
+    header = [name, f"{name.split()[1]}@example.com | +66 81 {rng.randint(100, 999)} {rng.randint(1000, 9999)}",
+              "linkedin.com/in/candidate | github.com/candidate"]
+    body = ["SUMMARY", "Motivated graduate looking for an internship in data and AI.", "", "EXPERIENCE"]
+    for job in range(jobs):
+        body.append(f"Company {job} — Assistant   ({2015 + job} - {2016 + job})")
+        body.extend(f"•  {rng.choice(_BULLETS)}" for _ in range(bullets))
+    body += ["EDUCATION", "Bachelor of Science in Computer Science, GPA 3.45"]
+    body += ["PROJECTS", f"- Built a model with {rng.choice(terms)} and {rng.choice(terms)} to classify images"]
+    body += ["SKILLS", ", ".join(rng.sample(terms, 12))]
+    body += ["ACTIVITIES", "Volunteer at the student club.", "REFERENCES", "Available on request, dr.smith@uni.ac.th"]
+
+    # Spread the body over pages with the header repeated on top of each
+    per_page = -(-len(body) // pages)
+    lines = []
+    for page in range(pages):
+        lines += header + body[page * per_page:(page + 1) * per_page] + [f"Page {page + 1} of {pages}", ""]
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=200)
+    parser.add_argument("--budget", type=int, default=None, help="resume token budget (default PROMPT_RESUME_TOKENS)")
+    args = parser.parse_args()
+
+    jd = CompiledJD.compile("bench", validate_jd(JD_AI_DATA_INTERN))
+
+    def terms(text: str) -> set:
+        return jd.scorer.signals(text).terms
+
+    print(f"{'profile':>9} | {'tokens before':>13} | {'tokens after':>12} | {'JD terms kept':>17} | {'condense p50':>12}")
+    print("-" * 76)
+    for profile, shape in PROFILES.items():
+        rng = random.Random(profile)
+        before, after, recall_before, recall_after, latencies = [], [], [], [], []
+        for _ in range(args.resumes):
+            text = synthetic_cv(rng, *shape)
+            present = terms(text)
+
+            started = time.perf_counter()
+            condensed = condense_resume(text, args.budget, relevance=jd.relevance)
+            latencies.append(time.perf_counter() - started)
+
+            truncated = text[:OLD_RESUME_CHARS]
+            before.append(estimate_tokens(truncated))
+            after.append(estimate_tokens(condensed))
+            if present:
+                recall_before.append(len(terms(truncated) & present) / len(present))
+                recall_after.append(len(terms(condensed) & present) / len(present))
+
+        kept = f"{statistics.fmean(recall_before):.0%} -> {statistics.fmean(recall_after):.0%}"
+        print(
+            f"{profile:>9} | {statistics.fmean(before):>13.0f} | {statistics.fmean(after):>12.0f} | "
+            f"{kept:>17} | {summarize(latencies)['p50_ms']:>10.3f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
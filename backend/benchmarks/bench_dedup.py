@@ -0,0 +1,84 @@
+# backend/benchmarks/bench_dedup.py
+"""
+Near-duplicate lookups in the MinHash/LSH index.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_dedup [--sizes 1000 10000 50000] [--queries 200]
+
+Fills an in-memory DuplicateIndex with synthetic ~500-word resumes, then
+looks up --queries lightly edited copies (a few words replaced, a line
+added: these should be found) and --queries unrelated resumes (should not).
+"brute force" is comparing a query's shingles with every indexed resume,
+which is what finding duplicates costs without the index. Edits that
+push the true similarity below DEDUP_THRESHOLD are rightly not found.
+"""
+import argparse
+import random
+import time
+
+from app.services.dedup import DEDUP_THRESHOLD, DuplicateIndex, shingles
+
+VOCABULARY = [f"term{i}" for i in range(5000)]
+
+
+def synthetic_resume(rng: random.Random, words: int = 500) -> str:
+    return " ".join(rng.choice(VOCABULARY) for _ in range(words))
+
+
+def light_edit(text: str, rng: random.Random) -> str:
+    words = text.split()
+    for _ in range(rng.randint(1, 4)):
+        words[rng.randrange(len(words))] = rng.choice(VOCABULARY)
+    position = rng.randrange(len(words))
+    words[position:position] = [rng.choice(VOCABULARY) for _ in range(rng.randint(0, 12))]
+    return " ".join(words)
+
+
+def brute_force(query: str, corpus: list) -> int:
+    wanted = shingles(query)
+    return sum(len(wanted & other) / len(wanted | other) >= DEDUP_THRESHOLD for other in corpus)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"threshold {DEDUP_THRESHOLD}")
+    print(f"{'resumes':>8} | {'add':>8} | {'lookup':>8} | {'edits found':>11} | {'false hits':>10} | {'brute force':>11}")
+    print("-" * 73)
+    for size in args.sizes:
+        rng = random.Random(size)
+        texts = [synthetic_resume(rng) for _ in range(size)]
+        index = DuplicateIndex(max_entries=size, db_path="")
+        index.warm_up()
+
+        started = time.perf_counter()
+        for i, text in enumerate(texts):
+            index.add(f"r{i}", f"{i}.pdf", text)
+        add_ms = (time.perf_counter() - started) * 1000 / size
+
+        edits = [light_edit(rng.choice(texts), rng) for _ in range(args.queries)]
+        unrelated = [synthetic_resume(rng) for _ in range(args.queries)]
+        started = time.perf_counter()
+        found = sum(bool(index.find(text)) for text in edits)
+        false_hits = sum(bool(index.find(text)) for text in unrelated)
+        lookup_ms = (time.perf_counter() - started) * 1000 / (2 * args.queries)
+
+        # Shingle sets precomputed: only the comparisons are timed
+        corpus = [shingles(text) for text in texts]
+        started = time.perf_counter()
+        for text in edits[:10]:
+            brute_force(text, corpus)
+        brute_ms = (time.perf_counter() - started) * 1000 / 10
+
+        print(
+            f"{size:>8,} | {add_ms:>6.2f}ms | {lookup_ms:>6.2f}ms | {found:>5}/{len(edits):<5} | "
+            f"{false_hits:>4}/{len(unrelated):<5} | {brute_ms:>9.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
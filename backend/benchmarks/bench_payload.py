@@ -0,0 +1,92 @@
+# backend/benchmarks/bench_payload.py
+"""
+Response size and serialization cost per resume, full vs compact.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_payload [--resumes 50] [--iterations 2000]
+
+Analyzes --resumes synthetic PDFs in-process (ANALYSIS_BACKEND=fake, so
+analyses have the model's shape without network calls) and takes their
+/api/v1/analyze payloads. For each response shape it then reports the mean
+body size, gzip'd size and time to serialize: "stdlib json" is what
+JSONResponse did for every response, "full" is the same payload through
+compact.dumps (orjson when installed), "compact" is the CompactResult view
+and "match,scores" the fields=match,scores selection.
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import statistics
+import time
+
+
+async def collect_payloads(count: int) -> list:
+    # Imported here: app.services reads ANALYSIS_BACKEND when first imported
+    import httpx
+
+    import app.main as api
+
+    from .harness import make_resume_pdf
+
+    async with api.app.router.lifespan_context(api.app):
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            payloads = []
+            for i in range(count):
+                pdf = make_resume_pdf(("small", "medium")[i % 2], seed=i)
+                response = await client.post(
+                    "/api/v1/analyze", files={"file": (f"{i}.pdf", pdf, "application/pdf")},
+                    headers={"accept-encoding": "identity"},
+                )
+                payloads.append(response.json())
+            return payloads, api.jd_registry.default
+
+
+def measure(name: str, payloads: list, encode, iterations: int):
+    bodies = [encode(payload) for payload in payloads]
+    started = time.perf_counter()
+    for i in range(iterations):
+        encode(payloads[i % len(payloads)])
+    per_call_us = (time.perf_counter() - started) * 1e6 / iterations
+    size = statistics.fmean(len(body) for body in bodies)
+    gzipped = statistics.fmean(len(gzip.compress(body, compresslevel=5)) for body in bodies)
+    print(f"{name:>16} | {size:>8.0f} B | {gzipped:>8.0f} B | {per_call_us:>8.1f}us")
+
+
+def stdlib_dumps(payload) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=50)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    os.environ["ANALYSIS_BACKEND"] = "fake"
+    for key in ("RESULT_CACHE_DB", "ARTIFACT_STORE_DB", "DEDUP_INDEX_DB", "SEARCH_INDEX_DIR", "JOB_QUEUE_URL"):
+        os.environ.pop(key, None)
+    from app.services.compact import CompactResult, dumps, msgpack, orjson
+
+    payloads, jd = asyncio.run(collect_payloads(args.resumes))
+    compact = [{"success": True, "data": CompactResult.from_data(p["data"], jd).to_dict()} for p in payloads]
+    selected = [
+        {"success": True, "data": CompactResult.from_data(p["data"], jd).to_dict(("match", "scores"))} for p in payloads
+    ]
+
+    print(f"json encoder: {'orjson' if orjson else 'stdlib'}, msgpack: {'yes' if msgpack else 'not installed'}")
+    print(f"{'response':>16} | {'body':>10} | {'gzip':>10} | {'encode':>10}")
+    print("-" * 56)
+    measure("stdlib json", payloads, stdlib_dumps, args.iterations)
+    measure("full", payloads, dumps, args.iterations)
+    measure("compact", compact, dumps, args.iterations)
+    measure("match,scores", selected, dumps, args.iterations)
+    if msgpack is not None:
+        measure("compact msgpack", compact, lambda payload: msgpack.packb(payload, use_bin_type=True), args.iterations)
+
+
+if __name__ == "__main__":
+    main()
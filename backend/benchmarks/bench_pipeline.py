@@ -0,0 +1,78 @@
+# backend/benchmarks/bench_pipeline.py
+"""
+Micro-benchmarks for the per-resume pipeline steps on synthetic PDFs.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_pipeline [--iterations 200] [--profiles small medium large]
+    python -m benchmarks.bench_pipeline --save-baseline      # record results
+    python -m benchmarks.bench_pipeline --compare            # diff against them
+
+Covers PDF text extraction (OCRService and the worker-pool function),
+prompt building, response validation (clean, fenced and truncated replies)
+and local scoring. --compare exits with status 1 when a benchmark's p50
+regressed by more than --threshold.
+"""
+import argparse
+import json
+import sys
+
+from app.models import JD_AI_DATA_INTERN
+from app.services.jd_registry import CompiledJD, validate_jd
+from app.services.local_scorer import LocalScorer
+from app.services.ocr_service import PDF_TEXT_BUDGET, OCRService, extract_pdf_text
+from app.services.structured_output import parse_model_output
+
+from .fake_gemini import _analysis
+from .harness import compare_to_baseline, make_resume_pdf, print_table, save_baseline, time_calls
+
+BASELINE_NAME = "pipeline"
+
+
+def run(iterations: int, profiles):
+    jd = CompiledJD.compile("bench", validate_jd(JD_AI_DATA_INTERN))
+    ocr = OCRService()
+    reply = json.dumps(_analysis("benchmark"))
+    fenced_reply = f"```json\n{reply}\n```"
+    truncated_reply = reply[:reply.index('"missing_skills"') + 20]
+
+    results = {}
+    for profile in profiles:
+        pdf = make_resume_pdf(profile)
+        text = ocr.extract_text_from_pdf(pdf)
+        n = max(10, iterations // (4 if profile == "large" else 1))
+
+        results[f"extract_text_from_pdf[{profile}]"] = time_calls(lambda: ocr.extract_text_from_pdf(pdf), n)
+        results[f"extract_pdf_text[{profile}]"] = time_calls(lambda: extract_pdf_text(pdf, PDF_TEXT_BUDGET), n)
+        results[f"build_analysis_prompt[{profile}]"] = time_calls(lambda: jd.prompt(jd.condense(text)), iterations)
+        results[f"local_score[{profile}]"] = time_calls(
+            lambda: LocalScorer.for_jd(JD_AI_DATA_INTERN).match(text), iterations
+        )
+
+    results["parse_model_output"] = time_calls(lambda: parse_model_output(reply), iterations)
+    results["parse_model_output[fenced]"] = time_calls(lambda: parse_model_output(fenced_reply), iterations)
+    results["parse_model_output[truncated]"] = time_calls(lambda: parse_model_output(truncated_reply), iterations)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--profiles", nargs="+", default=["small", "medium", "large"])
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed p50 slowdown before flagging")
+    args = parser.parse_args()
+
+    results = run(args.iterations, args.profiles)
+    print_table(results)
+
+    if args.save_baseline:
+        path = save_baseline(BASELINE_NAME, results, {"iterations": args.iterations, "profiles": args.profiles})
+        print(f"\nBaseline written to {path}")
+    if args.compare and compare_to_baseline(BASELINE_NAME, results, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# backend/benchmarks/bench_rescore.py
+"""
+Re-scoring a stored candidate pool after JD edits, without model calls.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_rescore [--sizes 1000 10000]
+
+Fills an in-memory ArtifactStore with synthetic resumes (bench_ranking's,
+padded to a typical ~4k characters) judged against the default JD
+(model-like analyses: local scores plus noise), then times
+ArtifactStore.rescore for a weights-only edit (no text is read) and for
+added skills (only the new terms are scanned for), and ranking the pool
+afterwards. "full rescan" is what scoring every resume from its text
+again would cost, for comparison; every resume re-sent to the model would
+be one model call each.
+"""
+import argparse
+import random
+import time
+
+from app.models import JD_AI_DATA_INTERN
+from app.services.artifacts import ArtifactStore
+from app.services.jd_registry import CompiledJD, validate_jd
+from app.services.tiering import TIER_MODEL
+
+from .bench_ranking import FILLER, synthetic_resumes
+
+
+def model_like(analysis: dict, rng: random.Random) -> dict:
+    scores = {name: max(0.0, min(100.0, value + rng.uniform(-15, 15))) for name, value in analysis["scores"].items()}
+    return {**analysis, "scores": scores, "match_percentage": round(sum(scores.values()) / len(scores), 2)}
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000])
+    args = parser.parse_args()
+
+    base = validate_jd(JD_AI_DATA_INTERN)
+    edits = [
+        ("weights only", {**base, "weights": {"education": 0.1, "skills": 0.5, "experience": 0.2, "tools": 0.2}}),
+        ("+2 skills", {**base, "required_skills": base["required_skills"] + ["Kubernetes", "Linux"]}),
+    ]
+
+    print(f"{'resumes':>8} | {'edit':>12} | {'rescore':>10} | {'rescanned':>9} | {'rank':>9} | {'full rescan':>11}")
+    print("-" * 76)
+    for size in args.sizes:
+        rng = random.Random(size)
+        texts = [f"{text}\n{FILLER * 20}" for text in synthetic_resumes(size)]
+        for name, edited in edits:
+            store = ArtifactStore(max_entries=size, db_path="")
+            jd = CompiledJD.compile("bench", base)
+            for i, text in enumerate(texts):
+                analysis = model_like(jd.scorer.match(text).as_analysis(), rng)
+                store.record(f"r{i}", text, f"{i}.pdf", jd, analysis, TIER_MODEL, f"k{i}")
+
+            new_jd = CompiledJD.compile("bench", validate_jd(edited))
+            summary, rescore_ms = timed(store.rescore, new_jd, lambda resume_id: resume_id)
+            _, rank_ms = timed(store.rank, new_jd, 50)
+            _, rescan_ms = timed(lambda: [new_jd.scorer.match(text).as_analysis() for text in texts])
+            print(
+                f"{size:>8,} | {name:>12} | {rescore_ms:>8.1f}ms | {summary['rescanned']:>9,} | "
+                f"{rank_ms:>7.1f}ms | {rescan_ms:>9.1f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
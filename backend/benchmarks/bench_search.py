@@ -0,0 +1,64 @@
+# backend/benchmarks/bench_search.py
+"""
+Indexing throughput and query latency of the candidate search index.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_search [--sizes 1000 10000 100000] [--top-k 10]
+
+Each size builds a fresh index in a temporary directory through add(), so
+indexing includes the docs.jsonl/vectors writes, then times free-text
+queries and "more like this" lookups against it.
+"""
+import argparse
+import random
+import tempfile
+import time
+
+from app.services.search_index import SearchIndex
+
+from .bench_ranking import synthetic_resumes
+from .harness import summarize
+
+QUERIES = ["PyTorch Docker", "python machine learning", "SQL data analysis", "Kubernetes cloud", "react javascript"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'resumes':>9} | {'indexed/s':>10} | {'search p50':>10} | {'search p95':>10} | {'similar p50':>11}")
+    print("-" * 64)
+
+    rng = random.Random(0)
+    for size in args.sizes:
+        texts = synthetic_resumes(size)
+        with tempfile.TemporaryDirectory() as directory:
+            index = SearchIndex(directory)
+            start = time.perf_counter()
+            for i, text in enumerate(texts):
+                index.add(f"doc-{i}", text, f"resume-{i}.pdf")
+            index_rate = size / (time.perf_counter() - start)
+
+            search, similar = [], []
+            for i in range(args.queries):
+                start = time.perf_counter()
+                index.search(QUERIES[i % len(QUERIES)], args.top_k)
+                search.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                index.similar(f"doc-{rng.randrange(size)}", args.top_k)
+                similar.append(time.perf_counter() - start)
+            index.close()
+
+        search, similar = summarize(search), summarize(similar)
+        print(
+            f"{size:>9,} | {index_rate:>10,.0f} | {search['p50_ms']:>8.2f}ms | "
+            f"{search['p95_ms']:>8.2f}ms | {similar['p50_ms']:>9.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+# backend/benchmarks/bench_startup.py
+"""
+Cold start and memory per worker of the API.
+
+Run from the backend directory (Linux, reads /proc):
+
+    python -m benchmarks.bench_startup [--runs 5] [--workers 2]
+
+1. Import: `import app.main` in a fresh interpreter, --runs times: wall
+   time, resident memory afterwards and which heavy libraries it loaded.
+2. Server: gunicorn (gunicorn.conf.py) with --workers workers against the
+   fake Gemini server, with and without PRELOAD_MODULES: time until the
+   port answers and until /health reports ready from every worker, then
+   RSS and PSS per worker and for its PDF/OCR pool processes. PSS splits
+   shared pages between the processes sharing them, so it shows what
+   preloading in the master saves.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+import httpx
+
+from .fake_gemini import FakeGeminiConfig, serve_in_background
+from .load_test import BACKEND_DIR, free_port
+
+HEAVY_MODULES = ("fitz", "numpy", "google.genai")
+
+_IMPORT_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import app.main
+elapsed = (time.perf_counter() - started) * 1000
+rss = next(int(line.split()[1]) for line in open("/proc/self/status") if line.startswith("VmRSS:"))
+print(json.dumps({"ms": elapsed, "rss_kb": rss, "loaded": [m for m in %r if m in sys.modules]}))
+"""
+
+
+def memory_kb(pid: int) -> Dict[str, int]:
+    """RSS and PSS of one process, in KiB"""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss"):
+                fields[key.lower()] = int(rest.split()[0])
+    return fields
+
+
+def children(pid: int) -> List[int]:
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(child) for child in f.read().split()]
+    except OSError:
+        return []
+
+
+def measure_import(runs: int, env: Dict[str, str]) -> Dict[str, float]:
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", _IMPORT_PROBE % (HEAVY_MODULES,)],
+            cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        "import_ms_p50": statistics.median(sample["ms"] for sample in samples),
+        "rss_mb": statistics.median(sample["rss_kb"] for sample in samples) / 1024,
+        "loaded": samples[-1]["loaded"],
+    }
+
+
+def measure_server(workers: int, env: Dict[str, str], timeout: float = 60) -> Dict[str, float]:
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "-b", f"127.0.0.1:{port}",
+         "--workers", str(workers), "--log-level", "warning", "--access-logfile", "/dev/null", "app.main:app"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    listening = None
+    ready_pids = set()
+    try:
+        while len(ready_pids) < workers:
+            if time.perf_counter() - started > timeout or server.poll() is not None:
+                raise RuntimeError(f"server not ready ({len(ready_pids)}/{workers} workers)")
+            try:
+                # A new connection each time, so every worker gets polled
+                response = httpx.get(f"{url}/health", timeout=1)
+            except httpx.HTTPError:
+                time.sleep(0.01)
+                continue
+            if listening is None:
+                listening = time.perf_counter() - started
+            if response.status_code == 200:
+                ready_pids.add(response.json()["pid"])
+            time.sleep(0.01)
+        ready = time.perf_counter() - started
+
+        worker_mem, pool_mem = [], []
+        for pid in children(server.pid):
+            worker_mem.append(memory_kb(pid))
+            pool = [memory_kb(child) for child in children(pid)]
+            pool_mem.append({key: sum(item[key] for item in pool) for key in ("rss", "pss")})
+        master = memory_kb(server.pid)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    def mean_mb(items: List[Dict[str, int]], key: str) -> float:
+        return statistics.fmean(item[key] for item in items) / 1024 if items else 0.0
+
+    return {
+        "listening_ms": listening * 1000,
+        "all_ready_ms": ready * 1000,
+        "master_pss_mb": master["pss"] / 1024,
+        "worker_rss_mb": mean_mb(worker_mem, "rss"),
+        "worker_pss_mb": mean_mb(worker_mem, "pss"),
+        "pool_pss_mb": mean_mb(pool_mem, "pss"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    fake_port = free_port()
+    fake = serve_in_background(FakeGeminiConfig(latency_ms=50), port=fake_port)
+    env = {
+        **os.environ,
+        "GEMINI_API_KEY": "fake",
+        "GEMINI_BASE_URL": f"http://127.0.0.1:{fake_port}",
+        "PDF_WORKERS": "2",
+        "OCR_WORKERS": "1",
+    }
+    for key in ("RESULT_CACHE_DB", "ARTIFACT_STORE_DB", "DEDUP_INDEX_DB", "SEARCH_INDEX_DIR", "JOB_QUEUE_URL"):
+        env.pop(key, None)
+
+    try:
+        imported = measure_import(args.runs, env)
+        print(
+            f"import app.main: {imported['import_ms_p50']:.0f} ms p50, {imported['rss_mb']:.1f} MB RSS, "
+            f"heavy modules loaded: {', '.join(imported['loaded']) or 'none'}\n"
+        )
+
+        print(f"gunicorn, {args.workers} workers (PDF_WORKERS=2, OCR_WORKERS=1 each)")
+        header = (
+            f"{'preload':>8} | {'listening':>9} | {'all ready':>9} | {'master PSS':>10} | "
+            f"{'worker RSS':>10} | {'worker PSS':>10} | {'pool PSS':>8}"
+        )
+        print(header)
+        print("-" * len(header))
+        for preload in ("1", "0"):
+            result = measure_server(args.workers, {**env, "PRELOAD_MODULES": preload})
+            print(
+                f"{'on' if preload == '1' else 'off':>8} | {result['listening_ms']:>7.0f}ms | "
+                f"{result['all_ready_ms']:>7.0f}ms | {result['master_pss_mb']:>8.1f}MB | "
+                f"{result['worker_rss_mb']:>8.1f}MB | {result['worker_pss_mb']:>8.1f}MB | {result['pool_pss_mb']:>6.1f}MB"
+            )
+    finally:
+        fake.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
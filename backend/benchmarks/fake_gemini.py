@@ -0,0 +1,303 @@
+# backend/benchmarks/fake_gemini.py
+"""
+Local stand-in for the Gemini generateContent REST endpoint.
+
+Run from the backend directory:
+
+    python -m benchmarks.fake_gemini --port 8090 --latency-ms 400 --error-rate 0.05 --rate-limit-rate 0.05
+
+and point the backend at it:
+
+    GEMINI_API_KEY=fake GEMINI_BASE_URL=http://127.0.0.1:8090 uvicorn app.main:app
+
+Replies are deterministic analyses in the JSON shape the prompts ask for
+(a JSON array for multi-resume and multi-position prompts). streamGenerateContent answers
+with the same text split over several SSE chunks: the first arrives after
+a quarter of the latency, the rest are spread over the remainder. Latency, 500 errors, 429 quota
+errors (with a RetryInfo hint) and a requests-per-minute limit are
+configurable to exercise retries, backoff and the circuit breaker.
+
+cachedContents can be created, read, extended (PATCH ttl) and deleted;
+generateContent calls naming a cachedContent get its text prepended to
+the prompt and report cachedContentTokenCount, and a 404 once it expired.
+GET models/{model} answers with minimal model metadata (warm-up).
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+class FakeGeminiConfig:
+    def __init__(
+        self,
+        latency_ms: float = 300,
+        jitter_ms: float = 100,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        rpm: int = 0,
+        retry_delay: float = 1.0,
+        seed: int = 0,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.rpm = rpm
+        self.retry_delay = retry_delay
+        self.random = random.Random(seed)
+
+
+def _analysis(seed_text: str) -> dict:
+    digest = hashlib.sha256(seed_text.encode("utf-8")).digest()
+    scores = {name: 40 + digest[i] % 61 for i, name in enumerate(("education", "skills", "experience", "tools"))}
+    return {
+        "scores": scores,
+        "match_percentage": round(
+            scores["education"] * 0.25 + scores["skills"] * 0.30 + scores["experience"] * 0.25 + scores["tools"] * 0.20
+        ),
+        "strengths": ["Relevant coursework", "Hands-on Python projects"],
+        "weaknesses": ["Limited production experience"],
+        "recommendations": ["Add measurable project outcomes"],
+        "matched_skills": ["Python", "Git"],
+        "missing_skills": ["Docker"],
+    }
+
+
+def _reply_text(prompt: str) -> str:
+    batch = re.search(r"Analyze each of the following (\d+) resumes", prompt)
+    if batch:
+        count = int(batch.group(1))
+        return json.dumps([{"resume_index": i, **_analysis(f"{prompt}#{i}")} for i in range(count)])
+    positions = re.search(r"against each of the following (\d+) positions", prompt)
+    if positions:
+        count = int(positions.group(1))
+        return json.dumps([{"jd_index": i, **_analysis(f"{prompt}#{i}")} for i in range(count)])
+    return json.dumps(_analysis(prompt))
+
+
+def _error(code: int, status: str, message: str, details: list = None) -> JSONResponse:
+    return JSONResponse(
+        status_code=code,
+        content={"error": {"code": code, "message": message, "status": status, "details": details or []}},
+    )
+
+
+def _contents_text(contents: list) -> str:
+    return "".join(part.get("text", "") for content in contents for part in content.get("parts", []))
+
+
+def _ttl_seconds(ttl: str) -> float:
+    return float(str(ttl).rstrip("s") or 0)
+
+
+def _cached_content(name: str, entry: dict) -> dict:
+    expire = datetime.fromtimestamp(entry["expires_at"], timezone.utc)
+    return {
+        "name": name,
+        "model": entry["model"],
+        "displayName": entry.get("displayName", ""),
+        "expireTime": expire.isoformat().replace("+00:00", "Z"),
+        "usageMetadata": {"totalTokenCount": max(1, len(entry["text"]) // 4)},
+    }
+
+
+def _response(
+    prompt: str, full_text: str, text: str, model_action: str, finished: bool = True, cached_tokens: int = 0
+) -> dict:
+    prompt_tokens = max(1, len(prompt) // 4)
+    output_tokens = max(1, len(full_text) // 4)
+    candidate = {"content": {"role": "model", "parts": [{"text": text}]}, "index": 0}
+    if finished:
+        candidate["finishReason"] = "STOP"
+    return {
+        "candidates": [candidate],
+        "usageMetadata": {
+            "promptTokenCount": prompt_tokens,
+            "candidatesTokenCount": output_tokens,
+            "totalTokenCount": prompt_tokens + output_tokens,
+            **({"cachedContentTokenCount": cached_tokens} if cached_tokens else {}),
+        },
+        "modelVersion": model_action.split(":")[0],
+    }
+
+
+async def _stream_chunks(prompt: str, text: str, model_action: str, delay: float, cached_tokens: int, chunks: int = 6):
+    size = max(1, -(-len(text) // chunks))
+    pieces = [text[i:i + size] for i in range(0, len(text), size)]
+    for i, piece in enumerate(pieces):
+        if i:
+            await asyncio.sleep(delay * 0.75 / max(1, len(pieces) - 1))
+        payload = _response(prompt, text, piece, model_action, i == len(pieces) - 1, cached_tokens)
+        yield f"data: {json.dumps(payload)}\r\n\r\n"
+
+
+def create_app(config: FakeGeminiConfig) -> FastAPI:
+    app = FastAPI(title="Fake Gemini")
+    app.state.config = config
+    app.state.calls = deque()
+    app.state.counters = {"requests": 0, "errors": 0, "rate_limited": 0, "cached_requests": 0}
+    app.state.caches = {}
+
+    def live_cache(name: str):
+        entry = app.state.caches.get(name)
+        if entry is not None and entry["expires_at"] <= time.time():
+            del app.state.caches[name]
+            return None
+        return entry
+
+    def cache_not_found(name: str) -> JSONResponse:
+        return _error(404, "NOT_FOUND", f"CachedContent not found (or permission denied): {name}")
+
+    @app.post("/{version}/cachedContents")
+    async def create_cache(version: str, request: Request):
+        body = await request.json()
+        name = f"cachedContents/{uuid.uuid4().hex[:12]}"
+        app.state.caches[name] = {
+            "model": body.get("model", ""),
+            "displayName": body.get("displayName", ""),
+            "text": _contents_text(body.get("contents", [])),
+            "expires_at": time.time() + _ttl_seconds(body.get("ttl", "3600s")),
+        }
+        return _cached_content(name, app.state.caches[name])
+
+    @app.get("/{version}/cachedContents/{cache_id}")
+    async def get_cache(version: str, cache_id: str):
+        name = f"cachedContents/{cache_id}"
+        entry = live_cache(name)
+        return _cached_content(name, entry) if entry else cache_not_found(name)
+
+    @app.patch("/{version}/cachedContents/{cache_id}")
+    async def update_cache(version: str, cache_id: str, request: Request):
+        name = f"cachedContents/{cache_id}"
+        entry = live_cache(name)
+        if entry is None:
+            return cache_not_found(name)
+        body = await request.json()
+        if "ttl" in body:
+            entry["expires_at"] = time.time() + _ttl_seconds(body["ttl"])
+        return _cached_content(name, entry)
+
+    @app.delete("/{version}/cachedContents/{cache_id}")
+    async def delete_cache(version: str, cache_id: str):
+        name = f"cachedContents/{cache_id}"
+        if app.state.caches.pop(name, None) is None:
+            return cache_not_found(name)
+        return {}
+
+    @app.get("/{version}/models/{model}")
+    async def get_model(version: str, model: str):
+        # What the backend's warm-up asks for to open its connection
+        return {"name": f"models/{model}", "displayName": model, "inputTokenLimit": 1048576}
+
+    @app.post("/{version}/models/{model_action}")
+    async def generate_content(version: str, model_action: str, request: Request):
+        body = await request.json()
+        counters = app.state.counters
+        counters["requests"] += 1
+
+        prompt = _contents_text(body.get("contents", []))
+        cached_tokens = 0
+        if body.get("cachedContent"):
+            entry = live_cache(body["cachedContent"])
+            if entry is None:
+                return cache_not_found(body["cachedContent"])
+            counters["cached_requests"] += 1
+            cached_tokens = max(1, len(entry["text"]) // 4)
+            prompt = entry["text"] + prompt
+
+        delay = max(0.0, config.latency_ms + config.random.uniform(-config.jitter_ms, config.jitter_ms)) / 1000
+        streaming = model_action.endswith(":streamGenerateContent")
+        # Streams start early and spread the rest of the latency over chunks
+        await asyncio.sleep(delay / 4 if streaming else delay)
+
+        now = time.monotonic()
+        calls = app.state.calls
+        while calls and now - calls[0] > 60:
+            calls.popleft()
+        over_rpm = config.rpm and len(calls) >= config.rpm
+        calls.append(now)
+
+        if over_rpm or config.random.random() < config.rate_limit_rate:
+            counters["rate_limited"] += 1
+            return _error(
+                429,
+                "RESOURCE_EXHAUSTED",
+                "You exceeded your current quota.",
+                [{"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": f"{config.retry_delay}s"}],
+            )
+        if config.random.random() < config.error_rate:
+            counters["errors"] += 1
+            return _error(500, "INTERNAL", "An internal error has occurred.")
+
+        text = _reply_text(prompt)
+        if streaming:
+            return StreamingResponse(
+                _stream_chunks(prompt, text, model_action, delay, cached_tokens), media_type="text/event-stream"
+            )
+        return _response(prompt, text, text, model_action, cached_tokens=cached_tokens)
+
+    @app.get("/stats")
+    async def stats():
+        return app.state.counters
+
+    return app
+
+
+def serve_in_background(config: FakeGeminiConfig, host: str = "127.0.0.1", port: int = 8090):
+    """
+    Start the fake server on a daemon thread and return the uvicorn server
+    once it accepts connections; set `server.should_exit = True` to stop it
+    """
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(create_app(config), host=host, port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="fake-gemini", daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if not thread.is_alive() or time.monotonic() > deadline:
+            raise RuntimeError(f"Fake Gemini server failed to start on {host}:{port}")
+        time.sleep(0.05)
+    return server
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency-ms", type=float, default=300)
+    parser.add_argument("--jitter-ms", type=float, default=100)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--rpm", type=int, default=0, help="requests per minute before answering 429 (0 = unlimited)")
+    parser.add_argument("--retry-delay", type=float, default=1.0, help="retryDelay hint sent with 429s, seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    config = FakeGeminiConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        rpm=args.rpm,
+        retry_delay=args.retry_delay,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
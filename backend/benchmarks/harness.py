@@ -0,0 +1,162 @@
+# backend/benchmarks/harness.py
+"""
+Shared pieces for the benchmark scripts: synthetic resume PDFs, latency
+summaries and baseline files that can be compared across runs.
+"""
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import fitz  # PyMuPDF
+
+from app.services.local_scorer import SKILL_ALIASES
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+
+# pages, skill terms per page, filler paragraphs per page
+PDF_PROFILES = {
+    "small": (1, 10, 2),
+    "medium": (3, 14, 5),
+    "large": (12, 18, 8),
+}
+
+_FILLER = (
+    "Worked with the team to deliver features on schedule and documented the results. "
+    "Participated in code reviews, planning meetings and university activities. "
+)
+_SECTIONS = ["Education", "Experience", "Projects", "Skills", "Activities"]
+_EXTRAS = [
+    "Bachelor of Science in Computer Science", "Data Science coursework", "2 years of internship experience",
+    "Developed data pipelines", "Built machine learning models", "Research assistant", "Teaching assistant",
+]
+
+
+def synthetic_resume_text(rng: random.Random, terms_per_page: int = 12, paragraphs: int = 3) -> str:
+    terms = [alias for aliases in SKILL_ALIASES.values() for alias in aliases] + list(SKILL_ALIASES)
+    lines = [f"Candidate {rng.randint(1000, 9999)}"]
+    for section in rng.sample(_SECTIONS, len(_SECTIONS)):
+        lines.append(section)
+        lines.append(rng.choice(_EXTRAS))
+        lines.extend(_FILLER for _ in range(max(0, paragraphs // 2)))
+    lines.append("Skills: " + ", ".join(rng.sample(terms, min(terms_per_page, len(terms)))))
+    return "\n".join(lines)
+
+
+def make_resume_pdf(profile: str = "small", seed: int = 0) -> bytes:
+    """Resume PDF with a text layer, deterministic content for a seed"""
+    pages, terms_per_page, paragraphs = PDF_PROFILES[profile]
+    rng = random.Random(f"{profile}:{seed}")
+    doc = fitz.open()
+    for _ in range(pages):
+        page = doc.new_page()
+        rect = page.rect + (50, 50, -50, -50)
+        page.insert_textbox(rect, synthetic_resume_text(rng, terms_per_page, paragraphs), fontsize=9)
+    # Fixed metadata so the same seed gives the same bytes (and cache keys)
+    doc.set_metadata({"creationDate": "D:20240101000000", "modDate": "D:20240101000000", "producer": "bench"})
+    content = doc.tobytes(garbage=3, deflate=True)
+    doc.close()
+    return content
+
+
+def summarize(latencies: Sequence[float], elapsed: Optional[float] = None) -> Dict[str, float]:
+    """p50/p95/p99/mean in milliseconds (input in seconds) and ops per second"""
+    if not latencies:
+        return {"count": 0}
+    ordered = sorted(latencies)
+
+    def percentile(p: float) -> float:
+        # Nearest-rank percentile
+        index = max(0, min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1))
+        return ordered[index] * 1000
+
+    total = elapsed if elapsed is not None else sum(ordered)
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 4),
+        "p50_ms": round(percentile(50), 4),
+        "p95_ms": round(percentile(95), 4),
+        "p99_ms": round(percentile(99), 4),
+        "max_ms": round(ordered[-1] * 1000, 4),
+        "ops_per_sec": round(len(ordered) / total, 2) if total > 0 else 0.0,
+    }
+
+
+def time_calls(fn: Callable[[], Any], iterations: int, warmup: int = 3) -> Dict[str, float]:
+    for _ in range(warmup):
+        fn()
+    latencies: List[float] = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call_started = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - call_started)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def print_table(results: Dict[str, Dict[str, float]]):
+    print(f"{'benchmark':<36} | {'n':>6} | {'p50 ms':>9} | {'p95 ms':>9} | {'p99 ms':>9} | {'ops/s':>10}")
+    print("-" * 94)
+    for name, item in results.items():
+        print(
+            f"{name:<36} | {item['count']:>6} | {item['p50_ms']:>9.3f} | {item['p95_ms']:>9.3f} "
+            f"| {item['p99_ms']:>9.3f} | {item['ops_per_sec']:>10,.1f}"
+        )
+
+
+def baseline_path(name: str) -> str:
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def save_baseline(name: str, results: Dict[str, Dict[str, float]], params: Optional[Dict[str, Any]] = None) -> str:
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    path = baseline_path(name)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "params": params or {},
+            "results": results,
+        }, f, indent=2)
+    return path
+
+
+def load_baseline(name: str) -> Optional[Dict[str, Any]]:
+    path = baseline_path(name)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare_to_baseline(
+    name: str, results: Dict[str, Dict[str, float]], threshold: float = 0.10, metric: str = "p50_ms"
+) -> List[str]:
+    """
+    Print the change against the saved baseline and return the benchmarks
+    whose `metric` got slower by more than `threshold`
+    """
+    baseline = load_baseline(name)
+    if baseline is None:
+        print(f"\nNo baseline '{name}' yet (run with --save-baseline)")
+        return []
+
+    print(f"\nAgainst baseline from {baseline['created_at']} ({metric}):")
+    regressions = []
+    for bench, item in results.items():
+        before = baseline["results"].get(bench, {}).get(metric)
+        if not before:
+            print(f"  {bench:<36} new")
+            continue
+        change = (item[metric] - before) / before
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(bench)
+        print(f"  {bench:<36} {before:>9.3f} -> {item[metric]:>9.3f}  ({change:+.1%}){flag}")
+    return regressions
@@ -0,0 +1,186 @@
+# backend/benchmarks/load_test.py
+"""
+End-to-end load test of POST /api/v1/analyze against the fake Gemini server.
+
+Run from the backend directory:
+
+    python -m benchmarks.load_test --requests 500 --concurrency 32 --latency-ms 400 --error-rate 0.02
+
+By default this starts the fake Gemini server in-process and the API in a
+uvicorn subprocess pointed at it (GEMINI_BASE_URL). Use --url to load an
+already running API instead (it must be configured against a fake or real
+Gemini endpoint by you). Every request uploads a distinct synthetic PDF
+unless --distinct is lowered, in which case later requests hit the cache.
+
+Reports p50/p95/p99 latency, requests per second, status codes and the
+server-side Gemini/cache counters; --save-baseline / --compare keep
+results per profile for comparison across runs.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from .fake_gemini import FakeGeminiConfig, serve_in_background
+from .harness import compare_to_baseline, make_resume_pdf, print_table, save_baseline, summarize
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_api(port: int, gemini_url: str, extra_env: Dict[str, str], show_logs: bool = False) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "GEMINI_API_KEY": "fake",
+        "GEMINI_BASE_URL": gemini_url,
+        **extra_env,
+    }
+    for key in ("RESULT_CACHE_DB", "ARTIFACT_STORE_DB", "DEDUP_INDEX_DB"):
+        env.pop(key, None)
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=None if show_logs else subprocess.DEVNULL,
+        stderr=None if show_logs else subprocess.DEVNULL,
+    )
+
+
+def wait_ready(url: str, process: Optional[subprocess.Popen] = None, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"API exited with status {process.returncode}")
+        try:
+            if httpx.get(f"{url}/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"API at {url} not ready after {timeout}s")
+
+
+async def run_load(url: str, pdfs: List[bytes], requests: int, concurrency: int, timeout: float) -> Dict[str, Any]:
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    slots = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=httpx.Limits(max_connections=concurrency)) as client:
+        async def one(i: int):
+            pdf = pdfs[i % len(pdfs)]
+            async with slots:
+                started = time.perf_counter()
+                try:
+                    response = await client.post(
+                        "/api/v1/analyze", files={"file": (f"resume-{i}.pdf", pdf, "application/pdf")}
+                    )
+                    statuses[response.status_code] += 1
+                    if response.status_code == 200:
+                        latencies.append(time.perf_counter() - started)
+                except httpx.HTTPError as e:
+                    statuses[type(e).__name__] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*[one(i) for i in range(requests)])
+        elapsed = time.perf_counter() - started
+
+        stats = (await client.get("/api/v1/stats")).json().get("data", {})
+
+    return {"summary": summarize(latencies, elapsed), "statuses": dict(statuses), "elapsed": elapsed, "stats": stats}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="load an already running API instead of starting one")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--profile", choices=["small", "medium", "large"], default="small")
+    parser.add_argument("--distinct", type=int, default=0, help="distinct PDFs to cycle through (0 = one per request)")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--latency-ms", type=float, default=300)
+    parser.add_argument("--jitter-ms", type=float, default=100)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--retry-delay", type=float, default=1.0)
+    parser.add_argument("--gemini-rpm", default="0", help="client-side GEMINI_RPM for the spawned API (0 = unlimited)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--show-api-logs", action="store_true")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args()
+
+    distinct = args.distinct or args.requests
+    print(f"Generating {distinct} '{args.profile}' PDFs...")
+    pdfs = [make_resume_pdf(args.profile, seed=args.seed * 1_000_000 + i) for i in range(distinct)]
+
+    fake = None
+    api = None
+    url = args.url
+    try:
+        if url is None:
+            fake_port = free_port()
+            fake = serve_in_background(
+                FakeGeminiConfig(
+                    latency_ms=args.latency_ms,
+                    jitter_ms=args.jitter_ms,
+                    error_rate=args.error_rate,
+                    rate_limit_rate=args.rate_limit_rate,
+                    retry_delay=args.retry_delay,
+                    seed=args.seed,
+                ),
+                port=fake_port,
+            )
+            api_port = free_port()
+            url = f"http://127.0.0.1:{api_port}"
+            api = start_api(api_port, f"http://127.0.0.1:{fake_port}", {"GEMINI_RPM": args.gemini_rpm}, args.show_api_logs)
+        wait_ready(url, api)
+
+        print(f"Sending {args.requests} requests with concurrency {args.concurrency} to {url}\n")
+        result = asyncio.run(run_load(url, pdfs, args.requests, args.concurrency, args.timeout))
+    finally:
+        if api is not None:
+            api.terminate()
+            api.wait(timeout=10)
+        if fake is not None:
+            fake.should_exit = True
+
+    name = f"analyze[{args.profile}]"
+    results = {name: result["summary"]}
+    print_table(results)
+    print(f"\nStatus codes: {result['statuses']}  wall time: {result['elapsed']:.2f}s")
+
+    gemini = result["stats"].get("gemini") or {}
+    if gemini:
+        print(
+            f"Gemini: {gemini.get('requests')} requests, {gemini.get('retries')} retries, "
+            f"{gemini.get('rate_limited')} rate limited, {gemini.get('failed')} failed, circuit {gemini.get('circuit')}"
+        )
+    for namespace, counts in result["stats"].get("cache", {}).get("namespaces", {}).items():
+        print(f"Cache[{namespace}]: {counts['hits']} hits / {counts['misses']} misses")
+    if fake is not None:
+        print(f"Fake Gemini: {fake.config.app.state.counters}")
+
+    baseline = f"load_{args.profile}"
+    if args.save_baseline:
+        params = {key: value for key, value in vars(args).items() if key not in ("save_baseline", "compare", "show_api_logs")}
+        print(f"\nBaseline written to {save_baseline(baseline, results, params)}")
+    if args.compare and compare_to_baseline(baseline, results, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
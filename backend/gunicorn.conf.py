@@ -0,0 +1,78 @@
+# backend/gunicorn.conf.py
+"""
+Production server: gunicorn supervising uvicorn workers.
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+The master imports the heavy libraries (PyMuPDF, numpy, google-genai,
+FastAPI, pydantic) once before forking, so each worker starts without
+importing them again and shares their pages copy-on-write. The app itself
+is still built inside each worker after the fork (preload_app stays off):
+its sqlite handles, thread pools, process pools and HTTP connections
+must not be shared across processes. Each worker then warms up in the
+background and reports ready on /health.
+
+Settings come from the environment:
+- WEB_CONCURRENCY: worker processes (default: CPU count, at most 4).
+  Currently always 1; see WORKER_LOCAL_STATE below
+- PORT: listen port (default 8000)
+- WORKER_TIMEOUT: seconds before a silent worker is restarted (default 120)
+- MAX_REQUESTS: recycle a worker after this many requests (0 = never)
+- PRELOAD_MODULES=0: don't import libraries in the master (for comparison)
+"""
+import importlib
+import multiprocessing
+import os
+import time
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", str(min(4, multiprocessing.cpu_count()))))
+worker_class = "uvicorn.workers.UvicornWorker"
+# Uploads with OCR and model calls with retries can take a while
+timeout = int(os.getenv("WORKER_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+max_requests = int(os.getenv("MAX_REQUESTS", "0"))
+max_requests_jitter = max_requests // 10
+accesslog = "-"
+preload_app = False
+
+# State that lives only inside a worker process. With several workers a
+# request landing on another worker wouldn't see it: a JD created with
+# POST /api/v1/jds would 404 there, /jds/{id}/candidates would show another
+# pool, and GET /api/v1/jobs/{id} would 404 while a client polls. The JD
+# registry and artifact store are loaded from their files only at startup,
+# so they are never shared; jobs are once JOB_QUEUE_URL points at Redis.
+# The search index has a single writer; several workers would corrupt it.
+WORKER_LOCAL_STATE = [
+    "the JD registry",
+    "the artifact store",
+    *(["jobs (JOB_QUEUE_URL is not set)"] if not os.getenv("JOB_QUEUE_URL") else []),
+    *(["the search index (SEARCH_INDEX_DIR is set)"] if os.getenv("SEARCH_INDEX_DIR") else []),
+]
+SINGLE_WORKER_REASON = None
+if workers > 1 and WORKER_LOCAL_STATE:
+    SINGLE_WORKER_REASON = f"{', '.join(WORKER_LOCAL_STATE)} would differ between workers"
+    workers = 1
+
+# Each worker has its own PDF/OCR process pools; split the CPUs between
+# workers instead of giving every worker a pool per CPU
+os.environ.setdefault("PDF_WORKERS", str(max(1, multiprocessing.cpu_count() // max(1, workers))))
+os.environ.setdefault("OCR_WORKERS", "1" if workers > 1 else "2")
+
+PRELOAD_MODULES = ("fitz", "numpy", "httpx", "google.genai", "fastapi", "pydantic", "uvicorn")
+
+
+def on_starting(server):
+    if SINGLE_WORKER_REASON:
+        server.log.warning(f"{SINGLE_WORKER_REASON}: running a single worker")
+
+    if os.getenv("PRELOAD_MODULES", "1") == "0":
+        return
+    started = time.perf_counter()
+    for module in PRELOAD_MODULES:
+        try:
+            importlib.import_module(module)
+        except ImportError as e:
+            server.log.warning(f"Not preloading {module}: {e}")
+    server.log.info(f"Preloaded libraries in {(time.perf_counter() - started) * 1000:.0f} ms")